@@ -7,10 +7,8 @@ Generated by 'django-admin startproject' using Django 6.0.
 from pathlib import Path
 from datetime import timedelta
 import os
-REST_FRAMEWORK = {
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
-    'PAGE_SIZE': 10,  # har bir sahifada 10 ta item
-}
+
+from corsheaders.defaults import default_headers
 # ----------------------------
 # Base dir
 # ----------------------------
@@ -43,7 +41,6 @@ INSTALLED_APPS = [
     'corsheaders',    # CORS
     'django_filters',
     'channels',
-    'main_video',
 
     # My apps
     'main_video',
@@ -55,6 +52,7 @@ INSTALLED_APPS = [
 # ----------------------------
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'main_video.compression.CompressionMiddleware',  # javob matnini o'zgartiradigan middleware'lardan oldin
     'corsheaders.middleware.CorsMiddleware',
 
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -125,6 +123,39 @@ USE_I18N = True
 USE_TZ = True
 
 
+# ----------------------------
+# Cache (katalog javoblari, kurs tuzilmasi versiyalari)
+# ----------------------------
+# Bir nechta process (gunicorn worker) bo'lsa file backend ishlatiladi:
+# CACHE_BACKEND=django.core.cache.backends.filebased.FileBasedCache CACHE_LOCATION=/var/tmp/iiv_talim_cache
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', 'iiv-talim'),
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+        },
+    }
+}
+
+# ----------------------------
+# Javoblarni siqish (main_video.compression.CompressionMiddleware)
+# ----------------------------
+COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE', 512))  # bayt, kichik javoblar siqilmaydi
+COMPRESSION_CONTENT_TYPES = (
+    'application/json',
+    'application/openapi+json',
+    'application/vnd.oai.openapi+json',
+    'application/javascript',
+    'text/javascript',
+    'text/html',
+    'text/css',
+    'text/plain',
+    'image/svg+xml',
+)
+COMPRESSION_ENCODINGS = ('br', 'gzip')  # brotli o'rnatilmagan bo'lsa faqat gzip
+COMPRESSION_BROTLI_QUALITY = 5
+
 # ----------------------------
 # Custom User
 # ----------------------------
@@ -132,6 +163,9 @@ AUTH_USER_MODEL = 'main_video.Users'
 
 # ----------------------------
 # Django REST Framework
+# Global pagination yo'q (oldin birinchi REST_FRAMEWORK dict'i shu dict bilan bosib ketilardi):
+# list javoblari ro'yxat ko'rinishida qoladi, comment/rating'larda KeysetPagination,
+# users/course-progress/section-progress list'lari stream qilinadi (main_video.renderers)
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
         'rest_framework_simplejwt.authentication.JWTAuthentication',
@@ -140,6 +174,10 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',  # default permission
     ),
+    'DEFAULT_RENDERER_CLASSES': (
+        'main_video.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
 }
 
 
@@ -177,6 +215,9 @@ CORS_ALLOWED_HEADERS = [
     'x-csrftoken',
     'x-requested-with',
 ]
+# resumable yuklash (/api/uploads/, tus protokoli) headerlari
+CORS_ALLOW_HEADERS = (*default_headers, 'upload-length', 'upload-offset', 'upload-metadata', 'tus-resumable')
+CORS_EXPOSE_HEADERS = ['location', 'upload-offset', 'upload-length', 'tus-resumable', 'tus-version', 'tus-max-size']
 # ----------------------------
 # Swagger settings
 # ----------------------------
@@ -188,7 +229,14 @@ SWAGGER_SETTINGS = {
             'in': 'header'
         }
     },
+    # UI schema'ni tayyor fayldan oladi (main_video.openapi.schema_json)
+    'SPEC_URL': 'schema-json',
+}
+REDOC_SETTINGS = {
+    'SPEC_URL': 'schema-json',
 }
+# manage.py generate_openapi_schema yozadigan fayl (build/deploy vaqtida)
+OPENAPI_SCHEMA_FILE = os.environ.get('OPENAPI_SCHEMA_FILE', str(BASE_DIR / 'openapi.json'))
 
 # ----------------------------
 # CSRF Trusted Origins (ngrok + frontend)
@@ -203,5 +251,24 @@ import os
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# ----------------------------
+# Signed media URL'lar (main_video/signed_media.py)
+# ----------------------------
+# 'nginx': X-Accel-Redirect -> location /protected-media/ { internal; alias <MEDIA_ROOT>/; }
+# 'sendfile': X-Sendfile (Apache/lighttpd), 'django': fayl Python orqali (faqat dev)
+SIGNED_MEDIA_SERVER = os.environ.get('SIGNED_MEDIA_SERVER', 'django' if DEBUG else 'nginx')
+SIGNED_MEDIA_INTERNAL_PREFIX = '/protected-media/'
+SIGNED_MEDIA_TTL = int(os.environ.get('SIGNED_MEDIA_TTL', 60 * 60))  # sekund; URL TTL..2*TTL amal qiladi
+
+# Resumable yuklash (main_video/uploads.py). Vaqtinchalik papka MEDIA_ROOT bilan bir diskda bo'lsin (rename)
+UPLOAD_MAX_SIZE = int(os.environ.get('UPLOAD_MAX_SIZE', 5 * 1024 ** 3))
+UPLOAD_TEMP_DIR = os.path.join(MEDIA_ROOT, 'uploads-tmp')
+
+# Yuklangan fayllarni qayta ishlash (main_video/processing.py): fon thread'lari soni; False — sinxron
+MEDIA_PROCESSING_WORKERS = int(os.environ.get('MEDIA_PROCESSING_WORKERS', 2))
+MEDIA_PROCESSING_ASYNC = os.environ.get('MEDIA_PROCESSING_ASYNC', 'true').lower() == 'true'
+# Category/Course rasmlari uchun WebP/JPEG variantlar eni (px)
+IMAGE_VARIANT_WIDTHS = (320, 640, 1280)
+
 STATIC_URL = '/static/'
 STATIC_ROOT = os.path.join(BASE_DIR, 'static')
\ No newline at end of file
@@ -1,33 +1,26 @@
 from django.contrib import admin
 from django.urls import path, include
 from rest_framework_simplejwt.views import TokenRefreshView
-from rest_framework import permissions
-from drf_yasg.views import get_schema_view
-from drf_yasg import openapi
 from django.conf import settings
 from django.conf.urls.static import static
-from django.urls import path, include
-# ====================
-# Swagger / Redoc konfiguratsiyasi
-# ====================
-schema_view = get_schema_view(
-    openapi.Info(
-        title="My Project API",
-        default_version='v1',
-        description="API documentation for my project",
-    ),
-    public=True,
-    permission_classes=(permissions.AllowAny,),
-)
+from django.urls import path, include, re_path
+from main_video.openapi import schema_json, schema_ui, schema_yaml
+from main_video.signed_media import signed_media
+from main_video.streaming import protected_media
+import re
 
 # ====================
 # URL Patterns
 # ====================
 urlpatterns = [
-    # Swagger va Redoc
-    path('swagger<format>.json', schema_view.without_ui(cache_timeout=0), name='schema-json'),
-    path('swagger/', schema_view.with_ui('swagger', cache_timeout=0), name='schema-swagger-ui'),
-    path('redoc/', schema_view.with_ui('redoc', cache_timeout=0), name='schema-redoc'),
+    # Swagger va Redoc (schema: generate_openapi_schema bilan oldindan tayyorlangan fayl)
+    path('swagger.json', schema_json, name='schema-json'),
+    path('swagger.yaml', schema_yaml, name='schema-yaml'),
+    path('swagger/', schema_ui('swagger'), name='schema-swagger-ui'),
+    path('redoc/', schema_ui('redoc'), name='schema-redoc'),
+
+    # Signed media URL'lar (imzo tekshiriladi, fayl nginx/X-Sendfile orqali)
+    path('media-signed/<path:path>', signed_media, name='signed-media'),
 
     # JWT token refresh
     path('refresh/', TokenRefreshView.as_view(), name='token_refresh'),
@@ -42,4 +35,6 @@ urlpatterns = [
 
 
 if settings.DEBUG:
+    # videolar faqat /api/videos/<id>/stream/ orqali (kirish huquqi tekshiriladi)
+    urlpatterns += [re_path(r'^%svideos/' % re.escape(settings.MEDIA_URL.lstrip('/')), protected_media)]
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
\ No newline at end of file
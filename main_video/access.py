@@ -0,0 +1,129 @@
+from .models import Video, VideoProgress
+from .structure import get_course_structure, get_section_structures
+
+
+OPEN_ROLES = ('admin', 'teacher')
+
+EMPTY_PROGRESS = {
+    'is_completed': False,
+    'completed_at': None
+}
+
+
+class VideoAccessResolver:
+    """User uchun section (yoki butun kurs) videolariga kirish huquqini bitta o'tishda hisoblaydi.
+
+    Qoidalar Video.check_video_access bilan bir xil:
+    - admin va teacher uchun hamma video ochiq
+    - sectiondagi birinchi video ochiq
+    - user ko'rib bo'lgan video ochiq
+    - qolganlari oldingi video ko'rilgan bo'lsa ochiq
+    """
+
+    def __init__(self, user):
+        self.user = user
+        self._section_videos = {}   # section_id -> [(video_id, order), ...] order bo'yicha
+        self._video_objects = {}    # section_id -> [Video, ...] (faqat kerak bo'lganda)
+        self._access = {}           # video_id -> bool
+        self._progress = {}         # video_id -> {'is_completed', 'completed_at'}
+
+    # ----------------------------
+    # Yuklash (tartib structure cache'dan, bazaga faqat progress uchun boriladi)
+    # ----------------------------
+    def load_section(self, section_id):
+        self.load_sections([section_id])
+        return self._section_videos[section_id]
+
+    def load_course(self, course_id):
+        structure = get_course_structure(course_id)
+        self._resolve({
+            section_id: structure.video_order_pairs(section_id) for section_id in structure.section_ids
+            if section_id not in self._section_videos
+        })
+
+    def load_sections(self, section_ids):
+        section_ids = [section_id for section_id in section_ids if section_id not in self._section_videos]
+        if section_ids:
+            structures = get_section_structures(section_ids)
+            self._resolve({
+                section_id: structures[section_id].video_order_pairs(section_id) for section_id in section_ids
+            })
+
+    def prime_sections(self, by_section):
+        """Tayyor {section_id: [(video_id, order), ...]} (masalan prefetch'dan) bo'yicha hisoblash"""
+        self._resolve({
+            section_id: videos for section_id, videos in by_section.items()
+            if section_id not in self._section_videos
+        })
+
+    def _resolve(self, by_section):
+        for section_id in by_section:
+            self._section_videos[section_id] = by_section[section_id]
+        video_ids = [video_id for videos in by_section.values() for video_id, _ in videos]
+        if not video_ids:
+            return
+
+        # Bitta so'rov bilan userning barcha progresslari
+        rows = VideoProgress.objects.filter(
+            user=self.user,
+            video_id__in=video_ids
+        ).values_list('video_id', 'is_completed', 'completed_at')
+        for video_id, is_completed, completed_at in rows:
+            self._progress[video_id] = {
+                'is_completed': is_completed,
+                'completed_at': completed_at
+            }
+
+        is_open_role = self.user.role in OPEN_ROLES
+        for videos in by_section.values():
+            previous_completed = False
+            previous_order = None
+            last_below_completed = False
+            for index, (video_id, order) in enumerate(videos):
+                # oldingi video = order'i kichik bo'lgan eng oxirgi video
+                if previous_order is not None and previous_order < order:
+                    last_below_completed = previous_completed
+                completed = self.is_completed(video_id)
+
+                self._access[video_id] = is_open_role or index == 0 or completed or last_below_completed
+
+                previous_completed = completed
+                previous_order = order
+
+    # ----------------------------
+    # Natijalar
+    # ----------------------------
+    def section_access(self, section_id):
+        """{video_id: has_access} order bo'yicha"""
+        return {video_id: self._access[video_id] for video_id, _ in self.load_section(section_id)}
+
+    def section_videos(self, section_id):
+        """Sectiondagi Video obyektlari (access bilan bir xil tartibda)"""
+        if section_id not in self._video_objects:
+            self._video_objects[section_id] = list(
+                Video.objects.filter(section_id=section_id).order_by('order', 'id')
+            )
+        return self._video_objects[section_id]
+
+    def has_access(self, video):
+        return self.video_access(video.id, video.section_id)
+
+    def video_access(self, video_id, section_id):
+        if video_id not in self._access:
+            self.load_section(section_id)
+        return self._access.get(video_id, False)
+
+    def is_completed(self, video_id):
+        return self._progress.get(video_id, EMPTY_PROGRESS)['is_completed']
+
+    def progress(self, video_id):
+        return self._progress.get(video_id, EMPTY_PROGRESS)
+
+
+def get_access_resolver(request):
+    """Request davomida bitta resolver ishlatiladi (nested serializerlar ham)"""
+    resolver = getattr(request, '_video_access_resolver', None)
+    if resolver is None or resolver.user != request.user:
+        resolver = VideoAccessResolver(request.user)
+        request._video_access_resolver = resolver
+    return resolver
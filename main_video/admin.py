@@ -1,6 +1,12 @@
+from django import forms
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
+from django.db import transaction
 from .models import *
+from .ordering import renumber
+from .processing import process_video, schedule
+from .ratings import apply_rating_change
+from .uploads import completed_upload, mark_attached
 
 # ----------------------------
 # Users admin
@@ -34,8 +40,60 @@ class SectionInline(admin.TabularInline):
     show_change_link = True
 
 
-class VideoInline(admin.TabularInline):
+class VideoUploadForm(forms.ModelForm):
+    """Katta videolar: fayl /api/uploads/ (resumable) orqali yuklanadi, bu yerda faqat uning id'si"""
+    upload = forms.UUIDField(
+        required=False, label="Upload id",
+        help_text="/api/uploads/ orqali to'liq yuklangan fayl (video_file o'rniga)",
+    )
+
+    class Meta:
+        model = Video
+        fields = '__all__'
+
+    # admin so'rovining useri (VideoUploadAdminMixin qo'yadi)
+    user = None
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._upload = None
+        self.fields['video_file'].required = False
+
+    def clean(self):
+        cleaned_data = super().clean()
+        if cleaned_data.get('upload'):
+            self._upload = completed_upload(cleaned_data['upload'], 'video', self.user)
+            if self._upload is None:
+                self.add_error('upload', "Tugagan (va hali ulanmagan) yuklash topilmadi")
+            else:
+                cleaned_data['video_file'] = self._upload.file
+        elif not cleaned_data.get('video_file') and not self.instance.video_file:
+            self.add_error('video_file', forms.Field.default_error_messages['required'])
+        return cleaned_data
+
+    def _save_m2m(self):
+        super()._save_m2m()
+        if self._upload is not None:
+            mark_attached(self._upload, self.instance)
+
+
+class VideoUploadAdminMixin:
+    """VideoUploadForm'ga joriy userni beradi (factory har so'rovda yangi form class yasaydi)"""
+
+    def get_form(self, request, obj=None, **kwargs):
+        form = super().get_form(request, obj, **kwargs)
+        form.user = request.user
+        return form
+
+    def get_formset(self, request, obj=None, **kwargs):
+        formset = super().get_formset(request, obj, **kwargs)
+        formset.form.user = request.user
+        return formset
+
+
+class VideoInline(VideoUploadAdminMixin, admin.TabularInline):
     model = Video
+    form = VideoUploadForm
     extra = 1
     show_change_link = True
 
@@ -60,6 +118,12 @@ class SectionAdmin(admin.ModelAdmin):
     search_fields = ('title', 'course__title')
     ordering = ('course', 'order')
     inlines = [VideoInline, MissiyaInline]
+    actions = ['renumber_videos']
+
+    @admin.action(description="Videolar tartibini qayta raqamlash (bo'sh joy bilan)")
+    def renumber_videos(self, request, queryset):
+        updated = renumber(Video, list(queryset.values_list('id', flat=True)))
+        self.message_user(request, f"{updated} ta video order'i yangilandi")
 
 
 @admin.register(Course)
@@ -68,6 +132,15 @@ class CourseAdmin(admin.ModelAdmin):
     list_filter = ('is_blocked', 'category')
     search_fields = ('title', 'teacher__hemis_id')
     inlines = [SectionInline]  # <-- Shu yerda Section qo‘shildi
+    actions = ['renumber_sections']
+
+    @admin.action(description="Sectionlar va videolar tartibini qayta raqamlash (bo'sh joy bilan)")
+    def renumber_sections(self, request, queryset):
+        course_ids = list(queryset.values_list('id', flat=True))
+        section_ids = list(Section.objects.filter(course_id__in=course_ids).values_list('id', flat=True))
+        with transaction.atomic():
+            updated = renumber(Section, course_ids) + renumber(Video, section_ids)
+        self.message_user(request, f"{updated} ta section/video order'i yangilandi")
 
     def get_teachers(self, obj):
         return ", ".join(
@@ -78,11 +151,21 @@ class CourseAdmin(admin.ModelAdmin):
 # Video admin
 # ----------------------------
 @admin.register(Video)
-class VideoAdmin(admin.ModelAdmin):
-    list_display = ("id",'title', 'section', 'order', 'is_blocked')
+class VideoAdmin(VideoUploadAdminMixin, admin.ModelAdmin):
+    form = VideoUploadForm
+    list_display = ("id",'title', 'section', 'order', 'duration', 'is_blocked')
     list_filter = ('is_blocked', 'section__course')
     search_fields = ('title', 'section__title')
     ordering = ('section', 'order')
+    readonly_fields = ('duration', 'width', 'height', 'bitrate', 'file_size', 'processed_at')
+    actions = ['reprocess_videos']
+
+    @admin.action(description="Metadata va faststart'ni qayta hisoblash (fonda)")
+    def reprocess_videos(self, request, queryset):
+        video_ids = list(queryset.values_list('id', flat=True))
+        for video_id in video_ids:
+            schedule(process_video, video_id)
+        self.message_user(request, f"{len(video_ids)} ta video navbatga qo'yildi")
 
 
 # ----------------------------
@@ -161,6 +244,17 @@ class VideoRatingAdmin(admin.ModelAdmin):
     list_filter = ('rating',)
     search_fields = ('video__title', 'user__hemis_id')
 
+    # RatingSummary admin orqali o'zgarganda ham to'g'ri qolishi uchun (o'chirish — signals.rating_deleted)
+    def save_model(self, request, obj, form, change):
+        old = VideoRating.objects.filter(pk=obj.pk).values_list('video_id', 'rating').first() if change else None
+        with transaction.atomic():
+            super().save_model(request, obj, form, change)
+            if old and old[0] != obj.video_id:
+                apply_rating_change(old[0], old[1], None)
+                apply_rating_change(obj.video_id, None, obj.rating)
+            else:
+                apply_rating_change(obj.video_id, old[1] if old else None, obj.rating)
+
 
 # ----------------------------
 # Comment admin
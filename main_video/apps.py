@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class MainVideoConfig(AppConfig):
     name = 'main_video'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,112 @@
+import hashlib
+import uuid
+from functools import partial, wraps
+
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+
+
+# ----------------------------
+# Versiyalar (signals.py yangilaydi)
+# ----------------------------
+CONTENT = 'content'      # Category, Course, Section, Video, Missiya, teacherlar
+RATINGS = 'ratings'      # VideoRating (o'rtacha ratinglar)
+# userning o'z progressi esa Users.progress_version'da (progress.bump_progress_version)
+
+VERSION_KEY = 'version:{}'
+RESPONSE_KEY = 'response:{}'
+RESPONSE_TIMEOUT = 60 * 60 * 24
+
+
+def get_version(name):
+    """Versiya tokeni. Kalit cache'dan o'chib ketsa yangi token paydo bo'ladi (eski javoblar ishlatilmaydi)"""
+    key = VERSION_KEY.format(name)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid.uuid4().hex, timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(name):
+    cache.set(VERSION_KEY.format(name), uuid.uuid4().hex, timeout=None)
+
+
+# ----------------------------
+# ViewSet mixin
+# ----------------------------
+def cached_action(method):
+    """@action metodini VersionedCacheMixin.cached_response orqali o'tkazish"""
+    @wraps(method)
+    def wrapper(self, request, *args, **kwargs):
+        return self.cached_response(request, partial(method, self), *args, **kwargs)
+    return wrapper
+
+
+class VersionedCacheMixin:
+    """GET javoblarini versiya bo'yicha cache'lash, ETag va 304.
+
+    ETag javob matnidan emas, versiyalar + URL'dan olinadi, shuning uchun
+    If-None-Match mos kelsa serializer umuman ishlamaydi.
+    """
+    cache_versions = (CONTENT,)
+    cache_actions = ('list', 'retrieve')   # boshqa actionlar @cached_action bilan belgilanadi
+    # javobda userning progressi bor: kalitga user va uning progress_version'i qo'shiladi
+    cache_per_user = False
+
+    def get_cache_etag(self, request):
+        parts = [get_version(name) for name in self.cache_versions]
+        if self.cache_per_user:
+            from .signed_media import url_epoch
+            # progress_version autentifikatsiyada yuklangan user qatoridan olinadi;
+            # url_epoch — javobdagi signed media URL'lar muddati (signed_media.py)
+            parts += [f'user:{request.user.pk}', request.user.progress_version, url_epoch()]
+        parts += [request.accepted_renderer.format, request.build_absolute_uri()]
+        return '"%s"' % hashlib.sha1('|'.join(map(str, parts)).encode()).hexdigest()
+
+    def cached_response(self, request, handler, *args, **kwargs):
+        if self.action not in self.cache_actions or (self.cache_per_user and not request.user.is_authenticated):
+            return handler(request, *args, **kwargs)
+        etag = self.get_cache_etag(request)
+
+        # weak taqqoslash: CompressionMiddleware siqilgan javobda ETag'ni W/ bilan qaytaradi
+        if etag in [tag.removeprefix('W/') for tag in parse_etags(request.META.get('HTTP_IF_NONE_MATCH', ''))]:
+            return self._cache_headers(Response(status=status.HTTP_304_NOT_MODIFIED), etag)
+
+        cached = cache.get(RESPONSE_KEY.format(etag))
+        if cached is not None:
+            content, content_type = cached
+            return self._cache_headers(HttpResponse(content, content_type=content_type), etag)
+
+        response = handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            response._cache_etag = etag
+            self._cache_headers(response, etag)
+        return response
+
+    def _cache_headers(self, response, etag):
+        response['ETag'] = etag
+        if self.cache_per_user:
+            patch_cache_control(response, private=True, no_cache=True)
+            patch_vary_headers(response, ['Authorization'])
+        else:
+            patch_cache_control(response, no_cache=True)
+        return response
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        etag = getattr(response, '_cache_etag', None)
+        if etag is not None:
+            response.render()
+            cache.set(RESPONSE_KEY.format(etag), (response.content, response['Content-Type']), RESPONSE_TIMEOUT)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(request, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(request, super().retrieve, *args, **kwargs)
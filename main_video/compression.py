@@ -0,0 +1,148 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+from django.utils.text import compress_sequence, compress_string
+
+from .caching import RESPONSE_TIMEOUT
+
+try:
+    import brotli
+except ImportError:   # brotli o'rnatilmagan bo'lsa faqat gzip
+    brotli = None
+
+
+# ----------------------------
+# Sozlamalar (settings.py'da o'zgartirish mumkin)
+# ----------------------------
+DEFAULT_MIN_SIZE = 512
+DEFAULT_CONTENT_TYPES = (
+    'application/json',
+    'application/openapi+json',
+    'application/vnd.oai.openapi+json',
+    'application/javascript',
+    'text/javascript',
+    'text/html',
+    'text/css',
+    'text/plain',
+    'image/svg+xml',
+)
+DEFAULT_ENCODINGS = ('br', 'gzip')   # server afzal ko'radigan tartib
+DEFAULT_BROTLI_QUALITY = 5           # dinamik javoblar uchun tezlik/hajm muvozanati
+GZIP_MAX_RANDOM_BYTES = 100          # GZipMiddleware kabi (BREACH'ga qarshi tasodifiy padding)
+
+# siqilgan variant: javobning ETag'i (VersionedCacheMixin, schema) + encoding
+COMPRESSED_KEY = 'compressed:{}:{}'
+
+
+def get_setting(name, default):
+    return getattr(settings, name, default)
+
+
+def available_encodings():
+    return [encoding for encoding in get_setting('COMPRESSION_ENCODINGS', DEFAULT_ENCODINGS)
+            if encoding == 'gzip' or (encoding == 'br' and brotli is not None)]
+
+
+def parse_accept_encoding(header):
+    """'gzip, br;q=0.9, *;q=0' -> {'gzip': 1.0, 'br': 0.9, '*': 0.0}"""
+    result = {}
+    for part in header.split(','):
+        coding, _, params = part.strip().partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params.split(';'):
+            key, _, value = param.strip().partition('=')
+            if key.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        result[coding] = quality
+    return result
+
+
+def choose_encoding(header):
+    """Client qabul qiladigan, q eng katta encoding (teng bo'lsa server tartibi bo'yicha)"""
+    accepted = parse_accept_encoding(header or '')
+    best, best_quality = None, 0.0
+    for encoding in available_encodings():
+        quality = accepted.get(encoding, accepted.get('*', 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+# ----------------------------
+# Siqish
+# ----------------------------
+def compress(content, encoding):
+    if encoding == 'br':
+        return brotli.compress(content, quality=get_setting('COMPRESSION_BROTLI_QUALITY', DEFAULT_BROTLI_QUALITY))
+    return compress_string(content, max_random_bytes=GZIP_MAX_RANDOM_BYTES)
+
+
+def compress_stream(sequence, encoding):
+    if encoding == 'gzip':
+        yield from compress_sequence(sequence, max_random_bytes=GZIP_MAX_RANDOM_BYTES)
+        return
+    compressor = brotli.Compressor(quality=get_setting('COMPRESSION_BROTLI_QUALITY', DEFAULT_BROTLI_QUALITY))
+    for item in sequence:
+        # har bir bo'lakdan keyin flush: client ma'lumotni oqim bo'yicha oladi
+        data = compressor.process(item) + compressor.flush()
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+def is_compressible(response):
+    content_type = response.get('Content-Type', '').split(';')[0].strip().lower()
+    return content_type in get_setting('COMPRESSION_CONTENT_TYPES', DEFAULT_CONTENT_TYPES)
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """Accept-Encoding bo'yicha brotli yoki gzip.
+
+    Strong ETag'li javoblar (VersionedCacheMixin, OpenAPI schema) aynan shu ETag bilan bir xil
+    matnga ega, shuning uchun ularning siqilgan varianti cache'da ETag + encoding bo'yicha
+    saqlanadi va takroriy so'rovlarda qayta siqilmaydi. Siqilgandan keyin ETag weak bo'ladi
+    (GZipMiddleware kabi); VersionedCacheMixin If-None-Match'ni weak taqqoslaydi.
+    """
+
+    def process_response(self, request, response):
+        if response.status_code != 200 or response.has_header('Content-Encoding') or not is_compressible(response):
+            return response
+        if response.streaming:
+            if getattr(response, 'is_async', False):
+                return response
+        elif len(response.content) < get_setting('COMPRESSION_MIN_SIZE', DEFAULT_MIN_SIZE):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = choose_encoding(request.META.get('HTTP_ACCEPT_ENCODING'))
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            response.streaming_content = compress_stream(response.streaming_content, encoding)
+            del response['Content-Length']
+        else:
+            etag = response.get('ETag')
+            cache_key = COMPRESSED_KEY.format(etag, encoding) if etag and not etag.startswith('W/') else None
+            compressed = cache.get(cache_key) if cache_key else None
+            if compressed is None:
+                compressed = compress(response.content, encoding)
+                if len(compressed) >= len(response.content):
+                    return response
+                if cache_key:
+                    cache.set(cache_key, compressed, RESPONSE_TIMEOUT)
+            response.content = compressed
+            response['Content-Length'] = str(len(compressed))
+
+        etag = response.get('ETag')
+        if etag and not etag.startswith('W/'):
+            response['ETag'] = 'W/' + etag
+        response['Content-Encoding'] = encoding
+        return response
@@ -0,0 +1,294 @@
+from collections import defaultdict
+from functools import partial
+
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework import ISO_8601, serializers
+from rest_framework.relations import ManyRelatedField
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from .access import get_access_resolver
+from .images import ImageVariantsField, url_builder, variants_representation
+from .loaders import get_video_stats_loader
+from .models import Video, Missiya
+from .signed_media import SignedFileField, get_url_builder
+from .serializers import (
+    CommentSerializer, CourseMainSerializer, MissiyaOneSerializer, SectionOneSerializer, VideosSerializer,
+    requested_fields
+)
+
+
+# ----------------------------
+# Mapper'lar: DRF Field.to_representation bilan bir xil qiymat
+# ----------------------------
+# bazadan kelgan qiymat o'zgarishsiz JSON'ga tushadigan maydonlar
+PLAIN_FIELDS = (
+    serializers.CharField, serializers.IntegerField, serializers.BooleanField, serializers.FloatField,
+    serializers.PrimaryKeyRelatedField, serializers.ReadOnlyField,
+)
+
+
+def datetime_mapper(field, request):
+    output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+    field_timezone = field.timezone if hasattr(field, 'timezone') else field.default_timezone()
+    if output_format is None or output_format.lower() != ISO_8601 or field_timezone is None:
+        return field.to_representation
+
+    def mapper(value):
+        if not value:
+            return None
+        if value.tzinfo is None:
+            return field.to_representation(value)
+        value = value.astimezone(field_timezone).isoformat()
+        return value[:-6] + 'Z' if value.endswith('+00:00') else value
+    return mapper
+
+
+def signed_file_mapper(field, request):
+    """SignedFileField: nom -> signed URL (access tekshiruvi bo'lsa custom_fields'da)"""
+    return get_url_builder(request)
+
+
+def image_variants_mapper(model_field, field, request):
+    """img_variants (nomlar) -> [{'width', 'webp', 'jpeg'}] URL'lar bilan"""
+    build = url_builder(request, model_field.storage)
+    return lambda variants: variants_representation(variants, build)
+
+
+def file_mapper(model_field, field, request):
+    """.values() fayl nomini beradi: FieldFile.url + request.build_absolute_uri"""
+    if not getattr(field, 'use_url', api_settings.UPLOADED_FILES_USE_URL):
+        return lambda name: name or None
+    storage = model_field.storage
+    if request is None:
+        return lambda name: storage.url(name) if name else None
+    absolute = request.build_absolute_uri
+    return lambda name: absolute(storage.url(name)) if name else None
+
+
+# ----------------------------
+# ValuesSerializer
+# ----------------------------
+class ValuesSerializer:
+    """ModelSerializer'ning .values() ustidagi tezkor nusxasi: bir xil JSON, model obyektlari va Field'larsiz.
+
+    Maydonlar va tartib serializer_class'dan bir marta olinadi va bitta dict-literal funksiyaga
+    kompilyatsiya qilinadi. SerializerMethodField kabi maydonlar custom_fields'da
+    (lookup'lar + map_<name>() mapper'i), nested ro'yxatlar nested_fields'da (nested_<name>(ids)).
+    """
+    serializer_class = None
+    custom_fields = {}   # name -> (lookup, ...)
+    nested_fields = ()
+
+    def __init__(self, request=None):
+        self.request = request
+
+    # ----------------------------
+    # Kompilyatsiya (class bo'yicha bir marta)
+    # ----------------------------
+    @classmethod
+    def get_plan(cls):
+        plan = cls.__dict__.get('_plan')
+        if plan is None:
+            plan = cls._plan = cls._compile()
+        return plan
+
+    @classmethod
+    def _compile(cls):
+        model = cls.serializer_class.Meta.model
+        fields = []     # (name, kind, lookups, mapper factory(request) yoki ManyToMany model field)
+        for name, field in cls.serializer_class().fields.items():
+            lookup = field.source.replace('.', '__')
+            if name in cls.custom_fields:
+                fields.append((name, 'custom', cls.custom_fields[name], None))
+            elif name in cls.nested_fields:
+                fields.append((name, 'nested', (), None))
+            elif isinstance(field, ManyRelatedField) and isinstance(field.child_relation, serializers.PrimaryKeyRelatedField):
+                fields.append((name, 'many', (), model._meta.get_field(field.source)))
+            elif isinstance(field, serializers.DateTimeField):
+                fields.append((name, 'value', (lookup,), partial(datetime_mapper, field)))
+            elif isinstance(field, SignedFileField) and not field.access:
+                fields.append((name, 'value', (lookup,), partial(signed_file_mapper, field)))
+            elif isinstance(field, serializers.FileField) and not isinstance(field, SignedFileField):
+                fields.append((name, 'value', (lookup,), partial(file_mapper, model._meta.get_field(field.source), field)))
+            elif isinstance(field, ImageVariantsField):
+                fields.append((name, 'value', (lookup,), partial(image_variants_mapper, model._meta.get_field('img'), field)))
+            elif isinstance(field, PLAIN_FIELDS):
+                fields.append((name, 'value', (lookup,), None))
+            else:
+                raise ImproperlyConfigured(
+                    f"{cls.__name__}: '{name}' ({type(field).__name__}) custom_fields yoki nested_fields'da bo'lishi kerak"
+                )
+
+        lookups = ['id']
+        expressions = []
+        for index, (name, kind, field_lookups, factory) in enumerate(fields):
+            lookups += [lookup for lookup in field_lookups if lookup not in lookups]
+            arguments = ', '.join(f'r[{lookup!r}]' for lookup in field_lookups)
+            if kind == 'value' and factory is None:
+                expressions.append(f'{name!r}: {arguments}')
+            elif kind in ('value', 'custom'):
+                expressions.append(f'{name!r}: m[{index}]({arguments})')
+            else:
+                expressions.append(f'{name!r}: None')   # to_representation'da to'ldiriladi
+        code = compile('lambda r: {%s}' % ', '.join(expressions), f'<{cls.__name__}>', 'eval')
+        return fields, lookups, code
+
+    def get_row_function(self):
+        fields, lookups, code = self.get_plan()
+        mappers = []
+        for name, kind, field_lookups, factory in fields:
+            if kind == 'value':
+                mappers.append(factory(self.request) if factory else None)
+            elif kind == 'custom':
+                mappers.append(getattr(self, f'map_{name}')())
+            else:
+                mappers.append(None)
+        return eval(code, {'m': mappers})
+
+    # ----------------------------
+    # Ishlatish
+    # ----------------------------
+    def get_rows(self, queryset, *extra_lookups):
+        lookups = self.get_plan()[1]
+        return queryset.prefetch_related(None).values(*lookups, *[lookup for lookup in extra_lookups if lookup not in lookups])
+
+    def to_representation(self, rows):
+        rows = list(rows)
+        row_function = self.get_row_function()
+        items = [row_function(row) for row in rows]
+        ids = [row['id'] for row in rows]
+        for name, kind, _, model_field in self.get_plan()[0]:
+            if kind == 'many':
+                values = self.many_related(model_field, ids)
+            elif kind == 'nested':
+                values = getattr(self, f'nested_{name}')(ids)
+            else:
+                continue
+            for item, pk in zip(items, ids):
+                item[name] = values.get(pk, [])
+        return items
+
+    def serialize(self, queryset):
+        return self.to_representation(self.get_rows(queryset))
+
+    @staticmethod
+    def many_related(model_field, ids):
+        """ManyToMany pk ro'yxatlari through jadvalidan bitta so'rov bilan"""
+        through = model_field.remote_field.through
+        source, target = model_field.m2m_column_name(), model_field.m2m_reverse_name()
+        result = defaultdict(list)
+        rows = through.objects.filter(**{f'{source}__in': ids}).order_by(target).values_list(source, target)
+        for pk, related_pk in rows:
+            result[pk].append(related_pk)
+        return result
+
+
+# ----------------------------
+# Endpointlar
+# ----------------------------
+class VideoValuesSerializer(ValuesSerializer):
+    serializer_class = VideosSerializer
+    custom_fields = {
+        'video_file': ('id', 'section', 'video_file'),
+        'is_accessible': ('id', 'section'),
+        'user_progress': ('id',),
+        'average_rating': ('id',),
+        'user_rating': ('id',),
+    }
+
+    def _authenticated(self):
+        return self.request is not None and self.request.user.is_authenticated
+
+    def map_is_accessible(self):
+        if not self._authenticated():
+            return lambda video_id, section_id: False
+        return get_access_resolver(self.request).video_access
+
+    def map_video_file(self):
+        # VideosSerializer: signed URL faqat video ochiq bo'lsa
+        build, access = get_url_builder(self.request), self.map_is_accessible()
+        return lambda video_id, section_id, name: build(name) if name and access(video_id, section_id) else None
+
+    def map_user_progress(self):
+        if not self._authenticated():
+            return lambda video_id: {'is_completed': False, 'completed_at': None}
+        return get_video_stats_loader(self.request).progress
+
+    def map_average_rating(self):
+        return get_video_stats_loader(self.request).average_rating
+
+    def map_user_rating(self):
+        if not self._authenticated():
+            return lambda video_id: 0
+        return get_video_stats_loader(self.request).user_rating
+
+
+class MissiyaValuesSerializer(ValuesSerializer):
+    serializer_class = MissiyaOneSerializer
+
+
+class SectionOneValuesSerializer(ValuesSerializer):
+    """SectionOneSerializer + SectionOneListSerializer: videolar va missiyalar section'lar bo'yicha bitta so'rovda"""
+    serializer_class = SectionOneSerializer
+    nested_fields = ('videos', 'missiyalar')
+
+    def nested_videos(self, ids):
+        videos = VideoValuesSerializer(self.request)
+        rows = list(videos.get_rows(Video.objects.filter(section_id__in=ids)))
+        if videos._authenticated():
+            get_access_resolver(self.request).load_sections(ids)
+        get_video_stats_loader(self.request).prime(row['id'] for row in rows)
+        return self._group(rows, videos.to_representation(rows), 'section')
+
+    def nested_missiyalar(self, ids):
+        missiyas = MissiyaValuesSerializer(self.request)
+        rows = list(missiyas.get_rows(Missiya.objects.filter(section_id__in=ids), 'section'))
+        return self._group(rows, missiyas.to_representation(rows), 'section')
+
+    @staticmethod
+    def _group(rows, items, key):
+        result = defaultdict(list)
+        for row, item in zip(rows, items):
+            result[row[key]].append(item)
+        return result
+
+
+class CourseMainValuesSerializer(ValuesSerializer):
+    serializer_class = CourseMainSerializer
+
+
+class CommentValuesSerializer(ValuesSerializer):
+    serializer_class = CommentSerializer
+    custom_fields = {
+        'user': ('user__hemis_id', 'user__role'),
+    }
+
+    def map_user(self):
+        # StringRelatedField -> Users.__str__
+        return lambda hemis_id, role: f"{hemis_id} ({role})"
+
+
+# ----------------------------
+# ViewSet mixin
+# ----------------------------
+class ValuesListMixin:
+    """list() uchun tezkor yo'l. ?fields= yoki ?expand= bo'lsa odatiy serializer ishlatiladi."""
+    values_serializer_class = None
+
+    def use_values_serializer(self):
+        return (
+            self.values_serializer_class is not None
+            and requested_fields(self.request) is None
+            and requested_fields(self.request, 'expand') is None
+        )
+
+    def list(self, request, *args, **kwargs):
+        if not self.use_values_serializer():
+            return super().list(request, *args, **kwargs)
+        serializer = self.values_serializer_class(request)
+        rows = serializer.get_rows(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(serializer.to_representation(page))
+        return Response(serializer.to_representation(rows))
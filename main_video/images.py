@@ -0,0 +1,116 @@
+import io
+import posixpath
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from PIL import ExifTags, Image, ImageOps
+from rest_framework import serializers
+
+
+# ----------------------------
+# Sozlamalar (settings.py'da o'zgartirish mumkin)
+# ----------------------------
+DEFAULT_WIDTHS = (320, 640, 1280)
+WEBP_OPTIONS = {'quality': 80, 'method': 4}
+JPEG_OPTIONS = {'quality': 82, 'optimize': True, 'progressive': True}
+ROTATED_ORIENTATIONS = {5, 6, 7, 8}   # 90/270 gradusga buriladi: en va balandlik almashadi
+
+# o'qib bo'lmaydigan / buzilgan rasm (UnidentifiedImageError — OSError)
+IMAGE_ERRORS = (OSError, ValueError, Image.DecompressionBombError)
+
+
+def get_setting(name, default):
+    return getattr(settings, name, default)
+
+
+def target_widths(width):
+    """Asl rasmdan katta variant yasalmaydi; rasm eng kichik o'lchamdan ham kichik bo'lsa — o'z eni bilan bitta"""
+    widths = [target for target in get_setting('IMAGE_VARIANT_WIDTHS', DEFAULT_WIDTHS) if target < width]
+    return widths or [width]
+
+
+def variant_name(name, width, extension):
+    """category/photo.jpg -> category/variants/photo-320w.webp"""
+    directory, filename = posixpath.split(name)
+    stem = posixpath.splitext(filename)[0]
+    return posixpath.join(directory, 'variants', f'{stem}-{width}w.{extension}')
+
+
+def encode(image, image_format, options):
+    buffer = io.BytesIO()
+    image.save(buffer, image_format, **options)
+    return buffer.getvalue()
+
+
+def make_variants(storage, name):
+    """Belgilangan enlarda WebP va JPEG variantlar -> [{'width', 'webp', 'jpeg'}] (storage'dagi nomlar).
+    Katta JPEG draft() bilan decode paytida kichraytiriladi; har bir en oldingi (kattaroq) variantdan olinadi."""
+    with storage.open(name, 'rb') as file:
+        image = Image.open(file)
+        # telefon fotolari: EXIF orientation 5-8 — ko'rinadigan eni xom rasmning balandligi
+        rotated = image.getexif().get(ExifTags.Base.Orientation, 1) in ROTATED_ORIENTATIONS
+        width, height = (image.height, image.width) if rotated else image.size
+        widths = sorted(target_widths(width), reverse=True)
+        # JPEG: DCT darajasida 1/2..1/8 masshtab — ko'p megapikselli fotolar to'liq decode qilinmaydi
+        box = (widths[0], widths[0] * height // width)
+        image.draft('RGB', box[::-1] if rotated else box)
+        image = ImageOps.exif_transpose(image)
+        image.load()
+
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'transparency' in image.info or image.mode in ('LA', 'PA') else 'RGB')
+
+    variants = []
+    for width in widths:
+        height = max(1, round(image.height * width / image.width))
+        if image.width != width:
+            image = image.resize((width, height), Image.Resampling.LANCZOS, reducing_gap=3.0)
+        jpeg = image
+        if image.mode == 'RGBA':
+            # JPEG'da alfa yo'q: oq fonga
+            jpeg = Image.new('RGB', image.size, (255, 255, 255))
+            jpeg.paste(image, mask=image.getchannel('A'))
+        variants.append({
+            'width': width,
+            'webp': storage.save(variant_name(name, width, 'webp'), ContentFile(encode(image, 'WEBP', WEBP_OPTIONS))),
+            'jpeg': storage.save(variant_name(name, width, 'jpg'), ContentFile(encode(jpeg, 'JPEG', JPEG_OPTIONS))),
+        })
+    return sorted(variants, key=lambda variant: variant['width'])
+
+
+def delete_variants(storage, variants, keep=()):
+    keep = {name for variant in keep for name in (variant['webp'], variant['jpeg'])}
+    for variant in variants or ():
+        for name in (variant['webp'], variant['jpeg']):
+            if name not in keep:
+                storage.delete(name)
+
+
+# ----------------------------
+# Serializer maydoni
+# ----------------------------
+def url_builder(request, storage):
+    """nom -> FileField kabi absolute URL"""
+    if request is None:
+        return storage.url
+    absolute = request.build_absolute_uri
+    return lambda name: absolute(storage.url(name))
+
+
+def variants_representation(variants, build):
+    return [
+        {'width': variant['width'], 'webp': build(variant['webp']), 'jpeg': build(variant['jpeg'])}
+        for variant in variants or ()
+    ]
+
+
+class ImageVariantsField(serializers.Field):
+    """img_variants -> [{'width': 320, 'webp': url, 'jpeg': url}, ...] (en bo'yicha o'sib boradi, srcset uchun)"""
+
+    def __init__(self, **kwargs):
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        storage = self.parent.Meta.model._meta.get_field('img').storage
+        return variants_representation(value, url_builder(self.context.get('request'), storage))
@@ -0,0 +1,83 @@
+from .models import VideoProgress, VideoRating, RatingSummary
+
+
+EMPTY_PROGRESS = {
+    'is_completed': False,
+    'completed_at': None
+}
+
+
+class VideoStatsLoader:
+    """VideosSerializer uchun progress va rating'larni to'plab, bir martada yuklaydi.
+
+    Serializer avval kerakli video id'larni `prime` qiladi, birinchi so'ralganda
+    hammasi bitta VideoProgress, bitta RatingSummary va bitta VideoRating so'rovi bilan olinadi.
+    """
+
+    def __init__(self, user):
+        self.user = user if user is not None and user.is_authenticated else None
+        self._pending = set()
+        self._loaded = set()
+        self._progress = {}      # video_id -> {'is_completed', 'completed_at'}
+        self._average = {}       # video_id -> o'rtacha rating
+        self._user_rating = {}   # video_id -> userning o'z ratingi
+
+    def prime(self, video_ids):
+        self._pending.update(video_id for video_id in video_ids if video_id not in self._loaded)
+
+    def _load(self, video_id):
+        if video_id in self._loaded:
+            return
+        self._pending.add(video_id)
+        video_ids = list(self._pending)
+        self._pending.clear()
+        self._loaded.update(video_ids)
+
+        if self.user is not None:
+            rows = VideoProgress.objects.filter(
+                user=self.user,
+                video_id__in=video_ids
+            ).values_list('video_id', 'is_completed', 'completed_at')
+            for progress_video_id, is_completed, completed_at in rows:
+                self._progress[progress_video_id] = {
+                    'is_completed': is_completed,
+                    'completed_at': completed_at
+                }
+
+        # o'rtacha rating RatingSummary'dan (primary key bo'yicha)
+        for summary in RatingSummary.objects.filter(video_id__in=video_ids):
+            self._average[summary.video_id] = summary.average
+
+        if self.user is not None:
+            rows = VideoRating.objects.filter(
+                user=self.user,
+                video_id__in=video_ids
+            ).values_list('video_id', 'rating')
+            for rating_video_id, rating in rows:
+                self._user_rating[rating_video_id] = rating
+
+    # ----------------------------
+    # Natijalar
+    # ----------------------------
+    def progress(self, video_id):
+        self._load(video_id)
+        return dict(self._progress.get(video_id, EMPTY_PROGRESS))
+
+    def average_rating(self, video_id):
+        self._load(video_id)
+        return self._average.get(video_id, 0)
+
+    def user_rating(self, video_id):
+        self._load(video_id)
+        return self._user_rating.get(video_id) or 0
+
+
+def get_video_stats_loader(request):
+    """Request davomida bitta loader ishlatiladi (nested serializerlar ham)"""
+    if request is None:
+        return VideoStatsLoader(None)
+    loader = getattr(request, '_video_stats_loader', None)
+    if loader is None:
+        loader = VideoStatsLoader(request.user)
+        request._video_stats_loader = loader
+    return loader
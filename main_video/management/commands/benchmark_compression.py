@@ -0,0 +1,57 @@
+from time import perf_counter
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.test import APIClient
+
+from main_video.compression import available_encodings, compress
+from main_video.models import Users
+
+
+DEFAULT_URLS = [
+    '/api/category_main/',
+    '/api/course_main/',
+    '/api/categories/',
+    '/api/courses/',
+    '/api/section_one/',
+    '/swagger.json',
+]
+
+
+class Command(BaseCommand):
+    help = "Endpoint javoblari uchun gzip/brotli: tejalgan baytlar va bitta siqishning CPU vaqti"
+
+    def add_arguments(self, parser):
+        parser.add_argument('urls', nargs='*', help="Default: katalog endpointlari va OpenAPI schema")
+        parser.add_argument('--user', help="hemis_id (default: birinchi student)")
+        parser.add_argument('--repeat', type=int, default=5, help="Har bir siqish necha marta (eng yaxshisi olinadi)")
+
+    def handle(self, *args, **options):
+        users = Users.objects.all()
+        user = users.filter(hemis_id=options['user']).first() if options['user'] else users.filter(role='student').first()
+        if user is None:
+            raise CommandError("User topilmadi")
+        client = APIClient()
+        client.force_authenticate(user)
+
+        lines = [
+            "| endpoint | encoding | bytes | compressed | saved | ms |",
+            "|---|---|---:|---:|---:|---:|",
+        ]
+        for url in options['urls'] or DEFAULT_URLS:
+            # Accept-Encoding'siz: middleware siqmaydi, asl matn olinadi
+            response = client.get(url)
+            if response.status_code != 200:
+                self.stderr.write(f"{url}: {response.status_code}")
+                continue
+            content = b''.join(response.streaming_content) if response.streaming else response.content
+            for encoding in available_encodings():
+                timings = []
+                for _ in range(max(options['repeat'], 1)):
+                    start = perf_counter()
+                    compressed = compress(content, encoding)
+                    timings.append(perf_counter() - start)
+                saved = 1 - len(compressed) / len(content) if content else 0
+                lines.append(
+                    f"| {url} | {encoding} | {len(content)} | {len(compressed)} | {saved:.0%} | {min(timings) * 1000:.2f} |"
+                )
+        self.stdout.write("\n".join(lines))
@@ -0,0 +1,80 @@
+from time import perf_counter
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, reset_queries
+from django.test.utils import CaptureQueriesContext
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from main_video.models import Users, Section
+from main_video.serializers import (
+    CategoryWithCoursesSerializer, CategorySummarySerializer, CourseWithProgressSerializer,
+    CourseSummarySerializer, SectionWithAccessSerializer, SectionSummarySerializer
+)
+from main_video.views import (
+    category_tree_queryset, category_summary_queryset, course_tree_queryset,
+    course_summary_queryset, section_summary_queryset
+)
+
+
+def endpoints(user):
+    """(endpoint, oldingi list: to'liq daraxt, yangi list: summary)"""
+    return [
+        (
+            'categories',
+            (CategoryWithCoursesSerializer, lambda: category_tree_queryset(user)),
+            (CategorySummarySerializer, lambda: category_summary_queryset(user)),
+        ),
+        (
+            'courses',
+            (CourseWithProgressSerializer, lambda: course_tree_queryset(user)),
+            (CourseSummarySerializer, lambda: course_summary_queryset(user)),
+        ),
+        (
+            'sections',
+            (SectionWithAccessSerializer, lambda: Section.objects.all()),
+            (SectionSummarySerializer, lambda: section_summary_queryset(user)),
+        ),
+    ]
+
+
+def measure(serializer_class, queryset, user):
+    """(javob hajmi baytlarda, so'rovlar soni, sekund) — bitta list javobi"""
+    request = Request(APIRequestFactory().get('/'))
+    request.user = user
+    reset_queries()   # connection.queries to'lib qolsa CaptureQueriesContext 0 ko'rsatadi
+    with CaptureQueriesContext(connection) as context:
+        start = perf_counter()
+        data = serializer_class(queryset(), many=True, context={'request': request}).data
+        content = JSONRenderer().render(data)
+        elapsed = perf_counter() - start
+    return len(content), len(context.captured_queries), elapsed
+
+
+class Command(BaseCommand):
+    help = "List endpointlari: to'liq daraxt va yengil summary serializer'larni solishtirish (hajm, so'rovlar, vaqt)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help="hemis_id (default: birinchi student)")
+        parser.add_argument('--repeat', type=int, default=3, help="Har bir o'lchov necha marta (eng yaxshisi olinadi)")
+
+    def handle(self, *args, **options):
+        users = Users.objects.all()
+        user = users.filter(hemis_id=options['user']).first() if options['user'] else users.filter(role='student').first()
+        if user is None:
+            raise CommandError("User topilmadi")
+
+        lines = [
+            f"user: {user.hemis_id}",
+            "",
+            "| endpoint | mode | bytes | queries | ms |",
+            "|---|---|---:|---:|---:|",
+        ]
+        for name, *modes in endpoints(user):
+            for mode, (serializer_class, queryset) in zip(('tree', 'summary'), modes):
+                runs = [measure(serializer_class, queryset, user) for _ in range(max(options['repeat'], 1))]
+                size, queries = runs[0][:2]
+                elapsed = min(run[2] for run in runs)
+                lines.append(f"| {name} | {mode} | {size} | {queries} | {elapsed * 1000:.1f} |")
+        self.stdout.write("\n".join(lines))
@@ -0,0 +1,106 @@
+from time import perf_counter
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from main_video.models import Users, Category, Course, Section, Video, Missiya, Comment
+from main_video.views import CourseMainViewSet, SectionOneViewSet, CommentViewSet
+
+
+class Rollback(Exception):
+    pass
+
+
+def create_rows(count, user):
+    """count ta kurs, section (2 video + 1 missiya bilan) va comment"""
+    category = Category.objects.create(title='benchmark')
+    teacher = Users.objects.create(hemis_id='benchmark-teacher', username='benchmark-teacher', role='teacher')
+    courses = Course.objects.bulk_create([
+        Course(title=f'Kurs {index}', category=category, author='benchmark', small_description='tavsif ' * 10)
+        for index in range(count)
+    ], batch_size=5000)
+    Course.teacher.through.objects.bulk_create([
+        Course.teacher.through(course_id=course.id, users_id=teacher.id) for course in courses
+    ], batch_size=5000)
+    course = courses[0]
+    sections = Section.objects.bulk_create([
+        Section(title=f'Bo\'lim {index}', course=course, small_description='tavsif ' * 10, order=index)
+        for index in range(count)
+    ], batch_size=5000)
+    videos = Video.objects.bulk_create([
+        Video(title=f'Video {section.id}.{order}', section=section, video_file='videos/benchmark.mp4', order=order)
+        for section in sections for order in (1, 2)
+    ], batch_size=5000)
+    Missiya.objects.bulk_create([Missiya(section=section, description='vazifa') for section in sections], batch_size=5000)
+    Comment.objects.bulk_create([
+        Comment(user=user, video=videos[0], comment=f'izoh {index}') for index in range(count)
+    ], batch_size=5000)
+    return {'category': category.id, 'course': course.id, 'video': videos[0].id}
+
+
+def list_view(viewset_class, user, query):
+    request = Request(APIRequestFactory().get('/', query))
+    request.user = user
+    view = viewset_class(request=request, action='list', format_kwarg=None, args=(), kwargs={})
+    return view, request
+
+
+def run(render):
+    start = perf_counter()
+    content = render()
+    return content, perf_counter() - start
+
+
+class Command(BaseCommand):
+    help = (
+        "section_one, course_main va comments list'lari: DRF serializer va ValuesSerializer (fastpath) "
+        "vaqtini solishtirish. Ma'lumotlar tranzaksiyada yaratiladi va oxirida rollback qilinadi."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, nargs='+', default=[1000, 10000, 100000])
+        parser.add_argument('--repeat', type=int, default=3, help="Har bir o'lchov necha marta (eng yaxshisi olinadi)")
+
+    def handle(self, *args, **options):
+        renderer = JSONRenderer()
+        lines = [
+            "| endpoint | rows | serializer ms | values ms | x | bytes | identical |",
+            "|---|---:|---:|---:|---:|---:|---|",
+        ]
+        for count in options['rows']:
+            try:
+                with transaction.atomic():
+                    user = Users.objects.create(hemis_id='benchmark-user', username='benchmark-user', role='student')
+                    ids = create_rows(count, user)
+                    endpoints = [
+                        ('section_one', SectionOneViewSet, {'course': ids['course']}),
+                        ('course_main', CourseMainViewSet, {'category': ids['category']}),
+                        ('comments', CommentViewSet, {'video': ids['video']}),
+                    ]
+                    for name, viewset_class, query in endpoints:
+                        timings = {'serializer': [], 'values': []}
+                        for _ in range(max(options['repeat'], 1)):
+                            # har safar yangi request: access resolver va loader keshi qayta ishlatilmaydi
+                            view, request = list_view(viewset_class, user, query)
+                            queryset = view.filter_queryset(view.get_queryset())
+                            expected, elapsed = run(lambda: renderer.render(view.get_serializer(queryset, many=True).data))
+                            timings['serializer'].append(elapsed)
+
+                            view, request = list_view(viewset_class, user, query)
+                            queryset = view.filter_queryset(view.get_queryset())
+                            content, elapsed = run(lambda: renderer.render(
+                                view.values_serializer_class(request).serialize(queryset)
+                            ))
+                            timings['values'].append(elapsed)
+                        slow, fast = min(timings['serializer']), min(timings['values'])
+                        lines.append(
+                            f"| {name} | {count} | {slow * 1000:.0f} | {fast * 1000:.0f} | {slow / fast:.1f} "
+                            f"| {len(content)} | {'yes' if content == expected else 'NO'} |"
+                        )
+                    raise Rollback
+            except Rollback:
+                pass
+        self.stdout.write("\n".join(lines))
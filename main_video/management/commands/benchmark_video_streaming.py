@@ -0,0 +1,138 @@
+import http.client
+import os
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.core.servers.basehttp import ThreadedWSGIServer, WSGIRequestHandler, get_internal_wsgi_application
+from rest_framework_simplejwt.tokens import AccessToken
+
+from main_video.models import Users, Category, Course, Section, Video
+
+
+class QuietHandler(WSGIRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(int(len(values) * fraction), len(values) - 1)] if values else 0
+
+
+class Command(BaseCommand):
+    help = (
+        "/api/videos/<id>/stream/ ga ko'p parallel seek (Range so'rovlari): MB/s, req/s va kechikish. "
+        "Taqqoslash uchun Range'siz so'rov (avvalgi holat: har seek'da butun fayl) ham o'lchanadi. "
+        "Server shu process ichida (runserver'ning threaded WSGI serveri) ishga tushadi; "
+        "gunicorn/uWSGI'da bo'lak os.sendfile bilan yuboriladi va natija bundan yaxshi bo'ladi."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--video', type=int, help="Video id (default: vaqtinchalik fayl va video yaratiladi)")
+        parser.add_argument('--user', help="hemis_id (default: vaqtinchalik admin)")
+        parser.add_argument('--size', type=int, default=64, help="Vaqtinchalik fayl hajmi, MB")
+        parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 8, 32])
+        parser.add_argument('--requests', type=int, default=400, help="Har bir concurrency uchun so'rovlar soni")
+        parser.add_argument('--chunk', type=int, default=1024 * 1024, help="Bitta seek'da so'raladigan bayt")
+
+    def handle(self, *args, **options):
+        created = []
+        try:
+            video, user = self.prepare(options, created)
+            path = video.video_file.path
+            if not os.path.exists(path):
+                raise CommandError(f"Fayl topilmadi: {path}")
+            self.run(video, user, os.path.getsize(path), options)
+        finally:
+            for obj in reversed(created):
+                if isinstance(obj, str):
+                    os.remove(obj)
+                else:
+                    obj.delete()
+
+    def prepare(self, options, created):
+        if options['user']:
+            user = Users.objects.filter(hemis_id=options['user']).first()
+            if user is None:
+                raise CommandError("User topilmadi")
+        else:
+            user = Users.objects.create(hemis_id='benchmark-stream', username='benchmark-stream', role='admin')
+            created.append(user)
+        if options['video']:
+            video = Video.objects.filter(pk=options['video']).first()
+            if video is None:
+                raise CommandError("Video topilmadi")
+            return video, user
+
+        name = f'videos/benchmark-stream-{os.getpid()}.mp4'
+        path = os.path.join(settings.MEDIA_ROOT, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as file:
+            for _ in range(options['size']):
+                file.write(os.urandom(1024 * 1024))
+        created.append(path)
+        category = Category.objects.create(title='benchmark-stream')
+        created.append(category)   # kurs, section va video cascade bilan o'chadi
+        course = Course.objects.create(title='benchmark', category=category, author='benchmark', small_description='-')
+        section = Section.objects.create(title='benchmark', course=course, small_description='-')
+        return Video.objects.create(title='benchmark', section=section, video_file=name), user
+
+    def run(self, video, user, size, options):
+        server = ThreadedWSGIServer(('127.0.0.1', 0), QuietHandler)
+        server.set_app(get_internal_wsgi_application())
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        port = server.server_address[1]
+        url = f'/api/videos/{video.pk}/stream/'
+        token = str(AccessToken.for_user(user))
+        chunk = min(options['chunk'], size)
+
+        local = threading.local()
+
+        def fetch(byte_range):
+            connection = getattr(local, 'connection', None)
+            if connection is None:
+                connection = local.connection = http.client.HTTPConnection('127.0.0.1', port)
+            headers = {'Authorization': f'Bearer {token}', 'Accept': 'video/mp4'}
+            if byte_range:
+                headers['Range'] = 'bytes=%d-%d' % byte_range
+            start = perf_counter()
+            connection.request('GET', url, headers=headers)
+            response = connection.getresponse()
+            body = response.read()
+            if response.status not in (200, 206):
+                raise CommandError(f"{url}: {response.status} {body[:200]}")
+            return perf_counter() - start, len(body)
+
+        lines = [
+            f"video={video.pk} size={size / 1024 / 1024:.1f}MB chunk={chunk // 1024}KB",
+            "| mode | concurrency | requests | MB/s | req/s | p50 ms | p95 ms |",
+            "|---|---:|---:|---:|---:|---:|---:|",
+        ]
+        try:
+            for concurrency in options['concurrency']:
+                for mode in ('range', 'full'):
+                    # full: Range yo'q — avvalgi holatda har bir seek butun faylni qayta yuklardi
+                    count = options['requests'] if mode == 'range' else max(concurrency, options['requests'] // 20)
+                    ranges = [None] * count if mode == 'full' else [
+                        (offset, offset + chunk - 1)
+                        for offset in (random.randrange(0, size - chunk + 1) for _ in range(count))
+                    ]
+                    start = perf_counter()
+                    with ThreadPoolExecutor(concurrency) as pool:
+                        results = list(pool.map(fetch, ranges))
+                    elapsed = perf_counter() - start
+                    timings = [timing for timing, _ in results]
+                    total = sum(length for _, length in results)
+                    lines.append(
+                        f"| {mode} | {concurrency} | {count} | {total / elapsed / 1024 / 1024:.0f} "
+                        f"| {count / elapsed:.0f} | {percentile(timings, 0.5) * 1000:.1f} "
+                        f"| {percentile(timings, 0.95) * 1000:.1f} |"
+                    )
+        finally:
+            server.shutdown()
+            server.server_close()
+        self.stdout.write("\n".join(lines))
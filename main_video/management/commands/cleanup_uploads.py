@@ -0,0 +1,23 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from main_video.models import Upload
+from main_video.uploads import delete_upload
+
+
+class Command(BaseCommand):
+    help = "Tugallanmagan eski resumable yuklashlarni (va vaqtinchalik fayllarini) o'chiradi"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', type=int, default=24, help="Shundan eski tugallanmagan yuklashlar")
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(hours=options['hours'])
+        uploads = Upload.objects.filter(completed_at__isnull=True, created_at__lt=cutoff)
+        count = 0
+        for upload in uploads.iterator():
+            delete_upload(upload)
+            count += 1
+        self.stdout.write(self.style.SUCCESS(f"{count} ta yuklash o'chirildi"))
@@ -0,0 +1,80 @@
+from datetime import datetime, timezone
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Avg, Max, Q
+
+from main_video.models import Comment, Vazifa_bajarish, VideoProgress, VideoRating
+
+
+def hot_queries(user_id=1, video_id=1, video_ids=(1, 2, 3), section_id=1):
+    """Eng ko'p ishlatiladigan so'rovlar (access resolver, loader, mark_as_watched, comments, vazifalar)"""
+    cursor = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    return [
+        (
+            "VideoProgress: userning section videolari bo'yicha progressi (VideoAccessResolver, VideoStatsLoader)",
+            VideoProgress.objects.filter(user_id=user_id, video_id__in=video_ids)
+            .values_list('video_id', 'is_completed', 'completed_at'),
+        ),
+        (
+            "VideoProgress: (user, video, is_completed) — mark_as_watched qayta ko'rish",
+            VideoProgress.objects.filter(user_id=user_id, video_id=video_id, is_completed=True),
+        ),
+        (
+            "VideoRating: o'rtacha va userning ratingi (VideoStatsLoader)",
+            VideoRating.objects.filter(video_id__in=video_ids).values('video_id')
+            .annotate(avg_rating=Avg('rating'), user_rating=Max('rating', filter=Q(user_id=user_id))),
+        ),
+        (
+            "VideoRating: (video, user) — VideoRatingSerializer.create",
+            VideoRating.objects.filter(video_id=video_id, user_id=user_id),
+        ),
+        (
+            "Comment: video bo'yicha keyingi sahifa (CommentPagination, keyset)",
+            Comment.objects.filter(video_id=video_id)
+            .filter(Q(created_at__lte=cursor) & (Q(created_at__lt=cursor) | Q(id__lt=1000)))
+            .order_by('-created_at', '-id')[:11],
+        ),
+        (
+            "VideoRating: video bo'yicha keyingi sahifa (RatingPagination, keyset)",
+            VideoRating.objects.filter(video_id=video_id)
+            .filter(Q(created_at__lte=cursor) & (Q(created_at__lt=cursor) | Q(id__lt=1000)))
+            .order_by('-created_at', '-id')[:6],
+        ),
+        (
+            "Vazifa_bajarish: (missiya__section, user, is_approved) — update_section_progress",
+            Vazifa_bajarish.objects.filter(missiya__section_id=section_id, user_id=user_id, is_approved=True),
+        ),
+    ]
+
+
+class Command(BaseCommand):
+    help = "Hot so'rovlar uchun EXPLAIN (QUERY PLAN) hisobotini chiqarish"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', help="Hisobotni faylga yozish (masalan docs/query_plans.md)")
+
+    def handle(self, *args, **options):
+        lines = [
+            "# Hot query plans",
+            "",
+            f"`python manage.py explain_hot_queries --output docs/query_plans.md` ({connection.vendor}).",
+            "",
+        ]
+        scans = 0
+        for title, queryset in hot_queries():
+            plan = queryset.explain()
+            scans += sum(1 for row in plan.splitlines() if row.strip(' -|`').startswith('SCAN'))
+            lines += [f"## {title}", "", "```sql", str(queryset.query), "```", "", "```", plan, "```", ""]
+
+        report = "\n".join(lines)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                f.write(report)
+        else:
+            self.stdout.write(report)
+
+        if scans:
+            self.stderr.write(self.style.WARNING(f"{scans} ta to'liq jadval SCAN topildi"))
+        else:
+            self.stdout.write(self.style.SUCCESS("Barcha hot so'rovlar indeks ishlatadi"))
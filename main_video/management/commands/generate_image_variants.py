@@ -0,0 +1,34 @@
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+
+from django.core.management.base import BaseCommand
+
+from main_video.processing import IMAGE_MODELS, process_image, run_task
+
+
+class Command(BaseCommand):
+    help = (
+        "Category va Course rasmlari uchun WebP/JPEG variantlarni parallel yasaydi "
+        "(mavjud rasmlar uchun backfill). Pillow decode/resize/encode paytida GIL'ni bo'shatadi"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--model', choices=sorted(IMAGE_MODELS), nargs='+', default=sorted(IMAGE_MODELS))
+        parser.add_argument('--all', action='store_true', help="Variantlari borlarini ham qayta yasash")
+        parser.add_argument('--workers', type=int, default=4)
+
+    def handle(self, *args, **options):
+        tasks = []
+        for kind in options['model']:
+            queryset = IMAGE_MODELS[kind].objects.exclude(img='').exclude(img__isnull=True)
+            if not options['all']:
+                queryset = queryset.filter(img_variants=[])
+            tasks += [(kind, pk) for pk in queryset.order_by('id').values_list('id', flat=True)]
+
+        start = perf_counter()
+        with ThreadPoolExecutor(options['workers']) as pool:
+            for kind, pk in tasks:
+                pool.submit(run_task, process_image, kind, pk)
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(tasks)} ta rasm {perf_counter() - start:.1f}s'da qayta ishlandi ({options['workers']} worker)"
+        ))
@@ -0,0 +1,25 @@
+from time import perf_counter
+
+from django.core.management.base import BaseCommand, CommandError
+
+from main_video.openapi import generate_schema, schema_file, write_schema_file
+
+
+class Command(BaseCommand):
+    help = (
+        "OpenAPI schema'ni build/deploy vaqtida bir marta generatsiya qilib faylga yozadi. "
+        "/swagger.json shu faylni ETag bilan beradi, drf_yasg har so'rovda ishlamaydi."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', help="Default: settings.OPENAPI_SCHEMA_FILE")
+
+    def handle(self, *args, **options):
+        path = options['output'] or schema_file()
+        if not path:
+            raise CommandError("OPENAPI_SCHEMA_FILE sozlanmagan, --output bering")
+        start = perf_counter()
+        content = generate_schema()
+        elapsed = perf_counter() - start
+        write_schema_file(content, path)
+        self.stdout.write(self.style.SUCCESS(f"{path}: {len(content)} bytes, {elapsed * 1000:.0f} ms"))
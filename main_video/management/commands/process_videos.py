@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+
+from main_video.models import Video
+from main_video.processing import process_video
+
+
+class Command(BaseCommand):
+    help = (
+        "Videolar uchun duration/o'lcham/bitrate/hajm'ni fayldan o'qiydi va moov oxirida bo'lsa "
+        "faststart remux qiladi (mavjud videolar uchun bir martalik backfill)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help="Avval qayta ishlanganlarini ham")
+        parser.add_argument('--video', type=int, nargs='+', help="Faqat shu id'lar")
+
+    def handle(self, *args, **options):
+        videos = Video.objects.exclude(video_file='')
+        if options['video']:
+            videos = videos.filter(pk__in=options['video'])
+        elif not options['all']:
+            videos = videos.filter(processed_at__isnull=True)
+        done = skipped = 0
+        for video_id in videos.order_by('id').values_list('id', flat=True).iterator():
+            values = process_video(video_id)
+            if values is None:
+                skipped += 1
+                self.stderr.write(f"video={video_id}: fayl topilmadi")
+                continue
+            done += 1
+            if options['verbosity'] > 1:
+                self.stdout.write(
+                    f"video={video_id}: duration={values['duration']} "
+                    f"{values['width']}x{values['height']} bitrate={values['bitrate']}"
+                )
+        self.stdout.write(self.style.SUCCESS(f"{done} ta video qayta ishlandi, {skipped} ta o'tkazib yuborildi"))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from main_video.progress import rebuild_section_counters, rebuild_course_counters
+
+
+class Command(BaseCommand):
+    help = "SectionProgress va CourseProgress hisoblagichlarini manba jadvallardan qayta tiklash"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        with transaction.atomic():
+            # avval sectionlar, chunki kurs hisoblagichi SectionProgress'ga tayanadi
+            sections = rebuild_section_counters(batch_size=batch_size)
+            courses = rebuild_course_counters(batch_size=batch_size)
+        self.stdout.write(self.style.SUCCESS(
+            f"SectionProgress: {sections} ta, CourseProgress: {courses} ta qator yangilandi"
+        ))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from main_video.ratings import rebuild_rating_summaries
+
+
+class Command(BaseCommand):
+    help = "RatingSummary, CourseRatingSummary va CategoryRatingSummary'ni VideoRating'dan qayta tiklash"
+
+    def handle(self, *args, **options):
+        total = rebuild_rating_summaries()
+        self.stdout.write(self.style.SUCCESS(f"{total} ta summary qatori yaratildi"))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from main_video.search import rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = "Kurs va section qidiruv indeksini (SQLite FTS5) qayta tiklash"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            total = rebuild_search_index(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"{total} ta hujjat indekslandi"))
@@ -0,0 +1,37 @@
+# Generated by Django 6.0 on 2026-10-18 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main_video', '0014_remove_vazifa_bajarish_section_alter_missiya_section_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='video',
+            options={'ordering': ['order']},
+        ),
+        migrations.AddField(
+            model_name='courseprogress',
+            name='completed_sections',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='courseprogress',
+            name='total_sections',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='sectionprogress',
+            name='completed_videos',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='sectionprogress',
+            name='total_videos',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
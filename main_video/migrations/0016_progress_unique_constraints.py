@@ -0,0 +1,97 @@
+# Generated by Django 6.0 on 2026-10-18 10:41
+
+import math
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def merge_duplicates(model, key, merge):
+    """(user, key) bo'yicha takroriy qatorlarni birinchisiga birlashtirib, qolganlarini o'chirish"""
+    duplicates = (
+        model.objects.order_by().values('user_id', key)
+        .annotate(n=Count('id')).filter(n__gt=1)
+    )
+    for row in duplicates:
+        rows = list(model.objects.filter(user_id=row['user_id'], **{key: row[key]}).order_by('id'))
+        keep, extra = rows[0], rows[1:]
+        merge(keep, rows)
+        keep.save()
+        model.objects.filter(id__in=[obj.id for obj in extra]).delete()
+
+
+def merge_section_progress(keep, rows):
+    completed = [obj.completed_at for obj in rows if obj.completed_at]
+    keep.is_completed = any(obj.is_completed for obj in rows)
+    keep.completed_at = min(completed) if completed else None
+    keep.score_percent = max(obj.score_percent for obj in rows)
+
+
+def merge_course_progress(keep, rows):
+    completed = [obj.completed_at for obj in rows if obj.completed_at]
+    keep.is_completed = any(obj.is_completed for obj in rows)
+    keep.completed_at = min(completed) if completed else None
+    keep.progress_percent = max(obj.progress_percent for obj in rows)
+
+
+def recount(apps):
+    """Birlashtirilgan qatorlar uchun hisoblagichlarni qayta hisoblash (rebuild_progress_counters bilan bir xil)"""
+    Video = apps.get_model('main_video', 'Video')
+    VideoProgress = apps.get_model('main_video', 'VideoProgress')
+    Section = apps.get_model('main_video', 'Section')
+    SectionProgress = apps.get_model('main_video', 'SectionProgress')
+    CourseProgress = apps.get_model('main_video', 'CourseProgress')
+
+    totals = dict(Video.objects.order_by().values_list('section_id').annotate(n=Count('id')))
+    completed = {
+        (row['user_id'], row['video__section_id']): row['n']
+        for row in VideoProgress.objects.filter(is_completed=True).order_by()
+        .values('user_id', 'video__section_id').annotate(n=Count('id'))
+    }
+    rows = list(SectionProgress.objects.all())
+    for obj in rows:
+        obj.total_videos = totals.get(obj.section_id, 0)
+        obj.completed_videos = completed.get((obj.user_id, obj.section_id), 0)
+    SectionProgress.objects.bulk_update(rows, ['total_videos', 'completed_videos'], batch_size=1000)
+
+    totals = dict(Section.objects.order_by().values_list('course_id').annotate(n=Count('id')))
+    completed = {
+        (row['user_id'], row['section__course_id']): row['n']
+        for row in SectionProgress.objects.filter(is_completed=True).order_by()
+        .values('user_id', 'section__course_id').annotate(n=Count('id'))
+    }
+    rows = list(CourseProgress.objects.all())
+    for obj in rows:
+        obj.total_sections = totals.get(obj.course_id, 0)
+        obj.completed_sections = completed.get((obj.user_id, obj.course_id), 0)
+        if obj.total_sections:
+            obj.progress_percent = math.floor((obj.completed_sections / obj.total_sections) * 100)
+            obj.is_completed = obj.progress_percent == 100
+    CourseProgress.objects.bulk_update(
+        rows, ['total_sections', 'completed_sections', 'progress_percent', 'is_completed'], batch_size=1000
+    )
+
+
+def deduplicate_progress(apps, schema_editor):
+    merge_duplicates(apps.get_model('main_video', 'SectionProgress'), 'section_id', merge_section_progress)
+    merge_duplicates(apps.get_model('main_video', 'CourseProgress'), 'course_id', merge_course_progress)
+    recount(apps)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main_video', '0015_progress_counters'),
+    ]
+
+    operations = [
+        migrations.RunPython(deduplicate_progress, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='courseprogress',
+            constraint=models.UniqueConstraint(fields=('user', 'course'), name='unique_course_progress'),
+        ),
+        migrations.AddConstraint(
+            model_name='sectionprogress',
+            constraint=models.UniqueConstraint(fields=('user', 'section'), name='unique_section_progress'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 6.0 on 2026-10-18 11:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main_video', '0016_progress_unique_constraints'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['video', '-created_at'], name='comment_video_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vazifa_bajarish',
+            index=models.Index(fields=['user', 'is_approved', 'missiya'], name='vazifa_user_appr_missiya_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='videoprogress',
+            index=models.Index(fields=['user', 'video', 'is_completed'], name='videoprogress_user_video_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='videorating',
+            index=models.Index(fields=['video', 'user'], name='videorating_video_user_idx'),
+        ),
+    ]
@@ -0,0 +1,82 @@
+# Generated by Django 6.0 on 2026-10-18 12:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+
+
+def fill_rating_summaries(apps, schema_editor):
+    """Mavjud VideoRating'lardan summary'larni yaratish (rebuild_rating_summaries bilan bir xil)"""
+    VideoRating = apps.get_model('main_video', 'VideoRating')
+    groups = [
+        ('RatingSummary', 'video_id', 'video_id'),
+        ('CourseRatingSummary', 'course_id', 'video__section__course_id'),
+        ('CategoryRatingSummary', 'category_id', 'video__section__course__category_id'),
+    ]
+    aggregates = {'rating_count': Count('id'), 'rating_sum': Sum('rating')}
+    for star in range(1, 6):
+        aggregates[f'count_{star}'] = Count('id', filter=Q(rating=star))
+
+    for model_name, key, lookup in groups:
+        model = apps.get_model('main_video', model_name)
+        rows = VideoRating.objects.order_by().values(lookup).annotate(**aggregates)
+        model.objects.bulk_create([model(**{key: row.pop(lookup)}, **row) for row in rows], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main_video', '0017_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CategoryRatingSummary',
+            fields=[
+                ('rating_count', models.PositiveIntegerField(default=0)),
+                ('rating_sum', models.PositiveIntegerField(default=0)),
+                ('count_1', models.PositiveIntegerField(default=0)),
+                ('count_2', models.PositiveIntegerField(default=0)),
+                ('count_3', models.PositiveIntegerField(default=0)),
+                ('count_4', models.PositiveIntegerField(default=0)),
+                ('count_5', models.PositiveIntegerField(default=0)),
+                ('category', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='rating_summary', serialize=False, to='main_video.category')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='CourseRatingSummary',
+            fields=[
+                ('rating_count', models.PositiveIntegerField(default=0)),
+                ('rating_sum', models.PositiveIntegerField(default=0)),
+                ('count_1', models.PositiveIntegerField(default=0)),
+                ('count_2', models.PositiveIntegerField(default=0)),
+                ('count_3', models.PositiveIntegerField(default=0)),
+                ('count_4', models.PositiveIntegerField(default=0)),
+                ('count_5', models.PositiveIntegerField(default=0)),
+                ('course', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='rating_summary', serialize=False, to='main_video.course')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='RatingSummary',
+            fields=[
+                ('rating_count', models.PositiveIntegerField(default=0)),
+                ('rating_sum', models.PositiveIntegerField(default=0)),
+                ('count_1', models.PositiveIntegerField(default=0)),
+                ('count_2', models.PositiveIntegerField(default=0)),
+                ('count_3', models.PositiveIntegerField(default=0)),
+                ('count_4', models.PositiveIntegerField(default=0)),
+                ('count_5', models.PositiveIntegerField(default=0)),
+                ('video', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='rating_summary', serialize=False, to='main_video.video')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.RunPython(fill_rating_summaries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0 on 2026-10-18 12:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main_video', '0018_rating_summary'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='users',
+            name='progress_version',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
@@ -0,0 +1,82 @@
+# Generated by Django 6.0 on 2026-10-18 13:10
+
+from django.db import migrations, OperationalError
+
+
+# search.py'dagi qiymatlarning shu migratsiya paytidagi nusxasi (keyingi o'zgarishlar migratsiyaga ta'sir qilmasin)
+SEARCH_TABLES = {
+    'course': 'main_video_course_search',
+    'section': 'main_video_section_search',
+}
+CREATE_TABLE_SQL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS {table} USING fts5("
+    "title, body, tokenize='unicode61 remove_diacritics 2')"
+)
+DROP_TABLE_SQL = "DROP TABLE IF EXISTS {table}"
+
+
+def join_text(*parts):
+    return ' '.join(part for part in parts if part)
+
+
+def course_document(title, small_description, author, teachers):
+    return title, join_text(small_description, author, *teachers)
+
+
+def section_document(title, small_description, course_title, category_title):
+    return title, join_text(small_description, course_title, category_title)
+
+
+def create_search_index(apps, schema_editor):
+    """SQLite'da FTS5 jadvallarini yaratib to'ldirish (rebuild_search_index bilan bir xil).
+
+    Boshqa DB'da yoki FTS5'siz SQLite'da hech narsa qilinmaydi — qidiruv icontains'ga qaytadi.
+    """
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    cursor = schema_editor.connection.cursor()
+    try:
+        for table in SEARCH_TABLES.values():
+            cursor.execute(CREATE_TABLE_SQL.format(table=table))
+    except OperationalError:
+        return
+
+    Course = apps.get_model('main_video', 'Course')
+    Section = apps.get_model('main_video', 'Section')
+    courses = [
+        (course.id, *course_document(
+            course.title, course.small_description, course.author,
+            [teacher.username for teacher in course.teacher.all()]
+        ))
+        for course in Course.objects.prefetch_related('teacher')
+    ]
+    sections = [
+        (section.id, *section_document(
+            section.title, section.small_description, section.course.title, section.course.category.title
+        ))
+        for section in Section.objects.select_related('course__category')
+    ]
+    for kind, rows in (('course', courses), ('section', sections)):
+        if rows:
+            cursor.executemany(
+                f"INSERT INTO {SEARCH_TABLES[kind]} (rowid, title, body) VALUES (%s, %s, %s)", rows
+            )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    cursor = schema_editor.connection.cursor()
+    for table in SEARCH_TABLES.values():
+        cursor.execute(DROP_TABLE_SQL.format(table=table))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main_video', '0019_user_progress_version'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 6.0 on 2026-10-18 13:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main_video', '0020_search_index'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='comment',
+            name='comment_video_created_idx',
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['video', '-created_at', '-id'], name='comment_video_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='videorating',
+            index=models.Index(fields=['video', '-created_at', '-id'], name='videorating_video_created_idx'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 6.0 on 2026-10-18 14:30
+
+from django.db import migrations, models
+
+ORDER_GAP = 1024   # main_video.ordering.ORDER_GAP
+
+
+def renumber_orders(apps, schema_editor):
+    """Mavjud orderlarni joriy tartibda GAP qadam bilan qayta raqamlash (ordering.renumber kabi)"""
+    for model_name, parent in (('Section', 'course_id'), ('Video', 'section_id')):
+        model = apps.get_model('main_video', model_name)
+        changed, counters = [], {}
+        for row in model.objects.order_by(parent, 'order', 'id').only('id', 'order', parent).iterator(chunk_size=2000):
+            position = counters[getattr(row, parent)] = counters.get(getattr(row, parent), 0) + 1
+            if row.order != position * ORDER_GAP:
+                row.order = position * ORDER_GAP
+                changed.append(row)
+        model.objects.bulk_update(changed, ['order'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main_video', '0021_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='section',
+            index=models.Index(fields=['course', 'order', 'id'], name='section_course_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='video',
+            index=models.Index(fields=['section', 'order', 'id'], name='video_section_order_idx'),
+        ),
+        migrations.RunPython(renumber_orders, migrations.RunPython.noop),
+    ]
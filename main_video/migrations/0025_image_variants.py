@@ -0,0 +1,23 @@
+# Generated by Django 6.0 on 2026-10-18 16:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main_video', '0024_video_media_info'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='img_variants',
+            field=models.JSONField(blank=True, default=list, editable=False),
+        ),
+        migrations.AddField(
+            model_name='course',
+            name='img_variants',
+            field=models.JSONField(blank=True, default=list, editable=False),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 6.0 on 2026-10-18 17:00
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main_video', '0025_image_variants'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='videoprogress',
+            name='videoprogress_user_video_idx',
+        ),
+    ]
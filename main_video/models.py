@@ -1,7 +1,8 @@
+import uuid
+
 from django.contrib.auth.models import AbstractUser
 from django.db import models
 from django.core.validators import MinValueValidator, MaxValueValidator
-from django.db.models import Max
 from django.utils import timezone
 
 
@@ -27,6 +28,8 @@ class Users(AbstractUser):
         ('admin', 'Admin'),
     ]
     role = models.CharField(max_length=20, choices=ROLE_CHOICES, default='student')
+    # progress o'zgarganda oshadi: userga xos javoblarning ETag'i shundan olinadi
+    progress_version = models.PositiveIntegerField(default=0, editable=False)
 
     USERNAME_FIELD = 'hemis_id'
     REQUIRED_FIELDS = ['username']  # login qilish uchun boshqa required field
@@ -39,6 +42,8 @@ class Users(AbstractUser):
 class Category(models.Model):
     title = models.CharField(max_length=255)
     img = models.ImageField(upload_to="category/", null=True, blank=True)
+    # responsive variantlar (processing.py): [{'width', 'webp', 'jpeg'}]
+    img_variants = models.JSONField(default=list, blank=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -60,6 +65,7 @@ class Course(models.Model):
     )
     category = models.ForeignKey(Category, on_delete=models.CASCADE)
     img = models.ImageField(upload_to='courses/', null=True, blank=True)
+    img_variants = models.JSONField(default=list, blank=True, editable=False)
     author = models.CharField(max_length=255)
     video = models.FileField(upload_to='courses/', null=True, blank=True)
     is_blocked = models.BooleanField(default=False)
@@ -78,6 +84,14 @@ class CourseProgress(models.Model):
     progress_percent = models.PositiveSmallIntegerField(default=0)
     is_completed = models.BooleanField(default=False)
     completed_at = models.DateTimeField(null=True, blank=True)
+    # denormalized hisoblagichlar (rebuild_progress_counters bilan qayta tiklanadi)
+    completed_sections = models.PositiveIntegerField(default=0)
+    total_sections = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'course'], name='unique_course_progress'),
+        ]
 
 
 
@@ -93,11 +107,16 @@ class Section(models.Model):
 
     class Meta:
         ordering = ['order']
+        indexes = [
+            # kurs tuzilmasi va reorder: course bo'yicha, order, id tartibida
+            models.Index(fields=['course', 'order', 'id'], name='section_course_order_idx'),
+        ]
 
     def save(self, *args, **kwargs):
-        if not self.order:  # agar order bo‘sh bo‘lsa
-            last_order = Section.objects.filter(course=self.course).aggregate(max_order=Max('order'))['max_order']
-            self.order = (last_order or 0) + 1
+        if not self.order:  # agar order bo‘sh bo‘lsa — oxiriga, GAP qadam bilan (ordering.py)
+            from .ordering import next_order
+            from .structure import get_course_structure
+            self.order = next_order(get_course_structure(self.course_id).max_section_order())
         super().save(*args, **kwargs)
 
     def __str__(self):
@@ -110,6 +129,14 @@ class SectionProgress(models.Model):
     is_completed = models.BooleanField(default=False)
     completed_at = models.DateTimeField(null=True, blank=True)
     score_percent = models.FloatField(default=0)
+    # denormalized hisoblagichlar (rebuild_progress_counters bilan qayta tiklanadi)
+    completed_videos = models.PositiveIntegerField(default=0)
+    total_videos = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'section'], name='unique_section_progress'),
+        ]
 
 
 
@@ -129,6 +156,12 @@ class Vazifa_bajarish(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # update_section_progress / approve: missiya__section + user + is_approved
+            models.Index(fields=['user', 'is_approved', 'missiya'], name='vazifa_user_appr_missiya_idx'),
+        ]
+
 
 
 class Video(models.Model):
@@ -139,43 +172,44 @@ class Video(models.Model):
     is_blocked = models.BooleanField(default=True)
     order = models.PositiveIntegerField(default=0)
 
+    # fayldan o'qiladi (processing.py, yuklangandan keyin): sekund, piksel, bit/s, bayt
+    duration = models.FloatField(null=True, blank=True, editable=False)
+    width = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    height = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    bitrate = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    file_size = models.PositiveBigIntegerField(null=True, blank=True, editable=False)
+    processed_at = models.DateTimeField(null=True, blank=True, editable=False)
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['order']
+        indexes = [
+            models.Index(fields=['section', 'order', 'id'], name='video_section_order_idx'),
+        ]
 
     def __str__(self):
         return self.title
 
     def get_next_video(self):
-        return Video.objects.filter(section=self.section, order__gt=self.order).order_by('order').first()
+        from .structure import get_section_structure
+        structure = get_section_structure(self.section_id)
+        return structure.video(structure.next_video_id(self.section_id, self.order))
 
     def check_video_access(self, user):
-        # Admin va teacher uchun hamma ochiq
-        if user.role in ['admin', 'teacher']:
-            return True
-
-        section_videos = Video.objects.filter(section=self.section).order_by('order')
-        if not section_videos.exists():
-            return False
-
-        first_video = section_videos.first()
-        if self.id == first_video.id:
-            return True
-
-        if VideoProgress.objects.filter(user=user, video=self, is_completed=True).exists():
-            return True
-
-        previous_video = section_videos.filter(order__lt=self.order).order_by('-order').first()
-        if previous_video:
-            return VideoProgress.objects.filter(user=user, video=previous_video, is_completed=True).exists()
-        return False
+        # Qoidalar VideoAccessResolver ichida: butun section bitta o'tishda hisoblanadi
+        from .access import VideoAccessResolver
+        return VideoAccessResolver(user).has_access(self)
 
     def save(self, *args, **kwargs):
-        section_videos = Video.objects.filter(section=self.section).order_by('order')
-        first_video = section_videos.first()
-        if first_video and self.id == first_video.id:
+        from .structure import get_section_structure
+        structure = get_section_structure(self.section_id)
+        if not self.order:  # Section kabi: oxiriga, GAP qadam bilan
+            from .ordering import next_order
+            self.order = next_order(structure.max_video_order(self.section_id))
+        first_video_id = structure.first_video_id(self.section_id)
+        if first_video_id and self.id == first_video_id:
             self.is_blocked = False
         super().save(*args, **kwargs)
 
@@ -187,6 +221,7 @@ class VideoProgress(models.Model):
     completed_at = models.DateTimeField(null=True, blank=True)
 
     class Meta:
+        # (user, video) so'rovlari unique_together indeksidan foydalanadi
         unique_together = ('user', 'video')
 
     def __str__(self):
@@ -202,12 +237,58 @@ class VideoRating(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['video', 'user'], name='videorating_video_user_idx'),
+            # RatingPagination (keyset)
+            models.Index(fields=['video', '-created_at', '-id'], name='videorating_video_created_idx'),
+        ]
+
     def __str__(self):
         return f"{self.video.title} - {self.rating} ⭐"
 
 
 
 
+# ----------------------------
+# Rating summary (ratings.py orqali yangilanadi)
+# ----------------------------
+class RatingSummaryBase(models.Model):
+    rating_count = models.PositiveIntegerField(default=0)
+    rating_sum = models.PositiveIntegerField(default=0)
+    count_1 = models.PositiveIntegerField(default=0)
+    count_2 = models.PositiveIntegerField(default=0)
+    count_3 = models.PositiveIntegerField(default=0)
+    count_4 = models.PositiveIntegerField(default=0)
+    count_5 = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        abstract = True
+
+    @property
+    def average(self):
+        return round(self.rating_sum / self.rating_count, 2) if self.rating_count else 0
+
+    @property
+    def histogram(self):
+        return {star: getattr(self, f'count_{star}') for star in range(1, 6)}
+
+
+class RatingSummary(RatingSummaryBase):
+    video = models.OneToOneField(Video, on_delete=models.CASCADE, primary_key=True, related_name='rating_summary')
+
+    def __str__(self):
+        return f"{self.video_id} - {self.average} ⭐"
+
+
+class CourseRatingSummary(RatingSummaryBase):
+    course = models.OneToOneField(Course, on_delete=models.CASCADE, primary_key=True, related_name='rating_summary')
+
+
+class CategoryRatingSummary(RatingSummaryBase):
+    category = models.OneToOneField(Category, on_delete=models.CASCADE, primary_key=True, related_name='rating_summary')
+
+
 
 class Comment(models.Model):
     user = models.ForeignKey(Users, on_delete=models.CASCADE)
@@ -217,5 +298,34 @@ class Comment(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # CommentPagination (keyset): video bo'yicha (created_at, id) tartibida
+            models.Index(fields=['video', '-created_at', '-id'], name='comment_video_created_id_idx'),
+        ]
+
     def __str__(self):
         return f"{self.user.hemis_id} - {self.comment}"
+
+
+class Upload(models.Model):
+    """Resumable (tus uslubidagi) yuklash: bo'laklar vaqtinchalik faylga offset bo'yicha yoziladi,
+    tugagach fayl Video.video_file / Vazifa_bajarish.file ga rename bilan ulanadi (uploads.py)"""
+    KIND_CHOICES = [
+        ('video', 'Video'),
+        ('vazifa', 'Vazifa'),
+    ]
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(Users, on_delete=models.CASCADE, related_name='uploads')
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    target_id = models.PositiveBigIntegerField(null=True, blank=True)   # Video yoki Vazifa_bajarish id
+    filename = models.CharField(max_length=255)
+    length = models.PositiveBigIntegerField()
+    offset = models.PositiveBigIntegerField(default=0)
+    file = models.CharField(max_length=255, blank=True)   # ulangandan keyin storage'dagi nom
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.filename} ({self.offset}/{self.length})"
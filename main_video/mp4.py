@@ -0,0 +1,269 @@
+import bisect
+import os
+import struct
+import tempfile
+from collections import namedtuple
+
+
+# ----------------------------
+# Sozlamalar
+# ----------------------------
+COPY_CHUNK_SIZE = 1024 * 1024          # remux: mdat shu bo'laklar bilan ko'chiriladi (xotira o'zgarmaydi)
+MAX_MOOV_SIZE = 256 * 1024 * 1024      # moov xotiraga o'qiladi (odatda bir necha MB)
+
+# chunk offset jadvallarigacha bo'lgan yo'ldagi konteynerlar (boshqa boxlar o'zgarishsiz ko'chiriladi)
+CONTAINERS = {b'moov', b'trak', b'mdia', b'minf', b'stbl'}
+UINT32_MAX = 0xFFFFFFFF
+
+Box = namedtuple('Box', 'type offset size header')
+
+
+class MP4Error(ValueError):
+    pass
+
+
+# ----------------------------
+# Box o'qish
+# ----------------------------
+def read_boxes(file, size):
+    """Fayldagi yuqori darajali boxlar (faqat headerlar o'qiladi, mdat o'qilmaydi)"""
+    boxes, offset = [], 0
+    while offset + 8 <= size:
+        file.seek(offset)
+        box_size, box_type = struct.unpack('>I4s', file.read(8))
+        header = 8
+        if box_size == 1:
+            box_size, header = struct.unpack('>Q', file.read(8))[0], 16
+        elif box_size == 0:
+            # oxirgi box, fayl oxirigacha
+            box_size = size - offset
+        if box_size < header or offset + box_size > size:
+            raise MP4Error(f"Buzilgan box: {box_type!r} @ {offset}")
+        boxes.append(Box(box_type, offset, box_size, header))
+        offset += box_size
+    return boxes
+
+
+def child_boxes(data, start=0, end=None):
+    """Xotiradagi (moov ichidagi) boxlar"""
+    end = len(data) if end is None else end
+    offset = start
+    while offset + 8 <= end:
+        box_size, box_type = struct.unpack_from('>I4s', data, offset)
+        header = 8
+        if box_size == 1:
+            box_size, header = struct.unpack_from('>Q', data, offset + 8)[0], 16
+        elif box_size == 0:
+            box_size = end - offset
+        if box_size < header or offset + box_size > end:
+            raise MP4Error(f"Buzilgan box: {box_type!r}")
+        yield Box(box_type, offset, box_size, header)
+        offset += box_size
+
+
+def find_child(data, box, box_type):
+    for child in child_boxes(data, box.offset + box.header, box.offset + box.size):
+        if child.type == box_type:
+            return child
+    return None
+
+
+def read_moov(file, boxes):
+    moov = next((box for box in boxes if box.type == b'moov'), None)
+    if moov is None:
+        raise MP4Error("moov box topilmadi (MP4 emas yoki yuklash tugamagan)")
+    if moov.size > MAX_MOOV_SIZE:
+        raise MP4Error(f"moov juda katta: {moov.size}")
+    file.seek(moov.offset)
+    return moov, file.read(moov.size)
+
+
+# ----------------------------
+# Metadata
+# ----------------------------
+def parse_mvhd(data, box):
+    """-> (timescale, duration)"""
+    payload = box.offset + box.header
+    if data[payload] == 1:
+        return struct.unpack_from('>IQ', data, payload + 20)
+    return struct.unpack_from('>II', data, payload + 12)
+
+
+def track_info(data, trak):
+    """-> (handler, width, height): tkhd oxirgi 8 bayti — 16.16 fixed-point o'lcham"""
+    tkhd = find_child(data, trak, b'tkhd')
+    width = height = 0
+    if tkhd is not None and tkhd.size - tkhd.header >= 84:
+        width, height = struct.unpack_from('>II', data, tkhd.offset + tkhd.size - 8)
+    handler = None
+    mdia = find_child(data, trak, b'mdia')
+    hdlr = find_child(data, mdia, b'hdlr') if mdia is not None else None
+    if hdlr is not None and hdlr.size - hdlr.header >= 12:
+        handler = data[hdlr.offset + hdlr.header + 8:hdlr.offset + hdlr.header + 12]
+    return handler, width >> 16, height >> 16
+
+
+def probe(path):
+    """MP4 metadata: duration (sekund), width, height, bitrate (bit/s), size (bayt), faststart (moov mdat'dan oldin)"""
+    with open(path, 'rb') as file:
+        size = os.fstat(file.fileno()).st_size
+        boxes = read_boxes(file, size)
+        moov, data = read_moov(file, boxes)
+
+    moov_box = Box(b'moov', 0, len(data), moov.header)
+    duration = None
+    mvhd = find_child(data, moov_box, b'mvhd')
+    if mvhd is not None:
+        timescale, units = parse_mvhd(data, mvhd)
+        if timescale and units and units != UINT32_MAX:   # 0xFFFFFFFF — noma'lum davomiylik
+            duration = units / timescale
+
+    width = height = None
+    for trak in child_boxes(data, moov.header):
+        if trak.type != b'trak':
+            continue
+        handler, track_width, track_height = track_info(data, trak)
+        if handler == b'vide' and track_width and track_height:
+            width, height = track_width, track_height
+            break
+
+    first_mdat = next((box.offset for box in boxes if box.type == b'mdat'), None)
+    return {
+        'duration': duration,
+        'width': width,
+        'height': height,
+        'bitrate': int(size * 8 / duration) if duration else None,
+        'size': size,
+        'faststart': first_mdat is None or moov.offset < first_mdat,
+    }
+
+
+# ----------------------------
+# Faststart remux: moov boshiga, chunk offsetlari suriladi
+# ----------------------------
+def chunk_tables(data, box):
+    """moov ichidagi barcha stco/co64 boxlari"""
+    for child in child_boxes(data, box.offset + box.header, box.offset + box.size):
+        if child.type in CONTAINERS:
+            yield from chunk_tables(data, child)
+        elif child.type in (b'stco', b'co64'):
+            yield child
+
+
+def read_offsets(data, box):
+    payload = box.offset + box.header
+    count = struct.unpack_from('>I', data, payload + 4)[0]
+    item = 'I' if box.type == b'stco' else 'Q'
+    if payload + 8 + count * struct.calcsize(item) > box.offset + box.size:
+        raise MP4Error(f"Buzilgan {box.type.decode()}")
+    return struct.unpack_from(f'>{count}{item}', data, payload + 8)
+
+
+def make_box(box_type, payload):
+    return struct.pack('>I4s', 8 + len(payload), box_type) + payload
+
+
+def rebuild(data, box, relocate, co64):
+    """box'ni qayta yig'ish: stco/co64 offsetlari relocate() bilan, co64=True bo'lsa stco -> co64"""
+    if box.type in (b'stco', b'co64'):
+        offsets = [relocate(offset) for offset in read_offsets(data, box)]
+        version_flags = data[box.offset + box.header:box.offset + box.header + 4]
+        if box.type == b'co64' or co64:
+            return make_box(b'co64', version_flags + struct.pack(f'>I{len(offsets)}Q', len(offsets), *offsets))
+        return make_box(b'stco', version_flags + struct.pack(f'>I{len(offsets)}I', len(offsets), *offsets))
+    if box.type in CONTAINERS:
+        children = child_boxes(data, box.offset + box.header, box.offset + box.size)
+        return make_box(box.type, b''.join(rebuild(data, child, relocate, co64) for child in children))
+    return bytes(data[box.offset:box.offset + box.size])
+
+
+def faststart_layout(boxes, moov):
+    """Yangi tartib: birinchi mdat'gacha bo'lgan boxlar (ftyp, ...), moov, qolganlari.
+    moov allaqachon mdat'dan oldin bo'lsa — None"""
+    first_mdat = next((index for index, box in enumerate(boxes) if box.type == b'mdat'), None)
+    if first_mdat is None or boxes.index(moov) < first_mdat:
+        return None
+    if any(box.type == b'moof' for box in boxes):
+        # fragmented MP4: offsetlar moof'ga nisbatan, bu yerda remux qilinmaydi
+        return None
+    rest = [box for box in boxes[first_mdat:] if box is not moov]
+    return boxes[:first_mdat], rest
+
+
+def relocator(head, rest, moov_size):
+    """eski fayl offseti -> yangi fayldagi offset (qaysi box ichida bo'lsa, shu box siljishi bilan)"""
+    starts, shifts = [], []
+    position = 0
+    for box in head:
+        starts.append(box.offset)
+        shifts.append(position - box.offset)
+        position += box.size
+    position += moov_size
+    for box in rest:
+        starts.append(box.offset)
+        shifts.append(position - box.offset)
+        position += box.size
+    order = sorted(range(len(starts)), key=starts.__getitem__)
+    starts = [starts[index] for index in order]
+    shifts = [shifts[index] for index in order]
+    sizes = {box.offset: box.size for box in head + rest}
+
+    def relocate(offset):
+        index = bisect.bisect_right(starts, offset) - 1
+        if index < 0 or offset >= starts[index] + sizes[starts[index]]:
+            raise MP4Error(f"Chunk offset hech qaysi box ichida emas: {offset}")
+        return offset + shifts[index]
+    return relocate
+
+
+def copy_range(source, target, offset, length):
+    source.seek(offset)
+    while length > 0:
+        chunk = source.read(min(COPY_CHUNK_SIZE, length))
+        if not chunk:
+            raise MP4Error("Fayl kutilganidan qisqa")
+        target.write(chunk)
+        length -= len(chunk)
+
+
+def faststart(path):
+    """moov mdat'dan keyin bo'lsa faylni moov boshida qilib qayta yozadi (progressive playback).
+    mdat xotiraga o'qilmaydi: yangi fayl shu papkada bo'laklab yoziladi va os.replace bilan almashtiriladi.
+    Qayta yozilgan bo'lsa True"""
+    with open(path, 'rb') as source:
+        boxes = read_boxes(source, os.fstat(source.fileno()).st_size)
+        moov, data = read_moov(source, boxes)
+        layout = faststart_layout(boxes, moov)
+        if layout is None:
+            return False
+        head, rest = layout
+        moov_box = Box(b'moov', 0, len(data), moov.header)
+
+        # stco 32-bit: moov surilgandan keyin 4 GB'dan oshsa hammasi co64'ga o'tkaziladi (moov kattalashadi)
+        co64 = False
+        moov_size = len(rebuild(data, moov_box, lambda offset: offset, co64))
+        relocate = relocator(head, rest, moov_size)
+        tables = list(chunk_tables(data, moov_box))
+        if any(relocate(offset) > UINT32_MAX for box in tables if box.type == b'stco'
+               for offset in read_offsets(data, box)):
+            co64 = True
+            moov_size = len(rebuild(data, moov_box, lambda offset: offset, co64))
+            relocate = relocator(head, rest, moov_size)
+        new_moov = rebuild(data, moov_box, relocate, co64)
+
+        directory, name = os.path.split(path)
+        handle, temp = tempfile.mkstemp(prefix=f'.{name}.', suffix='.faststart', dir=directory)
+        try:
+            with os.fdopen(handle, 'wb') as target:
+                for box in head:
+                    copy_range(source, target, box.offset, box.size)
+                target.write(new_moov)
+                for box in rest:
+                    copy_range(source, target, box.offset, box.size)
+            # mkstemp 0600 yaratadi: nginx o'qiy olishi uchun asl ruxsatlar
+            os.chmod(temp, os.stat(path).st_mode & 0o7777)
+            os.replace(temp, path)
+        except BaseException:
+            os.remove(temp)
+            raise
+    return True
@@ -0,0 +1,177 @@
+import hashlib
+import json
+import logging
+from collections import OrderedDict
+from functools import lru_cache
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.urls import URLResolver, get_resolver
+from django.views.decorators.http import condition, require_safe
+from drf_yasg import openapi
+from drf_yasg.codecs import OpenAPICodecJson, yaml_sane_dump
+from drf_yasg.generators import OpenAPISchemaGenerator
+from drf_yasg.views import get_schema_view
+from rest_framework import permissions
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+logger = logging.getLogger(__name__)
+
+
+# ----------------------------
+# Swagger / Redoc konfiguratsiyasi
+# ----------------------------
+API_INFO = openapi.Info(
+    title="My Project API",
+    default_version='v1',
+    description="API documentation for my project",
+)
+
+# faqat swagger/redoc UI sahifalari uchun: UI schema'ni SPEC_URL (schema-json) dan oladi
+schema_view = get_schema_view(
+    API_INFO,
+    public=True,
+    permission_classes=(permissions.AllowAny,),
+)
+
+SCHEMA_PATH = '/swagger.json'
+
+
+# ----------------------------
+# URLconf hash
+# ----------------------------
+def iter_urlconf(patterns, prefix=''):
+    """(route, view) juftlari: include() ichidagilar ham, to'liq prefix bilan"""
+    for pattern in patterns:
+        route = prefix + str(pattern.pattern)
+        if isinstance(pattern, URLResolver):
+            yield from iter_urlconf(pattern.url_patterns, route)
+            continue
+        callback = pattern.callback
+        view = getattr(callback, 'cls', None) or getattr(callback, 'view_class', None) or callback
+        actions = sorted((getattr(callback, 'actions', None) or {}).items())
+        yield route, f"{view.__module__}.{view.__qualname__}", str(actions)
+
+
+@lru_cache(maxsize=None)
+def urlconf_hash(urlconf=None):
+    """URL'lar va ularning view'lari o'zgarsa — boshqa hash (eski schema fayli ishlatilmaydi)"""
+    digest = hashlib.sha1()
+    for item in iter_urlconf(get_resolver(urlconf).url_patterns):
+        digest.update("\t".join(item).encode())
+        digest.update(b"\n")
+    return digest.hexdigest()
+
+
+# ----------------------------
+# Schema generatsiyasi
+# ----------------------------
+def generate_schema():
+    """drf_yasg schema'si JSON baytlarda. request'dan mustaqil: host/schemes yozilmaydi,
+    Swagger UI so'rovni o'zi ochilgan host'ga yuboradi."""
+    request = Request(APIRequestFactory().get(SCHEMA_PATH))
+    generator = OpenAPISchemaGenerator(API_INFO)
+    schema = generator.get_schema(request=request, public=True)
+    schema.pop('host', None)
+    schema.pop('schemes', None)
+    return OpenAPICodecJson(validators=[]).encode(schema)
+
+
+def schema_file():
+    return getattr(settings, 'OPENAPI_SCHEMA_FILE', None)
+
+
+def write_schema_file(content, path=None):
+    """Schema va uning URLconf hash'i (yonidagi .urlconf faylda)"""
+    path = path or schema_file()
+    with open(path, 'wb') as file:
+        file.write(content)
+    with open(f'{path}.urlconf', 'w') as file:
+        file.write(urlconf_hash(settings.ROOT_URLCONF))
+    return path
+
+
+def read_schema_file(key):
+    path = schema_file()
+    if not path:
+        return None
+    try:
+        with open(f'{path}.urlconf') as file:
+            if file.read().strip() != key:
+                logger.warning("OpenAPI schema fayli eskirgan (%s), qayta generatsiya qilinadi", path)
+                return None
+        with open(path, 'rb') as file:
+            return file.read()
+    except FileNotFoundError:
+        return None
+
+
+# urlconf hash -> (content, etag); process ichidagi zaxira kesh
+_documents = {}
+
+
+def get_schema_document():
+    """Build/deploy vaqtida yozilgan fayl, bo'lmasa (yoki eskirgan bo'lsa) bir marta generatsiya"""
+    key = urlconf_hash(settings.ROOT_URLCONF)
+    document = _documents.get(key)
+    if document is None:
+        content = read_schema_file(key)
+        if content is None:
+            content = generate_schema()
+        document = _documents[key] = (content, hashlib.sha1(content).hexdigest())
+    return document
+
+
+# json etag -> (content, etag)
+_yaml_documents = {}
+
+
+def get_yaml_document():
+    """Shu schema YAML ko'rinishida (JSON hujjatdan bir marta o'giriladi)"""
+    content, etag = get_schema_document()
+    document = _yaml_documents.get(etag)
+    if document is None:
+        data = json.loads(content, object_pairs_hook=OrderedDict)
+        document = _yaml_documents[etag] = (yaml_sane_dump(data, binary=True), f'{etag}-yaml')
+    return document
+
+
+def schema_etag(request):
+    return get_schema_document()[1]
+
+
+def yaml_etag(request):
+    return get_yaml_document()[1]
+
+
+# ----------------------------
+# View
+# ----------------------------
+@require_safe
+@condition(etag_func=schema_etag)
+def schema_json(request):
+    """Tayyor schema: strong ETag, If-None-Match -> 304, har safar qayta tekshirish (no-cache)"""
+    response = HttpResponse(get_schema_document()[0], content_type='application/json')
+    response['Cache-Control'] = 'public, no-cache'
+    return response
+
+
+@require_safe
+@condition(etag_func=yaml_etag)
+def schema_yaml(request):
+    response = HttpResponse(get_yaml_document()[0], content_type='application/yaml')
+    response['Cache-Control'] = 'public, no-cache'
+    return response
+
+
+def schema_ui(renderer):
+    """swagger/redoc sahifasi. UI schema'ni SPEC_URL'dan oladi; eski '?format=openapi' havolalari
+    ham tayyor schema'ga yo'naltiriladi (drf_yasg har so'rovda qayta generatsiya qilmasin)."""
+    ui_view = schema_view.with_ui(renderer, cache_timeout=0)
+
+    def view(request, *args, **kwargs):
+        if request.GET.get('format') == 'openapi':
+            return schema_json(request)
+        return ui_view(request, *args, **kwargs)
+    return view
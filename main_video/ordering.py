@@ -0,0 +1,148 @@
+from django.db import transaction
+
+from .caching import CONTENT, bump_version
+from .models import Section, Video
+from .structure import bump_structure_version
+
+
+# Orderlar orasida bo'sh joy: ikki element orasiga qo'yish (yoki oxiriga qo'shish) boshqa qatorlarni
+# qayta raqamlamaydi. Bo'sh joy tugaganda (qo'shni orderlar ketma-ket) butun ro'yxat qayta raqamlanadi.
+ORDER_GAP = 1024
+
+
+class ReorderError(ValueError):
+    pass
+
+
+# ----------------------------
+# Order hisoblash
+# ----------------------------
+def next_order(last_order):
+    """Oxiriga qo'shish: oxirgi orderdan keyingi GAP karralisi"""
+    return ((last_order or 0) // ORDER_GAP + 1) * ORDER_GAP
+
+
+def order_between(before, after):
+    """before va after orasidagi order (after None — oxiri). Joy bo'lmasa None"""
+    if after is None:
+        return next_order(before)
+    before = before or 0
+    if after - before < 2:
+        return None
+    return (before + after) // 2
+
+
+def gap_orders(count):
+    return [(index + 1) * ORDER_GAP for index in range(count)]
+
+
+# ----------------------------
+# Reorder (bitta tranzaksiya, bulk_update)
+# ----------------------------
+# model -> ota maydoni (order shu ota ichida)
+ORDERED = {
+    Section: 'course_id',
+    Video: 'section_id',
+}
+
+
+def locked_rows(model, parent_ids):
+    """Otalar ichidagi barcha qatorlar, ota va joriy tartib bo'yicha, qulflangan (parallel reorder kutadi)"""
+    parent = ORDERED[model]
+    return list(
+        model.objects.select_for_update()
+        .filter(**{f'{parent}__in': parent_ids})
+        .order_by(parent, 'order', 'id')
+        .only('id', 'order', parent)
+    )
+
+
+def save_orders(model, rows, orders):
+    changed = []
+    for row, order in zip(rows, orders):
+        if row.order != order:
+            row.order = order
+            changed.append(row)
+    if changed:
+        model.objects.bulk_update(changed, ['order'], batch_size=500)
+    return changed
+
+
+def orders_changed(model, rows):
+    """bulk_update signal chiqarmaydi: cache'lar shu yerda eskiradi. rows — yangi tartibda"""
+    transaction.on_commit(bump_structure_version)
+    transaction.on_commit(lambda: bump_version(CONTENT))
+    if model is Video:
+        # Video.save kabi: sectiondagi birinchi video doim ochiq
+        first = {}
+        for row in sorted(rows, key=lambda row: (row.order, row.id)):
+            first.setdefault(row.section_id, row.id)
+        Video.objects.filter(pk__in=first.values(), is_blocked=True).update(is_blocked=False)
+
+
+def reorder(model, parent_id, ids):
+    """ids — yangi tartib. Ro'yxatda yo'q qatorlar eski tartibida oxirida qoladi.
+    Hammasi GAP qadam bilan qayta raqamlanadi; o'zgargan qatorlar bitta bulk_update bilan yoziladi."""
+    if len(set(ids)) != len(ids):
+        raise ReorderError("id'lar takrorlanmasligi kerak")
+    with transaction.atomic():
+        rows = locked_rows(model, [parent_id])
+        by_id = {row.id: row for row in rows}
+        unknown = [pk for pk in ids if pk not in by_id]
+        if unknown:
+            raise ReorderError(f"Bu id'lar {model.__name__.lower()} ro'yxatida yo'q: {unknown}")
+        listed = set(ids)
+        rows = [by_id[pk] for pk in ids] + [row for row in rows if row.id not in listed]
+        changed = save_orders(model, rows, gap_orders(len(rows)))
+        if changed:
+            orders_changed(model, rows)
+    return [(row.id, row.order) for row in rows]
+
+
+def move(model, parent_id, pk, after_id=None):
+    """Bitta qatorni after_id'dan keyinga (None — boshiga) ko'chirish.
+    Odatda faqat shu qator yoziladi; qo'shnilar orasida joy qolmaganda butun ro'yxat qayta raqamlanadi."""
+    with transaction.atomic():
+        rows = locked_rows(model, [parent_id])
+        ids = [row.id for row in rows]
+        if pk not in ids or (after_id is not None and after_id not in ids) or pk == after_id:
+            raise ReorderError(f"{model.__name__.lower()} ro'yxatida bunday id yo'q")
+        rest = [row for row in rows if row.id != pk]
+        index = 0 if after_id is None else next(i for i, row in enumerate(rest) if row.id == after_id) + 1
+        before = rest[index - 1].order if index else 0
+        after = rest[index].order if index < len(rest) else None
+        order = order_between(before, after)
+        row = rows[ids.index(pk)]
+        rest.insert(index, row)
+        if order is None:
+            changed = save_orders(model, rest, gap_orders(len(rest)))
+        else:
+            changed = save_orders(model, [row], [order])
+        if changed:
+            orders_changed(model, rest)
+    return [(row.id, row.order) for row in rest]
+
+
+def renumber(model, parent_ids):
+    """Joriy tartibni saqlagan holda GAP qadam bilan qayta raqamlash (admin action).
+    Barcha otalar bitta so'rovda o'qiladi va bitta bulk_update bilan yoziladi."""
+    parent = ORDERED[model]
+    with transaction.atomic():
+        rows = locked_rows(model, parent_ids)
+        orders, positions = [], {}
+        for row in rows:
+            position = positions[getattr(row, parent)] = positions.get(getattr(row, parent), 0) + 1
+            orders.append(position * ORDER_GAP)
+        changed = save_orders(model, rows, orders)
+        if changed:
+            orders_changed(model, rows)
+    return len(changed)
+
+
+def can_reorder(user, course):
+    """admin, staff yoki kursning teacheri"""
+    if not user or not user.is_authenticated:
+        return False
+    if user.is_staff or user.role == 'admin':
+        return True
+    return course.teacher.filter(pk=user.pk).exists()
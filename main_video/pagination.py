@@ -0,0 +1,122 @@
+import base64
+import json
+from collections import OrderedDict
+from datetime import datetime
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """(created_at, id) bo'yicha cursor pagination: eng yangilari birinchi.
+
+    COUNT(*) va OFFSET yo'q — har qanday sahifa (video, created_at, id) indeksidan
+    birinchi sahifadek o'qiladi. next/previous linklari ikki tomonga ham ishlaydi.
+    """
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 50
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = "Noto'g'ri cursor"
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(page_size, 1), self.max_page_size)
+
+    # ----------------------------
+    # Cursor: {"t": created_at, "i": id, "r": orqaga}
+    # ----------------------------
+    @staticmethod
+    def encode_cursor(created_at, pk, reverse):
+        data = json.dumps({'t': created_at.isoformat(), 'i': pk, 'r': int(reverse)}, separators=(',', ':'))
+        return base64.urlsafe_b64encode(data.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            data = json.loads(base64.urlsafe_b64decode(encoded + '=' * (-len(encoded) % 4)))
+            return datetime.fromisoformat(data['t']), int(data['i']), bool(data['r'])
+        except (TypeError, ValueError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        page_size = self.get_page_size(request)
+        cursor = self.decode_cursor(request)
+        reverse = cursor is not None and cursor[2]
+
+        if cursor is None:
+            queryset = queryset.order_by('-created_at', '-id')
+        elif reverse:
+            created_at, pk, _ = cursor
+            queryset = queryset.filter(
+                Q(created_at__gte=created_at) & (Q(created_at__gt=created_at) | Q(id__gt=pk))
+            ).order_by('created_at', 'id')
+        else:
+            created_at, pk, _ = cursor
+            # created_at__lte alohida: indeksda shu joydan boshlab o'qiladi (OR bo'lsa boshidan skan qilinadi)
+            queryset = queryset.filter(
+                Q(created_at__lte=created_at) & (Q(created_at__lt=created_at) | Q(id__lt=pk))
+            ).order_by('-created_at', '-id')
+
+        # bitta ortiqcha qator: keyingi sahifa bormi
+        rows = list(queryset[:page_size + 1])
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        if reverse:
+            rows.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, cursor is not None
+
+        self.page = rows
+        return rows
+
+    @staticmethod
+    def row_key(row):
+        if isinstance(row, dict):   # .values() qatori (fastpath.ValuesListMixin)
+            return row['created_at'], row['id']
+        return row.created_at, row.pk
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return replace_query_param(
+            self.request.build_absolute_uri(), self.cursor_query_param,
+            self.encode_cursor(*self.row_key(self.page[-1]), reverse=False)
+        )
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.request.build_absolute_uri(), self.cursor_query_param)
+        return replace_query_param(
+            self.request.build_absolute_uri(), self.cursor_query_param,
+            self.encode_cursor(*self.row_key(self.page[0]), reverse=True)
+        )
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
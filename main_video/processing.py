@@ -0,0 +1,136 @@
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .caching import CONTENT, bump_version
+from .images import IMAGE_ERRORS, delete_variants, make_variants
+from .models import Category, Course, Video
+from .mp4 import MP4Error, faststart, probe
+
+logger = logging.getLogger(__name__)
+
+
+# ----------------------------
+# Sozlamalar (settings.py'da o'zgartirish mumkin)
+# ----------------------------
+DEFAULT_WORKERS = 2
+DEFAULT_ASYNC = True     # False: commitdan keyin shu thread'da (testlar, management command)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_setting(name, default):
+    return getattr(settings, name, default)
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    get_setting('MEDIA_PROCESSING_WORKERS', DEFAULT_WORKERS), thread_name_prefix='media-processing'
+                )
+    return _executor
+
+
+def run_task(func, *args):
+    try:
+        func(*args)
+    except Exception:
+        logger.exception("%s%r bajarilmadi", func.__name__, args)
+    finally:
+        # worker thread'ning o'z DB ulanishi
+        connections.close_all()
+
+
+def schedule(func, *args):
+    """Og'ir ishni commitdan keyin fon thread'ida bajarish: so'rov (admin, upload PATCH) kutib qolmaydi"""
+    def submit():
+        if get_setting('MEDIA_PROCESSING_ASYNC', DEFAULT_ASYNC):
+            get_executor().submit(run_task, func, *args)
+        else:
+            func(*args)
+    transaction.on_commit(submit)
+
+
+# ----------------------------
+# Video: metadata va faststart
+# ----------------------------
+def process_video(video_id):
+    """moov oxirida bo'lsa faststart remux, so'ng duration/o'lcham/bitrate/hajm yoziladi.
+    MP4 bo'lmagan fayllar uchun faqat hajm. Fayl shu orada almashtirilgan bo'lsa natija yozilmaydi."""
+    video = Video.objects.filter(pk=video_id).only('id', 'video_file').first()
+    if video is None or not video.video_file:
+        return None
+    name = video.video_file.name
+    try:
+        path = video.video_file.path
+    except NotImplementedError:
+        # lokal bo'lmagan storage
+        return None
+
+    info = {'duration': None, 'width': None, 'height': None, 'bitrate': None}
+    try:
+        faststart(path)
+        info = probe(path)
+    except MP4Error as error:
+        logger.warning("Video %s (%s): MP4 o'qilmadi: %s", video_id, name, error)
+    except FileNotFoundError:
+        return None
+
+    values = {
+        'duration': info['duration'],
+        'width': info['width'],
+        'height': info['height'],
+        'bitrate': info['bitrate'],
+        'file_size': os.path.getsize(path),
+        'processed_at': timezone.now(),
+    }
+    # update(): signal yo'q (faylni qayta ishlash qayta ishga tushmaydi), cache versiyasi shu yerda
+    if Video.objects.filter(pk=video_id, video_file=name).update(**values):
+        transaction.on_commit(lambda: bump_version(CONTENT))
+    return values
+
+
+# ----------------------------
+# Rasm: responsive WebP/JPEG variantlar (images.py)
+# ----------------------------
+IMAGE_MODELS = {
+    'category': Category,
+    'course': Course,
+}
+
+
+def process_image(kind, pk):
+    """img uchun variantlarni yasaydi va img_variants'ga yozadi; eski variant fayllari o'chiriladi.
+    Rasm shu orada almashtirilgan bo'lsa yangi variantlar tashlab yuboriladi (keyingi task yozadi)."""
+    model = IMAGE_MODELS[kind]
+    instance = model.objects.filter(pk=pk).only('id', 'img', 'img_variants').first()
+    if instance is None:
+        return None
+    name = instance.img.name or ''
+    storage = instance.img.storage
+    variants = []
+    if name:
+        try:
+            variants = make_variants(storage, name)
+        except FileNotFoundError:
+            return None
+        except IMAGE_ERRORS as error:
+            logger.warning("%s %s (%s): rasm o'qilmadi: %s", kind, pk, name, error)
+
+    current = model.objects.filter(Q(img=name) if name else Q(img='') | Q(img__isnull=True), pk=pk)
+    if current.update(img_variants=variants):
+        transaction.on_commit(lambda: bump_version(CONTENT))
+        delete_variants(storage, instance.img_variants, keep=variants)
+    else:
+        delete_variants(storage, variants)
+    return variants
@@ -0,0 +1,222 @@
+import math
+
+from django.db import connection
+from django.db.models import Count, F
+
+from .models import Users, Video, VideoProgress, Section, SectionProgress, CourseProgress
+
+
+def progress_percent(completed, total):
+    return math.floor((completed / total) * 100) if total > 0 else 0
+
+
+def shift_counter(queryset, field, delta):
+    """Hisoblagichni F() bilan atomar o'zgartirish (0 dan pastga tushmaydi)"""
+    if delta < 0:
+        queryset = queryset.filter(**{f'{field}__gte': -delta})
+    return queryset.update(**{field: F(field) + delta})
+
+
+def bump_progress_version(user_id):
+    """Userning progress-ga bog'liq cache'langan javoblarini (ETag) eskirtirish"""
+    Users.objects.filter(pk=user_id).update(progress_version=F('progress_version') + 1)
+
+
+# ----------------------------
+# Bitta so'rovli upsert'lar (INSERT ... ON CONFLICT ... RETURNING)
+# ----------------------------
+# Faqat yangi yoki hali tugallanmagan qator uchun row qaytaradi: parallel so'rovlardan bittasi "yangi" bo'ladi
+VIDEO_PROGRESS_UPSERT = """
+    INSERT INTO {video_progress} (user_id, video_id, is_completed, completed_at)
+    VALUES (%s, %s, %s, %s)
+    ON CONFLICT (user_id, video_id) DO UPDATE
+        SET is_completed = excluded.is_completed, completed_at = excluded.completed_at
+        WHERE {video_progress}.is_completed = %s
+    RETURNING id
+"""
+
+# Odatiy holat: qator bor, bitta UPDATE ... RETURNING yetarli. total_videos = 0 — hali sanalmagan qator
+# (masalan vazifa yo'lida yaratilgan): o'sha so'rovning o'zida manba jadvallardan sanaladi
+SECTION_PROGRESS_INCREMENT = """
+    UPDATE {section_progress} SET
+        completed_videos = CASE
+            WHEN total_videos = 0 THEN (
+                SELECT COUNT(*) FROM {video_progress} vp INNER JOIN {video} v ON vp.video_id = v.id
+                WHERE vp.user_id = {section_progress}.user_id AND v.section_id = {section_progress}.section_id
+                    AND vp.is_completed = %s
+            )
+            ELSE completed_videos + 1
+        END,
+        total_videos = CASE
+            WHEN total_videos = 0 THEN (SELECT COUNT(*) FROM {video} v WHERE v.section_id = {section_progress}.section_id)
+            ELSE total_videos
+        END
+    WHERE user_id = %s AND section_id = %s
+    RETURNING id, is_completed, completed_at, completed_videos, total_videos
+"""
+
+# Qator yo'q: manba jadvallardan sanab yaratamiz, parallel so'rov ulgurgan bo'lsa +1
+SECTION_PROGRESS_UPSERT = """
+    INSERT INTO {section_progress} (user_id, section_id, is_completed, completed_at, score_percent,
+                                    completed_videos, total_videos)
+    VALUES (
+        %s, %s, %s, NULL, 0,
+        (SELECT COUNT(*) FROM {video_progress} vp INNER JOIN {video} v ON vp.video_id = v.id
+         WHERE vp.user_id = %s AND v.section_id = %s AND vp.is_completed = %s),
+        (SELECT COUNT(*) FROM {video} WHERE section_id = %s)
+    )
+    ON CONFLICT (user_id, section_id) DO UPDATE
+        SET completed_videos = {section_progress}.completed_videos + 1
+    RETURNING id, is_completed, completed_at, completed_videos, total_videos
+"""
+
+# total_sections = 0 — hali sanalmagan qator: sanaladi (section qatori shu tranzaksiyada yangilangan)
+COURSE_PROGRESS_SHIFT = """
+    UPDATE {course_progress} SET
+        completed_sections = CASE
+            WHEN total_sections = 0 THEN (
+                SELECT COUNT(*) FROM {section_progress} sp INNER JOIN {section} s ON sp.section_id = s.id
+                WHERE sp.user_id = {course_progress}.user_id AND s.course_id = {course_progress}.course_id
+                    AND sp.is_completed = %s
+            )
+            WHEN completed_sections + %s < 0 THEN 0
+            ELSE completed_sections + %s
+        END,
+        total_sections = CASE
+            WHEN total_sections = 0 THEN (SELECT COUNT(*) FROM {section} s WHERE s.course_id = {course_progress}.course_id)
+            ELSE total_sections
+        END
+    WHERE user_id = %s AND course_id = %s
+    RETURNING id, progress_percent, is_completed, completed_at, completed_sections, total_sections
+"""
+
+COURSE_PROGRESS_UPSERT = """
+    INSERT INTO {course_progress} (user_id, course_id, progress_percent, is_completed, completed_at,
+                                   completed_sections, total_sections)
+    VALUES (
+        %s, %s, 0, %s, NULL,
+        (SELECT COUNT(*) FROM {section_progress} sp INNER JOIN {section} s ON sp.section_id = s.id
+         WHERE sp.user_id = %s AND s.course_id = %s AND sp.is_completed = %s),
+        (SELECT COUNT(*) FROM {section} WHERE course_id = %s)
+    )
+    ON CONFLICT (user_id, course_id) DO UPDATE
+        SET completed_sections = CASE
+            WHEN {course_progress}.completed_sections + %s < 0 THEN 0
+            ELSE {course_progress}.completed_sections + %s
+        END
+    RETURNING id, progress_percent, is_completed, completed_at, completed_sections, total_sections
+"""
+
+TABLES = {
+    'video': Video,
+    'video_progress': VideoProgress,
+    'section': Section,
+    'section_progress': SectionProgress,
+    'course_progress': CourseProgress,
+}
+
+
+def _execute(sql, params):
+    tables = {name: connection.ops.quote_name(model._meta.db_table) for name, model in TABLES.items()}
+    with connection.cursor() as cursor:
+        cursor.execute(sql.format(**tables), params)
+        return cursor.fetchone()
+
+
+def mark_video_completed(user_id, video_id, completed_at):
+    """VideoProgress'ni tugallangan deb belgilaydi. Video birinchi marta tugallangan bo'lsa True"""
+    rewatched = VideoProgress.objects.filter(
+        user_id=user_id, video_id=video_id, is_completed=True
+    ).update(completed_at=completed_at)
+    if rewatched:
+        return False
+    completed_at = connection.ops.adapt_datetimefield_value(completed_at)
+    return _execute(VIDEO_PROGRESS_UPSERT, [user_id, video_id, True, completed_at, False]) is not None
+
+
+def upsert_section_video_completed(user_id, section_id):
+    """Section uchun completed_videos += 1 (qator bo'lmasa yaratiladi). (qator, yaratildimi) qaytaradi"""
+    row = _execute(SECTION_PROGRESS_INCREMENT, [True, user_id, section_id])
+    created = row is None
+    if created:
+        row = _execute(SECTION_PROGRESS_UPSERT, [
+            user_id, section_id, False, user_id, section_id, True, section_id
+        ])
+    section_progress = SectionProgress(
+        id=row[0], user_id=user_id, section_id=section_id, is_completed=bool(row[1]),
+        completed_at=_datetime(row[2]), completed_videos=row[3], total_videos=row[4],
+    )
+    return section_progress, created
+
+
+def upsert_course_section_delta(user_id, course_id, section_delta):
+    """Kurs uchun completed_sections += section_delta (qator bo'lmasa yaratiladi)"""
+    row = _execute(COURSE_PROGRESS_SHIFT, [True, section_delta, section_delta, user_id, course_id])
+    if row is None:
+        row = _execute(COURSE_PROGRESS_UPSERT, [
+            user_id, course_id, False, user_id, course_id, True, course_id, section_delta, section_delta
+        ])
+    return CourseProgress(
+        id=row[0], user_id=user_id, course_id=course_id, progress_percent=row[1], is_completed=bool(row[2]),
+        completed_at=_datetime(row[3]), completed_sections=row[4], total_sections=row[5],
+    )
+
+
+def _datetime(value):
+    # SQLite RETURNING matn qaytaradi, Postgres esa tayyor datetime
+    converter = getattr(connection.ops, 'convert_datetimefield_value', None)
+    if value is None or converter is None:
+        return value
+    return converter(value, None, connection)
+
+
+# ----------------------------
+# Hamma qatorlar uchun (rebuild_progress_counters buyrug'i)
+# ----------------------------
+def rebuild_section_counters(batch_size=1000):
+    totals = dict(Video.objects.order_by().values_list('section_id').annotate(n=Count('id')))
+    completed = {
+        (row['user_id'], row['video__section_id']): row['n']
+        for row in VideoProgress.objects.filter(is_completed=True).order_by()
+        .values('user_id', 'video__section_id').annotate(n=Count('id'))
+    }
+
+    changed = []
+    for section_progress in SectionProgress.objects.only('id', 'user_id', 'section_id', 'completed_videos', 'total_videos').iterator():
+        total_videos = totals.get(section_progress.section_id, 0)
+        completed_videos = completed.get((section_progress.user_id, section_progress.section_id), 0)
+        if (section_progress.total_videos, section_progress.completed_videos) != (total_videos, completed_videos):
+            section_progress.total_videos = total_videos
+            section_progress.completed_videos = completed_videos
+            changed.append(section_progress)
+
+    SectionProgress.objects.bulk_update(changed, ['total_videos', 'completed_videos'], batch_size=batch_size)
+    return len(changed)
+
+
+def rebuild_course_counters(batch_size=1000):
+    totals = dict(Section.objects.order_by().values_list('course_id').annotate(n=Count('id')))
+    completed = {
+        (row['user_id'], row['section__course_id']): row['n']
+        for row in SectionProgress.objects.filter(is_completed=True).order_by()
+        .values('user_id', 'section__course_id').annotate(n=Count('id'))
+    }
+
+    fields = ['total_sections', 'completed_sections', 'progress_percent', 'is_completed']
+    changed = []
+    for course_progress in CourseProgress.objects.only('id', 'user_id', 'course_id', *fields).iterator():
+        total_sections = totals.get(course_progress.course_id, 0)
+        completed_sections = completed.get((course_progress.user_id, course_progress.course_id), 0)
+        percent = progress_percent(completed_sections, total_sections)
+        values = (total_sections, completed_sections, percent, percent == 100)
+        if tuple(getattr(course_progress, field) for field in fields) != values:
+            for field, value in zip(fields, values):
+                setattr(course_progress, field, value)
+            changed.append(course_progress)
+
+    CourseProgress.objects.bulk_update(changed, fields, batch_size=batch_size)
+    # bulk_update signal chiqarmaydi
+    Users.objects.filter(pk__in={course_progress.user_id for course_progress in changed}).update(
+        progress_version=F('progress_version') + 1
+    )
+    return len(changed)
@@ -0,0 +1,157 @@
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+
+from .caching import RATINGS, bump_version
+from .models import (
+    Course, Section, Video, VideoRating, RatingSummary, CourseRatingSummary, CategoryRatingSummary
+)
+
+
+STARS = range(1, 6)
+SUMMARY_FIELDS = ['rating_count', 'rating_sum'] + [f'count_{star}' for star in STARS]
+
+
+def _rating_delta(old_rating, new_rating):
+    """Eski rating o'chirilib yangisi qo'shilganda summary maydonlari qanchaga o'zgaradi"""
+    delta = {
+        'rating_count': int(new_rating is not None) - int(old_rating is not None),
+        'rating_sum': (new_rating or 0) - (old_rating or 0),
+    }
+    if old_rating != new_rating:
+        if old_rating is not None:
+            delta[f'count_{old_rating}'] = -1
+        if new_rating is not None:
+            delta[f'count_{new_rating}'] = 1
+    return {field: value for field, value in delta.items() if value}
+
+
+def apply_rating_change(video_id, old_rating=None, new_rating=None):
+    """Video, uning kursi va kategoriyasi summary'larini bitta tranzaksiyada yangilash.
+
+    old_rating=None — yangi rating, new_rating=None — rating o'chirildi.
+    """
+    delta = _rating_delta(old_rating, new_rating)
+    if not delta:
+        return
+    row = Video.objects.filter(pk=video_id).values_list('section__course_id', 'section__course__category_id').first()
+    if row is None:
+        return
+    course_id, category_id = row
+
+    targets = [
+        (RatingSummary, 'video_id', video_id),
+        (CourseRatingSummary, 'course_id', course_id),
+        (CategoryRatingSummary, 'category_id', category_id),
+    ]
+    with transaction.atomic():
+        for model, key, value in targets:
+            model.objects.bulk_create([model(**{key: value})], ignore_conflicts=True)
+            model.objects.filter(**{key: value}).update(
+                **{field: F(field) + change for field, change in delta.items()}
+            )
+        transaction.on_commit(lambda: bump_version(RATINGS))
+
+
+def remove_video_from_rollups(video_id):
+    """Video o'chirilganda uning ratinglarini kurs va kategoriya summary'laridan ayirish"""
+    values = summary_values(RatingSummary.objects.filter(video_id=video_id))
+    row = Video.objects.filter(pk=video_id).values_list('section__course_id', 'section__course__category_id').first()
+    if not values or row is None:
+        return
+    shift_rollups(values, rollup_targets(*row), -1)
+    transaction.on_commit(lambda: bump_version(RATINGS))
+
+
+# ----------------------------
+# Ko'chirish: video boshqa sectionga, section boshqa kursga, kurs boshqa kategoriyaga
+# ----------------------------
+def summary_values(summaries):
+    """summary'lar yig'indisi -> {maydon: son} (nol bo'lmaganlari)"""
+    totals = summaries.aggregate(**{field: Sum(field) for field in SUMMARY_FIELDS})
+    return {field: value for field, value in totals.items() if value}
+
+
+def rollup_targets(course_id, category_id):
+    return [
+        (CourseRatingSummary, 'course_id', course_id),
+        (CategoryRatingSummary, 'category_id', category_id),
+    ]
+
+
+def section_targets(section_id):
+    row = Section.objects.filter(pk=section_id).values_list('course_id', 'course__category_id').first()
+    return rollup_targets(*(row or (None, None)))
+
+
+def course_targets(course_id):
+    category_id = Course.objects.filter(pk=course_id).values_list('category_id', flat=True).first()
+    return rollup_targets(course_id, category_id)
+
+
+def shift_rollups(values, targets, sign):
+    for model, key, value in targets:
+        if value is None:
+            continue
+        if sign > 0:
+            model.objects.bulk_create([model(**{key: value})], ignore_conflicts=True)
+        model.objects.filter(**{key: value}).update(
+            **{field: F(field) + sign * amount for field, amount in values.items()}
+        )
+
+
+def move_rollups(model, pk, old_parent_id, new_parent_id):
+    """model (Video/Section/Course) obyekti boshqa otaga ko'chdi: uning ratinglari eski kurs/kategoriya
+    rollup'laridan ayirilib yangisiga qo'shiladi (faqat o'zgargan rollup'lar)"""
+    if model is Video:
+        values = summary_values(RatingSummary.objects.filter(video_id=pk))
+        targets = section_targets
+    elif model is Section:
+        values = summary_values(RatingSummary.objects.filter(video__section_id=pk))
+        targets = course_targets
+    else:
+        values = summary_values(CourseRatingSummary.objects.filter(course_id=pk))
+
+        def targets(category_id):
+            return [(CategoryRatingSummary, 'category_id', category_id)]
+    if not values:
+        return
+    changed = [(old, new) for old, new in zip(targets(old_parent_id), targets(new_parent_id)) if old != new]
+    if not changed:
+        return
+    with transaction.atomic():
+        shift_rollups(values, [old for old, _ in changed], -1)
+        shift_rollups(values, [new for _, new in changed], 1)
+        transaction.on_commit(lambda: bump_version(RATINGS))
+
+
+# ----------------------------
+# Manba jadvaldan qayta tiklash (rebuild_rating_summaries buyrug'i)
+# ----------------------------
+def _aggregate():
+    fields = {
+        'rating_count': Count('id'),
+        'rating_sum': Sum('rating'),
+    }
+    for star in STARS:
+        fields[f'count_{star}'] = Count('id', filter=Q(rating=star))
+    return fields
+
+
+def rebuild_rating_summaries():
+    groups = [
+        (RatingSummary, 'video_id', 'video_id'),
+        (CourseRatingSummary, 'course_id', 'video__section__course_id'),
+        (CategoryRatingSummary, 'category_id', 'video__section__course__category_id'),
+    ]
+    total = 0
+    with transaction.atomic():
+        for model, key, lookup in groups:
+            rows = VideoRating.objects.order_by().values(lookup).annotate(**_aggregate())
+            model.objects.all().delete()
+            model.objects.bulk_create(
+                [model(**{key: row.pop(lookup)}, **row) for row in rows],
+                batch_size=1000
+            )
+            total += len(rows)
+        transaction.on_commit(lambda: bump_version(RATINGS))
+    return total
@@ -0,0 +1,92 @@
+from itertools import islice
+
+from django.http import StreamingHttpResponse
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:   # orjson o'rnatilmagan bo'lsa DRF'ning odatiy json renderi ishlaydi
+    orjson = None
+
+
+# ----------------------------
+# orjson renderer
+# ----------------------------
+class ORJSONRenderer(JSONRenderer):
+    """JSONRenderer bilan bir xil natija (compact, UTF-8, U+2028/U+2029 escape), lekin orjson bilan.
+
+    indent so'ralganda (masalan Accept: application/json; indent=4), UNICODE_JSON/COMPACT_JSON
+    o'chirilgan bo'lsa va orjson yo'q bo'lsa odatiy JSONRenderer ishlaydi.
+    """
+    options = orjson.OPT_UTC_Z if orjson else 0
+
+    def _default(self, obj):
+        # Decimal, lazy matnlar, QuerySet va h.k. — DRF encoder qoidalari bilan
+        return self.encoder_class().default(obj)
+
+    def use_orjson(self):
+        return orjson is not None and self.compact and not self.ensure_ascii and self.encoder_class is JSONEncoder
+
+    def dumps(self, data):
+        if not self.use_orjson():
+            return JSONRenderer.render(self, data)
+        content = orjson.dumps(data, default=self._default, option=self.options)
+        # JSONRenderer kabi: JavaScript'da satr ichida ruxsat etilmagan belgilar
+        return content.replace('\u2028'.encode(), b'\\u2028').replace('\u2029'.encode(), b'\\u2029')
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if not self.use_orjson() or self.get_indent(accepted_media_type or '', renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        return self.dumps(data)
+
+
+# ----------------------------
+# Streaming JSON (katta ro'yxatlar, eksport)
+# ----------------------------
+class StreamingJSONRenderer(ORJSONRenderer):
+    """Ro'yxatni element-element yozadi: '[' + item, item, ... + ']'. Xotirada faqat bitta chunk turadi."""
+
+    def stream(self, chunks):
+        """chunks — serializer.data ro'yxatlari (har biri bitta .iterator() chunk'i)"""
+        first = True
+        yield b'['
+        for items in chunks:
+            if not items:
+                continue
+            content = b','.join(self.dumps(item) for item in items)
+            yield content if first else b',' + content
+            first = False
+        yield b']'
+
+
+class StreamingListMixin:
+    """list() javobini StreamingHttpResponse bilan: queryset .iterator(chunk_size) orqali bo'lak-bo'lak
+    serializer qilinadi, shuning uchun jadval hajmidan qat'i nazar xotira o'zgarmas.
+
+    Faqat JSON so'ralganda va pagination bo'lmaganda ishlaydi (browsable API odatiy list()).
+    prefetch_related har bir chunk uchun alohida bajariladi.
+    """
+    stream_chunk_size = 500
+    stream_renderer_class = StreamingJSONRenderer
+
+    def use_streaming(self, request):
+        return self.paginator is None and getattr(request, 'accepted_renderer', None) is not None \
+            and request.accepted_renderer.format == 'json'
+
+    def list(self, request, *args, **kwargs):
+        if not self.use_streaming(request):
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        renderer = self.stream_renderer_class()
+        return StreamingHttpResponse(renderer.stream(self.iter_list_chunks(queryset)), content_type=renderer.media_type)
+
+    def iter_list_chunks(self, queryset):
+        rows = queryset.iterator(chunk_size=self.stream_chunk_size)
+        while True:
+            chunk = list(islice(rows, self.stream_chunk_size))
+            if not chunk:
+                return
+            yield self.get_serializer(chunk, many=True).data
@@ -0,0 +1,219 @@
+from django.conf import settings
+from django.db import connection
+from django.db.models import Case, When, Value, IntegerField
+from django.utils.module_loading import import_string
+from rest_framework import filters
+
+from .models import Course, Section
+
+
+SEARCH_LIMIT = 200  # qidiruv oynasiga eng relevant natijalar yetadi
+
+# har bir tur uchun alohida FTS5 jadval: rowid = obyekt id (o'chirish/yangilash indeks bo'yicha)
+SEARCH_TABLES = {
+    'course': 'main_video_course_search',
+    'section': 'main_video_section_search',
+}
+CREATE_TABLE_SQL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS {table} USING fts5("
+    "title, body, tokenize='unicode61 remove_diacritics 2')"
+)
+DROP_TABLE_SQL = "DROP TABLE IF EXISTS {table}"
+
+# bm25 ustun og'irliklari: title, body
+RANK_WEIGHTS = (10.0, 1.0)
+
+
+# ----------------------------
+# Hujjatlar (qaysi matn bo'yicha qidiriladi)
+# ----------------------------
+def join_text(*parts):
+    return ' '.join(part for part in parts if part)
+
+
+def course_document(title, small_description, author, teachers):
+    return title, join_text(small_description, author, *teachers)
+
+
+def section_document(title, small_description, course_title, category_title):
+    return title, join_text(small_description, course_title, category_title)
+
+
+def course_documents(queryset):
+    for course in queryset.prefetch_related('teacher'):
+        teachers = [teacher.username for teacher in course.teacher.all()]
+        yield (course.id, *course_document(course.title, course.small_description, course.author, teachers))
+
+
+def section_documents(queryset):
+    for section in queryset.select_related('course__category'):
+        yield (section.id, *section_document(
+            section.title, section.small_description, section.course.title, section.course.category.title
+        ))
+
+
+DOCUMENTS = {
+    'course': (Course, course_documents),
+    'section': (Section, section_documents),
+}
+
+
+# ----------------------------
+# Backendlar
+# ----------------------------
+class SearchBackend:
+    """Indeks yo'q: search() None qaytaradi va SearchFilter'ning odatiy icontains qidiruvi ishlaydi"""
+    stores_documents = False
+
+    def index(self, kind, documents):
+        pass
+
+    def remove(self, kind, ids):
+        pass
+
+    def clear(self, kind):
+        pass
+
+    def search(self, kind, terms, limit=SEARCH_LIMIT, queryset=None):
+        """Relevantlik tartibidagi id'lar. queryset berilsa (boshqa filterlar) — faqat uning ichidan, limit shundan keyin"""
+        return None
+
+
+class Fts5SearchBackend(SearchBackend):
+    """SQLite FTS5: so'zlar prefiksi bo'yicha, bm25 relevantligi tartibida"""
+    stores_documents = True
+
+    def index(self, kind, documents):
+        rows = list(documents)
+        if not rows:
+            return
+        self.remove(kind, [row[0] for row in rows])
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f"INSERT INTO {SEARCH_TABLES[kind]} (rowid, title, body) VALUES (%s, %s, %s)", rows
+            )
+
+    def remove(self, kind, ids):
+        ids = list(ids)
+        if not ids:
+            return
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {SEARCH_TABLES[kind]} WHERE rowid IN ({', '.join(['%s'] * len(ids))})", ids
+            )
+
+    def clear(self, kind):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {SEARCH_TABLES[kind]}")
+
+    @staticmethod
+    def match_query(terms):
+        # har bir so'z alohida prefiks-fraza: "kurs"* "mat"* (hammasi bo'lishi shart)
+        return ' '.join('"%s"*' % term.replace('"', '""') for term in terms if any(c.isalnum() for c in term))
+
+    def search(self, kind, terms, limit=SEARCH_LIMIT, queryset=None):
+        query = self.match_query(terms)
+        if not query:
+            return None
+        table = SEARCH_TABLES[kind]
+        restrict, params = '', [query]
+        if queryset is not None:
+            # ?category= va h.k. FTS so'rovining ichida: LIMIT filtrlangan natijalarga qo'llanadi
+            subquery, subquery_params = queryset.order_by().values('pk').query.sql_with_params()
+            restrict = f"AND rowid IN ({subquery}) "
+            params += subquery_params
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT rowid FROM {table} WHERE {table} MATCH %s {restrict}"
+                f"ORDER BY bm25({table}, {RANK_WEIGHTS[0]}, {RANK_WEIGHTS[1]}) LIMIT %s",
+                [*params, limit]
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+
+def fts5_available():
+    return connection.vendor == 'sqlite' and set(SEARCH_TABLES.values()) <= set(connection.introspection.table_names())
+
+
+_backend = None
+
+
+def get_search_backend():
+    """settings.SEARCH_BACKEND (dotted path) yoki SQLite'da FTS5, bo'lmasa indekssiz backend.
+
+    SQLite'da FTS5 jadvallari hali yo'q bo'lsa (0020 migratsiyasidan oldin) indekssiz backend cache'lanmaydi:
+    jadvallar paydo bo'lgach keyingi chaqiruv FTS5'ga o'tadi.
+    """
+    global _backend
+    if _backend is not None:
+        return _backend
+    path = getattr(settings, 'SEARCH_BACKEND', None)
+    if path:
+        _backend = import_string(path)()
+    elif fts5_available():
+        _backend = Fts5SearchBackend()
+    elif connection.vendor != 'sqlite':
+        _backend = SearchBackend()
+    else:
+        return SearchBackend()
+    return _backend
+
+
+# ----------------------------
+# Indeksni yangilash (signals.py, rebuild_search_index)
+# ----------------------------
+def update_index(kind, queryset):
+    backend = get_search_backend()
+    if backend.stores_documents:
+        backend.index(kind, DOCUMENTS[kind][1](queryset))
+
+
+def remove_from_index(kind, ids):
+    get_search_backend().remove(kind, ids)
+
+
+def rebuild_search_index(batch_size=1000):
+    backend = get_search_backend()
+    if not backend.stores_documents:
+        return 0
+    total = 0
+    for kind, (model, documents) in DOCUMENTS.items():
+        backend.clear(kind)
+        ids = list(model.objects.order_by('id').values_list('id', flat=True))
+        for start in range(0, len(ids), batch_size):
+            batch = ids[start:start + batch_size]
+            backend.index(kind, documents(model.objects.filter(pk__in=batch)))
+            total += len(batch)
+    return total
+
+
+# ----------------------------
+# DRF filterlar
+# ----------------------------
+class RankedSearchFilter(filters.SearchFilter):
+    """?search= ni view.search_index indeksidan qidirish, natija relevantlik tartibida.
+
+    Indeks bo'lmasa (boshqa DB yoki backend) search_fields bo'yicha odatiy qidiruv ishlaydi.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+        kind = getattr(view, 'search_index', None)
+        # oldingi filterlar (DjangoFilterBackend) qo'llangan bo'lsa qidiruv shu queryset ichida
+        restrict = queryset if queryset.query.has_filters() else None
+        ids = get_search_backend().search(kind, terms, queryset=restrict) if terms and kind else None
+        if ids is None:
+            return super().filter_queryset(request, queryset, view)
+        if not ids:
+            return queryset.none()
+        ranking = Case(*[When(pk=pk, then=Value(position)) for position, pk in enumerate(ids)], output_field=IntegerField())
+        return queryset.filter(pk__in=ids).annotate(search_rank=ranking).order_by('search_rank')
+
+
+class RelevanceOrderingFilter(filters.OrderingFilter):
+    """?ordering= berilmagan bo'lsa qidiruv natijasining relevantlik tartibini saqlaydi"""
+
+    def filter_queryset(self, request, queryset, view):
+        if 'search_rank' in queryset.query.annotations and not request.query_params.get(self.ordering_param):
+            return queryset
+        return super().filter_queryset(request, queryset, view)
@@ -1,5 +1,9 @@
 from rest_framework import serializers
+from rest_framework.fields import empty
+from rest_framework.permissions import SAFE_METHODS
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from main_video.images import ImageVariantsField
+from main_video.signed_media import SignedFilesMixin
 from main_video.models import (
     Users,
     Category,
@@ -32,6 +36,109 @@ class MyTokenObtainPairSerializer(TokenObtainPairSerializer):
         return data
 
 
+# ----------------------------
+# ?fields= va ?expand= (sparse fieldsets)
+# ----------------------------
+def parse_field_spec(value):
+    """'id,sections.title,sections.videos.id' -> {'id': None, 'sections': {'title': None, 'videos': {'id': None}}}
+
+    None — maydon to'liq (ichidagi hamma maydonlar bilan) kerak. Spec umuman bo'lmasa None.
+    """
+    if not value:
+        return None
+    spec = {}
+    for path in value.split(','):
+        parts = [part.strip() for part in path.split('.') if part.strip()]
+        if not parts:
+            continue
+        node = spec
+        for part in parts[:-1]:
+            if part in node and node[part] is None:
+                break   # maydon allaqachon to'liq so'ralgan
+            node = node.setdefault(part, {})
+        else:
+            node[parts[-1]] = None
+    return spec or None
+
+
+def requested_fields(request, param='fields'):
+    """View'lar uchun: prefetch'larni so'ralgan maydonlarga moslash"""
+    if request is None or request.method not in SAFE_METHODS:
+        return None
+    return parse_field_spec(request.query_params.get(param))
+
+
+def wants(spec, *names):
+    return spec is None or any(name in spec for name in names)
+
+
+def sub_spec(spec, name):
+    return None if spec is None else spec.get(name)
+
+
+class DynamicFieldsMixin:
+    """?fields=id,title,sections.title va ?expand=category.
+
+    So'ralmagan maydonlar serializer'dan olib tashlanadi — SerializerMethodField va nested
+    serializer'lar umuman hisoblanmaydi. Meta.expandable_fields'dagi maydonlar ?expand= bilan
+    id o'rniga nested obyekt bo'ladi. Metod ichida yaratilgan serializer'larga spec
+    **self.nested_options(name) orqali beriladi.
+    """
+
+    def __init__(self, *args, fields=empty, expand=empty, **kwargs):
+        self._field_spec = fields
+        self._expand_spec = expand
+        super().__init__(*args, **kwargs)
+
+    def _is_root(self):
+        return self.parent is None or (isinstance(self.parent, serializers.ListSerializer) and self.parent.parent is None)
+
+    def _specs(self):
+        if self._field_spec is empty or self._expand_spec is empty:
+            request = self.context.get('request') if self._is_root() else None
+            if self._field_spec is empty:
+                self._field_spec = requested_fields(request)
+            if self._expand_spec is empty:
+                self._expand_spec = requested_fields(request, 'expand')
+        return self._field_spec, self._expand_spec
+
+    def nested_options(self, name):
+        field_spec, expand_spec = self._specs()
+        return {'fields': sub_spec(field_spec, name), 'expand': sub_spec(expand_spec, name)}
+
+    def get_fields(self):
+        fields = super().get_fields()
+        field_spec, expand_spec = self._specs()
+
+        expandable = getattr(self.Meta, 'expandable_fields', {})
+        for name, nested in (expand_spec or {}).items():
+            if name in expandable and name in fields:
+                serializer_name, options = expandable[name]
+                serializer_class = globals()[serializer_name] if isinstance(serializer_name, str) else serializer_name
+                if issubclass(serializer_class, DynamicFieldsMixin):
+                    options = dict(options, fields=None, expand=nested)
+                fields[name] = serializer_class(read_only=True, **options)
+
+        if field_spec is not None:
+            for name in list(fields):
+                if name not in field_spec:
+                    del fields[name]
+            for name, nested in field_spec.items():
+                if nested is not None and name in fields:
+                    self._restrict(fields[name], nested)
+        return fields
+
+    @staticmethod
+    def _restrict(field, spec):
+        serializer = field.child if isinstance(field, serializers.ListSerializer) else field
+        if isinstance(serializer, DynamicFieldsMixin):
+            serializer._field_spec = spec
+        elif isinstance(serializer, serializers.Serializer):
+            for name in list(serializer.fields):
+                if name not in spec:
+                    serializer.fields.pop(name)
+
+
 # ----------------------------
 # User Serializer
 # ----------------------------
@@ -68,8 +175,10 @@ class UserSerializer(serializers.ModelSerializer):
 
 
 
+from django.db import transaction
 from rest_framework import serializers
 from main_video.models import Video, Comment, VideoRating, Users
+from main_video.ratings import apply_rating_change
 
 class CommentSerializer(serializers.ModelSerializer):
     user = serializers.StringRelatedField(read_only=True)  # userni hemid ko‘rsatadi
@@ -104,13 +213,28 @@ class VideoRatingSerializer(serializers.ModelSerializer):
         video = validated_data['video']
 
         # Agar user oldin rating bergan bo‘lsa, update qilamiz
-        obj, created = VideoRating.objects.update_or_create(
-            user=user,
-            video=video,
-            defaults={'rating': validated_data['rating']}
-        )
+        with transaction.atomic():
+            obj = VideoRating.objects.select_for_update().filter(user=user, video=video).first()
+            old_rating = obj.rating if obj else None
+            if obj:
+                obj.rating = validated_data['rating']
+                obj.save()
+            else:
+                obj = VideoRating.objects.create(user=user, video=video, rating=validated_data['rating'])
+            apply_rating_change(video.id, old_rating, obj.rating)
         return obj
 
+    def update(self, instance, validated_data):
+        old_video_id, old_rating = instance.video_id, instance.rating
+        with transaction.atomic():
+            instance = super().update(instance, validated_data)
+            if instance.video_id != old_video_id:
+                apply_rating_change(old_video_id, old_rating, None)
+                apply_rating_change(instance.video_id, None, instance.rating)
+            else:
+                apply_rating_change(instance.video_id, old_rating, instance.rating)
+        return instance
+
 
 
 
@@ -122,7 +246,7 @@ class VideoSerializer(serializers.ModelSerializer):
             'is_blocked', 'order', 'created_at', 'updated_at'
         ]
 
-class VazifaBajarishSerializer(serializers.ModelSerializer):
+class VazifaBajarishSerializer(SignedFilesMixin, serializers.ModelSerializer):
     class Meta:
         model = Vazifa_bajarish
         fields = ['id', 'file', 'description', 'score', 'is_approved', 'missiya', 'user', 'created_at']
@@ -152,7 +276,7 @@ class MissiyaSerializer(serializers.ModelSerializer):
 
 
 
-class MissiyaOneSerializer(serializers.ModelSerializer):
+class MissiyaOneSerializer(DynamicFieldsMixin, SignedFilesMixin, serializers.ModelSerializer):
 
     class Meta:
         model = Missiya
@@ -198,17 +322,24 @@ class CategorySerializer(serializers.ModelSerializer):
 
 
 
-class CategoryMainSerializer(serializers.ModelSerializer):
+class CategoryMainSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    img_variants = ImageVariantsField()
 
     class Meta:
         model = Category
-        fields = ['id', 'title', 'img', 'created_at', 'updated_at']
+        fields = ['id', 'title', 'img', 'img_variants', 'created_at', 'updated_at']
+
 
+class CourseMainSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    img_variants = ImageVariantsField()
 
-class CourseMainSerializer(serializers.ModelSerializer):
     class Meta:
         model = Course
         fields = "__all__"
+        expandable_fields = {
+            'category': ('CategoryMainSerializer', {}),
+            'teacher': ('UserSerializer', {'many': True}),
+        }
 # -----------------------------
 # COURSE PROGRESS SERIALIZER
 # -----------------------------
@@ -247,7 +378,12 @@ class VideoProgressSerializer(serializers.ModelSerializer):
 
 # serializers.py ga qo'shimcha
 
+from django.core.exceptions import ObjectDoesNotExist
+from django.db import models
 from django.utils import timezone
+from .access import get_access_resolver
+from .loaders import get_video_stats_loader
+from .progress import progress_percent
 
 
 class VideoAccessSerializer(serializers.Serializer):
@@ -257,7 +393,22 @@ class VideoAccessSerializer(serializers.Serializer):
     next_video_id = serializers.IntegerField(required=False)
 
 
-class VideosSerializer(serializers.ModelSerializer):
+class VideosListSerializer(serializers.ListSerializer):
+    """Barcha videolar id'larini loader'ga oldindan beradi (bitta so'rov uchun)"""
+
+    def to_representation(self, data):
+        videos = data.all() if isinstance(data, models.manager.BaseManager) else data
+        videos = list(videos)
+        request = self.context.get('request')
+        fields = self.child.fields
+        if request and request.user.is_authenticated and 'is_accessible' in fields:
+            get_access_resolver(request).load_sections({video.section_id for video in videos})
+        if {'user_progress', 'average_rating', 'user_rating'} & set(fields):
+            get_video_stats_loader(request).prime(video.id for video in videos)
+        return super().to_representation(videos)
+
+
+class VideosSerializer(DynamicFieldsMixin, SignedFilesMixin, serializers.ModelSerializer):
     is_accessible = serializers.SerializerMethodField()
     user_progress = serializers.SerializerMethodField()
     average_rating = serializers.SerializerMethodField()
@@ -272,6 +423,11 @@ class VideosSerializer(serializers.ModelSerializer):
             'section',
             'small_description',
             'order',
+            'duration',
+            'width',
+            'height',
+            'bitrate',
+            'file_size',
             'is_accessible',
             'user_progress',
             'average_rating',
@@ -279,13 +435,16 @@ class VideosSerializer(serializers.ModelSerializer):
             'created_at',
             'updated_at'
         ]
+        list_serializer_class = VideosListSerializer
+        # signed URL faqat video ochiq bo'lsa (stream endpointi bilan bir xil qoida)
+        extra_kwargs = {'video_file': {'access': 'get_is_accessible'}}
 
     # 🔓 Video ochiq yoki yopiq
     def get_is_accessible(self, obj):
         request = self.context.get('request')
         if not request or not request.user.is_authenticated:
             return False
-        return obj.check_video_access(request.user)
+        return get_access_resolver(request).has_access(obj)
 
     # 📊 User progress
     def get_user_progress(self, obj):
@@ -295,39 +454,47 @@ class VideosSerializer(serializers.ModelSerializer):
                 'is_completed': False,
                 'completed_at': None
             }
-
-        progress = VideoProgress.objects.filter(
-            user=request.user,
-            video=obj
-        ).first()
-
-        if not progress:
-            return {
-                'is_completed': False,
-                'completed_at': None
-            }
-
-        return {
-            'is_completed': progress.is_completed,
-            'completed_at': progress.completed_at
-        }
+        return get_video_stats_loader(request).progress(obj.id)
 
     # ⭐ O‘rtacha rating
     def get_average_rating(self, obj):
-        avg = VideoRating.objects.filter(video=obj).aggregate(avg_rating=Avg('rating'))['avg_rating']
-        return round(avg, 2) if avg else 0
+        return get_video_stats_loader(self.context.get('request')).average_rating(obj.id)
 
     # 👤 USERNING O‘ZI BERGAN RATING
     def get_user_rating(self, obj):
         request = self.context.get('request')
         if not request or not request.user.is_authenticated:
             return 0
+        return get_video_stats_loader(request).user_rating(obj.id)
+
+
+def prefetched(obj, name):
+    """prefetch_related bilan olingan ro'yxat (prefetch qilinmagan bo'lsa None)"""
+    return getattr(obj, '_prefetched_objects_cache', {}).get(name)
 
-        rating = VideoRating.objects.filter(video=obj, user=request.user).first()
-        return rating.rating if rating else 0
+
+def summary_average(obj):
+    """select_related('rating_summary') bo'lsa qo'shimcha so'rovsiz"""
+    try:
+        return obj.rating_summary.average
+    except ObjectDoesNotExist:
+        return 0
 
 
-class SectionWithAccessSerializer(serializers.ModelSerializer):
+def prime_course_access(request, courses):
+    """Prefetch qilingan kurslar videolari access'ini bitta progress so'rovi bilan hisoblash"""
+    if not request or not request.user.is_authenticated:
+        return
+    by_section = {}
+    for course in courses:
+        for section in prefetched(course, 'section_set') or []:
+            videos = prefetched(section, 'video_set')
+            if videos is not None:
+                by_section[section.id] = [(video.id, video.order) for video in videos]
+    get_access_resolver(request).prime_sections(by_section)
+
+
+class SectionWithAccessSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """User uchun bo'limdagi videolarni access bilan"""
     videos = VideosSerializer(many=True, read_only=True)
     accessible_videos_count = serializers.SerializerMethodField()
@@ -359,46 +526,68 @@ class SectionWithAccessSerializer(serializers.ModelSerializer):
         """User uchun ochiq videolar soni"""
         request = self.context.get('request')
         if request and request.user.is_authenticated:
-            count = 0
-            videos = Video.objects.filter(section=obj)
-            for video in videos:
-                if video.check_video_access(request.user):
-                    count += 1
-            return count
+            return sum(get_access_resolver(request).section_access(obj.id).values())
         return 0
 
     def get_total_videos_count(self, obj):
         """Jami videolar soni"""
+        videos = prefetched(obj, 'video_set')
+        if videos is not None:
+            return len(videos)
         return Video.objects.filter(section=obj).count()
 
-from django.db.models import Avg
 
-class CourseWithProgressSerializer(serializers.ModelSerializer):
+class CourseWithProgressListSerializer(serializers.ListSerializer):
+    def to_representation(self, data):
+        courses = list(data.all() if isinstance(data, models.manager.BaseManager) else data)
+        if self.child.needs_section_access():
+            prime_course_access(self.context.get('request'), courses)
+        return super().to_representation(courses)
+
+
+class CourseWithProgressSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """Kursni progress bilan birga, videolar o'rtacha rating bilan"""
     sections = serializers.SerializerMethodField()
     total_progress = serializers.SerializerMethodField()
     average_video_rating = serializers.SerializerMethodField()  # 🆕 yangi field
     teacher = UserSerializer(many=True, read_only=True)
+    img_variants = ImageVariantsField()
 
     class Meta:
         model = Course
         fields = [
-            'id', 'title', 'teacher', 'category', 'img', 'author',
+            'id', 'title', 'teacher', 'category', 'img', 'img_variants', 'author',
             'video', 'is_blocked', 'small_description', 'sections',
             'total_progress', 'average_video_rating',  # 🆕 qo‘shildi
             'created_at', 'updated_at'
         ]
+        list_serializer_class = CourseWithProgressListSerializer
+        expandable_fields = {
+            'category': ('CategoryMainSerializer', {}),
+        }
+
+    def needs_section_access(self):
+        fields = self._specs()[0]
+        return wants(fields, 'sections') and wants(sub_spec(fields, 'sections'), 'accessible_videos_count')
 
     def get_sections(self, obj):
-        """Kursning bo'limlari"""
+        """Kursning bo'limlari (course_tree_queryset bo'lsa prefetch'dan)"""
         request = self.context.get('request')
-        sections = Section.objects.filter(course=obj).order_by('order')
+        sections = prefetched(obj, 'section_set')
 
         if request and request.user.is_authenticated:
+            # butun kurs videolarining access'i bitta o'tishda
+            if sections is None:
+                sections = Section.objects.filter(course=obj).order_by('order')
+                if self.needs_section_access():
+                    get_access_resolver(request).load_course(obj.id)
+            elif self.needs_section_access():
+                prime_course_access(request, [obj])
             serializer = SectionWithAccessSerializer(
                 sections,
                 many=True,
-                context={'request': request}
+                context={'request': request},
+                **self.nested_options('sections')
             )
             return serializer.data
         return []
@@ -407,6 +596,9 @@ class CourseWithProgressSerializer(serializers.ModelSerializer):
         """Kurs bo'yicha umumiy progress"""
         request = self.context.get('request')
         if request and request.user.is_authenticated:
+            progress = getattr(obj, 'user_progress', None)  # Prefetch(..., to_attr='user_progress')
+            if progress is not None:
+                return progress[0].progress_percent if progress else 0
             try:
                 progress = CourseProgress.objects.get(
                     user=request.user,
@@ -418,14 +610,22 @@ class CourseWithProgressSerializer(serializers.ModelSerializer):
         return 0
 
     def get_average_video_rating(self, obj):
-        """Kursdagi barcha videolarning o'rtacha ratingini hisoblash"""
-        videos = Video.objects.filter(section__course=obj)
-        avg = videos.aggregate(avg_rating=Avg('ratings__rating'))['avg_rating']  # ✅ 'videorating' → 'ratings'
-        if avg is None:
-            return 0
-        return round(avg, 2)
+        """Kursdagi barcha videolarning o'rtacha ratingi (CourseRatingSummary'dan)"""
+        return summary_average(obj)
+
+
+class CategoryWithCoursesListSerializer(serializers.ListSerializer):
+    def to_representation(self, data):
+        categories = list(data.all() if isinstance(data, models.manager.BaseManager) else data)
+        if 'courses' in self.child.fields:
+            prime_course_access(
+                self.context.get('request'),
+                [course for category in categories for course in prefetched(category, 'course_set') or []]
+            )
+        return super().to_representation(categories)
+
 
-class CategoryWithCoursesSerializer(serializers.ModelSerializer):
+class CategoryWithCoursesSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     courses = serializers.SerializerMethodField()
     average_rating = serializers.SerializerMethodField()  # 🆕 qo‘shildi
 
@@ -434,29 +634,105 @@ class CategoryWithCoursesSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'title', 'img', 'courses', 'average_rating', 'created_at', 'updated_at'
         ]
+        list_serializer_class = CategoryWithCoursesListSerializer
 
     def get_courses(self, obj):
         request = self.context.get('request')
-        courses = Course.objects.filter(category=obj)
+        courses = prefetched(obj, 'course_set')
+        if courses is None:
+            courses = Course.objects.filter(category=obj)
 
         serializer = CourseWithProgressSerializer(
             courses,
             many=True,
-            context={'request': request}
+            context={'request': request},
+            **self.nested_options('courses')
         )
         return serializer.data
 
     def get_average_rating(self, obj):
-        videos = Video.objects.filter(section__course__category=obj)
-        avg = videos.aggregate(avg_rating=Avg('ratings__rating'))['avg_rating']
-        if avg is None:
-            return 0
-        return round(avg, 2)
+        return summary_average(obj)
+
+
+# ----------------------------
+# Ro'yxatlar uchun yengil serializer'lar: nested daraxtsiz, faqat sonlar va progress foizi
+# (annotatsiyalar views.py dagi *_summary_queryset'dan; to'liq daraxt faqat retrieve'da)
+# ----------------------------
+class SectionSummarySerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    videos_count = serializers.IntegerField(read_only=True)
+    completed_videos = serializers.IntegerField(read_only=True)
+    progress_percent = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Section
+        fields = [
+            'id', 'title', 'course', 'small_description', 'is_blocked', 'order',
+            'videos_count', 'completed_videos', 'progress_percent', 'created_at', 'updated_at'
+        ]
 
+    def get_progress_percent(self, obj):
+        return progress_percent(min(obj.completed_videos, obj.videos_count), obj.videos_count)
 
 
+class CourseSummarySerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    sections_count = serializers.IntegerField(read_only=True)
+    videos_count = serializers.IntegerField(read_only=True)
+    completed_sections = serializers.IntegerField(read_only=True)
+    total_progress = serializers.IntegerField(read_only=True)
+    average_video_rating = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Course
+        fields = [
+            'id', 'title', 'category', 'img', 'author', 'video', 'is_blocked', 'small_description',
+            'sections_count', 'videos_count', 'completed_sections', 'total_progress',
+            'average_video_rating', 'created_at', 'updated_at'
+        ]
+        expandable_fields = {
+            'category': ('CategoryMainSerializer', {}),
+        }
+
+    def get_average_video_rating(self, obj):
+        return summary_average(obj)
+
 
-class SectionOneSerializer(serializers.ModelSerializer):
+class CategorySummarySerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    courses_count = serializers.IntegerField(read_only=True)
+    total_progress = serializers.SerializerMethodField()
+    average_rating = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Category
+        fields = ['id', 'title', 'img', 'courses_count', 'total_progress', 'average_rating', 'created_at', 'updated_at']
+
+    def get_total_progress(self, obj):
+        """Kategoriyadagi kurslar progressining o'rtachasi (boshlanmagan kurslar 0%)"""
+        return obj.progress_sum // obj.courses_count if obj.courses_count else 0
+
+    def get_average_rating(self, obj):
+        return summary_average(obj)
+
+
+
+
+class SectionOneListSerializer(serializers.ListSerializer):
+    """Sahifadagi barcha sectionlar videolarini bitta o'tishda yuklash"""
+
+    def to_representation(self, data):
+        sections = list(data.all() if isinstance(data, models.manager.BaseManager) else data)
+        if 'videos' in self.child.fields:
+            request = self.context.get('request')
+            video_fields = set(self.child.fields['videos'].child.fields)
+            if request and request.user.is_authenticated and 'is_accessible' in video_fields:
+                get_access_resolver(request).load_sections([section.id for section in sections])
+            if {'user_progress', 'average_rating', 'user_rating'} & video_fields:
+                get_video_stats_loader(request).prime(
+                    video.id for section in sections for video in section.video_set.all()
+                )
+        return super().to_representation(sections)
+
+
+class SectionOneSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     videos = VideosSerializer(source='video_set', many=True, read_only=True)
     missiyalar = MissiyaOneSerializer(source='missiyas', many=True, read_only=True)  # ✅ FIX
 
@@ -478,6 +754,10 @@ class SectionOneSerializer(serializers.ModelSerializer):
             "videos",
             "missiyalar"
         ]
+        list_serializer_class = SectionOneListSerializer
+        expandable_fields = {
+            'course': ('CourseMainSerializer', {}),
+        }
 
 
 class VazifaSerializer(serializers.ModelSerializer):
@@ -0,0 +1,290 @@
+from django.db import transaction
+from django.db.models import QuerySet
+from django.db.models.signals import pre_save, post_save, post_delete, pre_delete, m2m_changed
+from django.dispatch import receiver
+
+from .caching import CONTENT, bump_version
+from .models import (
+    Video, VideoProgress, Section, SectionProgress, CourseProgress, Category, Course, Missiya, Users, Group,
+    Vazifa_bajarish, VideoRating
+)
+from .processing import process_image, process_video, schedule
+from .progress import shift_counter, bump_progress_version
+from .ratings import apply_rating_change, move_rollups, remove_video_from_rollups
+from .search import update_index, remove_from_index
+from .typeahead import typeahead_index
+from .structure import STRUCTURE_FIELDS, bump_structure_version
+
+
+# ----------------------------
+# Kurs tuzilmasi cache'i (structure.py)
+# ----------------------------
+@receiver(post_save, sender=Section)
+@receiver(post_save, sender=Video)
+def structure_saved(sender, instance, update_fields=None, **kwargs):
+    # masalan faqat is_blocked saqlansa tartib o'zgarmaydi
+    if update_fields is None or STRUCTURE_FIELDS.intersection(update_fields):
+        # commitdan keyin (bump_content_version kabi); tranzaksiya ichidagi o'qishlar cache'ni chetlab o'tadi
+        transaction.on_commit(bump_structure_version)
+
+
+@receiver(post_delete, sender=Section)
+@receiver(post_delete, sender=Video)
+def structure_deleted(sender, instance, **kwargs):
+    transaction.on_commit(bump_structure_version)
+
+
+# ----------------------------
+# Katalog javoblari cache'i (caching.py)
+# ----------------------------
+def bump_content_version():
+    # commitdan keyin: aks holda parallel so'rov eski ma'lumotni yangi versiya bilan cache'lab qo'yishi mumkin
+    transaction.on_commit(lambda: bump_version(CONTENT))
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Course)
+@receiver(post_save, sender=Section)
+@receiver(post_save, sender=Video)
+@receiver(post_save, sender=Missiya)
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Course)
+@receiver(post_delete, sender=Section)
+@receiver(post_delete, sender=Video)
+@receiver(post_delete, sender=Missiya)
+@receiver(post_delete, sender=Group)
+@receiver(m2m_changed, sender=Course.teacher.through)
+def content_changed(sender, **kwargs):
+    bump_content_version()
+
+
+# kurs daraxtida (UserSerializer) va kurs qidiruvida ko'rinadigan Users maydonlari
+TREE_USER_FIELDS = {'hemis_id', 'first_name', 'last_name', 'role', 'group', 'group_id', 'username'}
+
+
+@receiver(post_save, sender=Users)
+@receiver(post_delete, sender=Users)
+def user_changed(sender, instance, update_fields=None, **kwargs):
+    # faqat teacherlar kurs daraxtida ko'rinadi; last_login, parol va h.k. yangilanishi hisobga olinmaydi.
+    # Bazaga murojaat yo'q: kurs teacherlari role='teacher' bilan tanlanadi (Course.teacher limit_choices_to)
+    if update_fields is not None and not TREE_USER_FIELDS.intersection(update_fields):
+        return
+    if instance.role == 'teacher':
+        bump_content_version()
+
+
+# userga xos javoblar (Users.progress_version). mark_as_watched'dagi upsertlar signal chiqarmaydi,
+# u yerda versiya alohida oshiriladi
+@receiver(post_save, sender=VideoProgress)
+@receiver(post_save, sender=SectionProgress)
+@receiver(post_save, sender=CourseProgress)
+@receiver(post_save, sender=Vazifa_bajarish)
+@receiver(post_delete, sender=VideoProgress)
+@receiver(post_delete, sender=SectionProgress)
+@receiver(post_delete, sender=CourseProgress)
+@receiver(post_delete, sender=Vazifa_bajarish)
+def progress_changed(sender, instance, raw=False, **kwargs):
+    if not raw:
+        transaction.on_commit(lambda: bump_progress_version(instance.user_id))
+
+
+# ----------------------------
+# Qidiruv indeksi (search.py)
+# ----------------------------
+@receiver(post_save, sender=Course)
+def course_indexed(sender, instance, raw=False, **kwargs):
+    if not raw:
+        update_index('course', Course.objects.filter(pk=instance.pk))
+        # section hujjatlarida kurs nomi bor
+        update_index('section', Section.objects.filter(course_id=instance.pk))
+
+
+@receiver(post_save, sender=Section)
+def section_indexed(sender, instance, raw=False, **kwargs):
+    if not raw:
+        update_index('section', Section.objects.filter(pk=instance.pk))
+
+
+@receiver(post_save, sender=Category)
+def category_indexed(sender, instance, created, raw=False, **kwargs):
+    if not raw and not created:
+        update_index('section', Section.objects.filter(course__category_id=instance.pk))
+
+
+@receiver(post_save, sender=Users)
+def teacher_indexed(sender, instance, update_fields=None, raw=False, **kwargs):
+    # user_changed kabi: faqat teacherlar kurs hujjatlarida
+    if raw or instance.role != 'teacher' or (update_fields is not None and 'username' not in update_fields):
+        return
+    update_index('course', instance.teaching_courses.all())
+
+
+@receiver(m2m_changed, sender=Course.teacher.through)
+def course_teachers_indexed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == 'pre_clear' and reverse:
+        # tozalangandan keyin qaysi kurslar ekanini bilib bo'lmaydi
+        instance._search_course_ids = list(instance.teaching_courses.values_list('id', flat=True))
+    elif action in ('post_add', 'post_remove', 'post_clear'):
+        if not reverse:
+            course_ids = [instance.pk]
+        else:
+            course_ids = pk_set if action != 'post_clear' else getattr(instance, '_search_course_ids', [])
+        update_index('course', Course.objects.filter(pk__in=course_ids))
+
+
+@receiver(post_delete, sender=Course)
+def course_unindexed(sender, instance, **kwargs):
+    remove_from_index('course', [instance.pk])
+
+
+@receiver(post_delete, sender=Section)
+def section_unindexed(sender, instance, **kwargs):
+    remove_from_index('section', [instance.pk])
+
+
+# ----------------------------
+# Typeahead indeksi (typeahead.py) — bazaga qayta murojaat qilmasdan, joyida yangilanadi
+# ----------------------------
+TYPEAHEAD_KINDS = {Course: 'course', Section: 'section', Video: 'video'}
+
+
+@receiver(post_save, sender=Course)
+@receiver(post_save, sender=Section)
+@receiver(post_save, sender=Video)
+def typeahead_saved(sender, instance, update_fields=None, **kwargs):
+    if update_fields is None or 'title' in update_fields:
+        kind, pk, title = TYPEAHEAD_KINDS[sender], instance.pk, instance.title
+        transaction.on_commit(lambda: typeahead_index.update(kind, pk, title))
+
+
+@receiver(post_delete, sender=Course)
+@receiver(post_delete, sender=Section)
+@receiver(post_delete, sender=Video)
+def typeahead_deleted(sender, instance, **kwargs):
+    kind, pk = TYPEAHEAD_KINDS[sender], instance.pk
+    transaction.on_commit(lambda: typeahead_index.update(kind, pk, None))
+
+
+# ----------------------------
+# Progress hisoblagichlari (total_videos / total_sections)
+# ----------------------------
+@receiver(post_save, sender=Video)
+def video_created_counters(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        shift_counter(SectionProgress.objects.filter(section_id=instance.section_id, total_videos__gt=0), 'total_videos', 1)
+
+
+@receiver(pre_delete, sender=Video)
+def video_deleted_counters(sender, instance, **kwargs):
+    progress = SectionProgress.objects.filter(section_id=instance.section_id, total_videos__gt=0)
+    completed_users = VideoProgress.objects.filter(video=instance, is_completed=True).values('user_id')
+    shift_counter(progress.filter(user_id__in=completed_users), 'completed_videos', -1)
+    shift_counter(progress, 'total_videos', -1)
+
+
+@receiver(post_save, sender=Section)
+def section_created_counters(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        shift_counter(CourseProgress.objects.filter(course_id=instance.course_id, total_sections__gt=0), 'total_sections', 1)
+
+
+@receiver(pre_delete, sender=Section)
+def section_deleted_counters(sender, instance, **kwargs):
+    progress = CourseProgress.objects.filter(course_id=instance.course_id, total_sections__gt=0)
+    completed_users = SectionProgress.objects.filter(section=instance, is_completed=True).values('user_id')
+    shift_counter(progress.filter(user_id__in=completed_users), 'completed_sections', -1)
+    shift_counter(progress, 'total_sections', -1)
+
+
+# ----------------------------
+# Rating summary (kurs va kategoriya rollup'lari)
+# ----------------------------
+@receiver(pre_delete, sender=Video)
+def video_deleted_ratings(sender, instance, **kwargs):
+    remove_video_from_rollups(instance.pk)
+
+
+# shu obyektlar bilan birga o'chgan ratinglar video_deleted_ratings'da bir yo'la ayiriladi
+RATING_CONTAINERS = (Video, Section, Course, Category)
+
+
+@receiver(post_delete, sender=VideoRating)
+def rating_deleted(sender, instance, origin=None, **kwargs):
+    # API/admin'dan o'chirish va user o'chganda cascade
+    origin_model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    if not issubclass(origin_model, RATING_CONTAINERS):
+        apply_rating_change(instance.video_id, instance.rating, None)
+
+
+# ko'chirilgan obyekt -> ota maydoni (kurs/kategoriya rollup'lari shunga bog'liq)
+ROLLUP_PARENTS = {
+    Video: 'section',
+    Section: 'course',
+    Course: 'category',
+}
+
+
+@receiver(pre_save, sender=Video)
+@receiver(pre_save, sender=Section)
+@receiver(pre_save, sender=Course)
+def rollup_parent_changing(sender, instance, update_fields=None, raw=False, **kwargs):
+    field = ROLLUP_PARENTS[sender]
+    instance._rollup_parent_id = None
+    if raw or instance.pk is None or (update_fields is not None and field not in update_fields):
+        return
+    instance._rollup_parent_id = sender.objects.filter(pk=instance.pk).values_list(f'{field}_id', flat=True).first()
+
+
+@receiver(post_save, sender=Video)
+@receiver(post_save, sender=Section)
+@receiver(post_save, sender=Course)
+def rollup_parent_changed(sender, instance, **kwargs):
+    old_parent_id = getattr(instance, '_rollup_parent_id', None)
+    new_parent_id = getattr(instance, f'{ROLLUP_PARENTS[sender]}_id')
+    if old_parent_id is not None and old_parent_id != new_parent_id:
+        instance._rollup_parent_id = new_parent_id
+        move_rollups(sender, instance.pk, old_parent_id, new_parent_id)
+
+
+# ----------------------------
+# Yuklangan fayllarni qayta ishlash (processing.py): video metadata/faststart, rasm variantlari
+# ----------------------------
+def file_changed(sender, instance, field_name, update_fields):
+    """pre_save: fayl maydoniga yangi fayl yuklandimi yoki boshqa nom ulandimi (uploads.attach, admin upload id)"""
+    if update_fields is not None and field_name not in update_fields:
+        return False
+    file = getattr(instance, field_name)
+    if file and not file._committed:
+        # yangi yuklangan fayl (multipart)
+        return True
+    if instance.pk is None:
+        return bool(file)
+    old = sender.objects.filter(pk=instance.pk).values_list(field_name, flat=True).first()
+    return (old or '') != (file.name or '')
+
+
+@receiver(pre_save, sender=Video)
+def video_file_changing(sender, instance, update_fields=None, raw=False, **kwargs):
+    instance._file_changed = not raw and file_changed(sender, instance, 'video_file', update_fields)
+
+
+@receiver(pre_save, sender=Category)
+@receiver(pre_save, sender=Course)
+def image_changing(sender, instance, update_fields=None, raw=False, **kwargs):
+    instance._file_changed = not raw and file_changed(sender, instance, 'img', update_fields)
+
+
+@receiver(post_save, sender=Video)
+def video_file_saved(sender, instance, **kwargs):
+    if getattr(instance, '_file_changed', False):
+        instance._file_changed = False
+        schedule(process_video, instance.pk)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Course)
+def image_saved(sender, instance, **kwargs):
+    if getattr(instance, '_file_changed', False):
+        instance._file_changed = False
+        schedule(process_image, sender._meta.model_name, instance.pk)
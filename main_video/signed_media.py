@@ -0,0 +1,118 @@
+import mimetypes
+import posixpath
+import time
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import models
+from django.http import HttpResponse, HttpResponseForbidden, HttpResponseNotFound
+from django.urls import reverse
+from django.utils.crypto import constant_time_compare, salted_hmac
+from rest_framework import serializers
+
+from .streaming import serve_file
+
+
+# ----------------------------
+# Sozlamalar (settings.py'da o'zgartirish mumkin)
+# ----------------------------
+DEFAULT_TTL = 60 * 60                     # URL kamida TTL, ko'pi bilan 2*TTL amal qiladi
+DEFAULT_SERVER = 'django'                 # 'nginx' (X-Accel-Redirect), 'sendfile' (X-Sendfile) yoki 'django'
+DEFAULT_INTERNAL_PREFIX = '/protected-media/'   # nginx: location /protected-media/ { internal; alias MEDIA_ROOT/; }
+SIGNATURE_SALT = 'main_video.signed_media'
+
+
+def get_setting(name, default):
+    return getattr(settings, name, default)
+
+
+def url_epoch(now=None):
+    """Muddat TTL bo'laklariga yaxlitlanadi: bitta bo'lak ichida URL o'zgarmaydi (browser cache,
+    per-user javob cache'i). VersionedCacheMixin ETag'iga ham qo'shiladi."""
+    return int(now if now is not None else time.time()) // get_setting('SIGNED_MEDIA_TTL', DEFAULT_TTL)
+
+
+def signature(name, user_id, expires):
+    value = f'{name}\n{user_id}\n{expires}'
+    return salted_hmac(SIGNATURE_SALT, value, algorithm='sha256').hexdigest()[:32]
+
+
+def url_builder(request, now=None):
+    """name -> /media-signed/<name>?u=&e=&s= (HMAC: nom, user, muddat), FileField kabi absolute URL.
+    Request bo'yicha bir marta tayyorlanadi: ro'yxatlarda har qatorda reverse/build_absolute_uri yo'q."""
+    user_id = (request.user.pk or 0) if request is not None else 0
+    base = request.build_absolute_uri('/')[:-1] if request is not None else ''
+    prefix = base + reverse('signed-media', args=['-'])[:-1]
+    expires = (url_epoch(now) + 2) * get_setting('SIGNED_MEDIA_TTL', DEFAULT_TTL)
+
+    def build(name):
+        if not name:
+            return None
+        return f'{prefix}{quote(name)}?u={user_id}&e={expires}&s={signature(name, user_id, expires)}'
+    return build
+
+
+def get_url_builder(request):
+    builder = getattr(request, '_signed_url_builder', None)
+    if builder is None:
+        builder = url_builder(request)
+        if request is not None:
+            request._signed_url_builder = builder
+    return builder
+
+
+# ----------------------------
+# Serializer maydoni
+# ----------------------------
+class SignedFileField(serializers.FileField):
+    """FileField, lekin URL o'rniga signed, qisqa muddatli URL. Yozish (upload) odatdagidek.
+
+    access — parent serializer metodi nomi (masalan 'get_is_accessible'): False bo'lsa URL berilmaydi.
+    """
+
+    def __init__(self, access=None, **kwargs):
+        self.access = access
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        if not value:
+            return None
+        if self.access and not getattr(self.parent, self.access)(value.instance):
+            return None
+        return get_url_builder(self.context.get('request'))(value.name)
+
+
+class SignedFilesMixin:
+    """ModelSerializer'dagi barcha model FileField'lari SignedFileField bo'ladi
+    (model'dan olingan required/allow_null/max_length saqlanadi). access — Meta.extra_kwargs orqali."""
+    serializer_field_mapping = {
+        **serializers.ModelSerializer.serializer_field_mapping,
+        models.FileField: SignedFileField,
+    }
+
+
+# ----------------------------
+# View: faqat imzo tekshiriladi (bazaga murojaat yo'q), fayl front serverga topshiriladi
+# ----------------------------
+def signed_media(request, path):
+    user_id, expires, sig = request.GET.get('u', ''), request.GET.get('e', ''), request.GET.get('s', '')
+    if not expires.isdigit() or int(expires) < time.time() \
+            or not constant_time_compare(sig, signature(path, user_id, expires)):
+        return HttpResponseForbidden("URL muddati o'tgan yoki imzo noto'g'ri")
+    name = posixpath.normpath(path)
+    if name.startswith(('/', '..')) or name != path:
+        return HttpResponseNotFound()
+
+    server = get_setting('SIGNED_MEDIA_SERVER', DEFAULT_SERVER)
+    if server == 'django':
+        # dev: Range/ETag bilan Python orqali
+        return serve_file(request, default_storage.path(name))
+
+    response = HttpResponse(content_type=mimetypes.guess_type(name)[0] or 'application/octet-stream')
+    if server == 'nginx':
+        prefix = get_setting('SIGNED_MEDIA_INTERNAL_PREFIX', DEFAULT_INTERNAL_PREFIX)
+        response['X-Accel-Redirect'] = quote(prefix + name)
+    else:
+        response['X-Sendfile'] = default_storage.path(name)
+    return response
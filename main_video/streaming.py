@@ -0,0 +1,164 @@
+import mimetypes
+import os
+import re
+
+from django.core.cache import cache
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseNotModified
+from django.utils.http import http_date, parse_etags, parse_http_date_safe
+
+from .access import VideoAccessResolver
+from .caching import CONTENT, get_version
+from .renderers import ORJSONRenderer
+
+
+# ----------------------------
+# Sozlamalar
+# ----------------------------
+STREAM_BLOCK_SIZE = 64 * 1024        # wsgi.file_wrapper (sendfile) bo'lmaganda o'qish bo'lagi
+STREAM_MAX_AGE = 60 * 60             # client bir xil range'ni qayta so'ramasligi uchun (private)
+ACCESS_KEY = 'stream_access:{}:{}:{}:{}'
+ACCESS_TIMEOUT = 60 * 60
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class PassthroughRenderer(ORJSONRenderer):
+    """Har qanday Accept (video/*, */*) uchun: DRF content negotiation 406 qaytarmasin.
+    Fayl javoblari render qilinmaydi; xatolar (401/403/404) odatdagidek JSON bo'lib qaytadi."""
+    media_type = '*/*'
+    format = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        response = (renderer_context or {}).get('response')
+        if response is not None:
+            response['Content-Type'] = ORJSONRenderer.media_type
+        return super().render(data, accepted_media_type, renderer_context)
+
+
+# ----------------------------
+# Kirish huquqi (bir marta tekshiriladi)
+# ----------------------------
+def has_stream_access(user, video):
+    """Player seek qilganda har bir Range so'rovi uchun resolver qayta ishlamaydi: ruxsat
+    user progress_version va kontent versiyasi bo'yicha cache'lanadi (ikkisidan biri o'zgarsa qayta tekshiriladi)"""
+    key = ACCESS_KEY.format(user.pk, video.pk, user.progress_version, get_version(CONTENT))
+    allowed = cache.get(key)
+    if allowed is None:
+        allowed = VideoAccessResolver(user).has_access(video)
+        cache.set(key, allowed, ACCESS_TIMEOUT)
+    return allowed
+
+
+# ----------------------------
+# Range
+# ----------------------------
+def parse_range(header, size):
+    """'bytes=0-99' -> (0, 99). Header yo'q yoki bir nechta range — None (butun fayl, 200).
+    Qondirib bo'lmaydigan range — ValueError (416)."""
+    match = RANGE_RE.match(header.replace(' ', '')) if header else None
+    if match is None:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # suffix: oxirgi N bayt
+        length = int(last)
+        if length == 0 or size == 0:
+            raise ValueError(header)
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or end < start:
+        raise ValueError(header)
+    return start, end
+
+
+class FileRange:
+    """Fayl bo'lagi: read() range'dan oshmaydi, fileno() esa asl fayl (joriy pozitsiyasi = range boshi).
+
+    wsgi.file_wrapper'li serverlar (gunicorn, uWSGI) fayldan os.sendfile bilan to'g'ridan-to'g'ri
+    socketga Content-Length'gacha yuboradi — Python xotirasiga o'qilmaydi.
+    """
+
+    def __init__(self, file, start, length):
+        file.seek(start)
+        self.file = file
+        self.name = file.name
+        self.remaining = length
+
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b''
+        size = self.remaining if size is None or size < 0 else min(size, self.remaining)
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def close(self):
+        self.file.close()
+
+
+def file_etag(stat):
+    # nginx kabi: mtime + hajm (fayl o'qilmaydi)
+    return '"%x-%x"' % (stat.st_mtime_ns, stat.st_size)
+
+
+def if_range_matches(request, etag, last_modified):
+    value = request.META.get('HTTP_IF_RANGE')
+    if not value:
+        return True
+    if value.startswith('"') or value.startswith('W/'):
+        # If-Range faqat strong taqqoslash bilan
+        return value == etag
+    date = parse_http_date_safe(value)
+    return date is not None and date >= last_modified
+
+
+def serve_file(request, path, content_type=None):
+    """Faylni Range, ETag, Last-Modified va 304/206/416 bilan berish"""
+    try:
+        file = open(path, 'rb')
+    except FileNotFoundError:
+        return HttpResponse(status=404)
+    stat = os.fstat(file.fileno())
+    size, etag, last_modified = stat.st_size, file_etag(stat), int(stat.st_mtime)
+
+    if etag in parse_etags(request.META.get('HTTP_IF_NONE_MATCH', '')):
+        file.close()
+        response = HttpResponseNotModified()
+        response['ETag'] = etag
+        return response
+
+    content_type = content_type or mimetypes.guess_type(path)[0] or 'application/octet-stream'
+    try:
+        byte_range = parse_range(request.META.get('HTTP_RANGE'), size) \
+            if if_range_matches(request, etag, last_modified) else None
+    except ValueError:
+        file.close()
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        response['Accept-Ranges'] = 'bytes'
+        return response
+
+    if byte_range is None:
+        response = FileResponse(file, content_type=content_type)
+    else:
+        start, end = byte_range
+        response = FileResponse(FileRange(file, start, end - start + 1), content_type=content_type, status=206)
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        response['Content-Length'] = str(end - start + 1)
+    response.block_size = STREAM_BLOCK_SIZE
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    response['Cache-Control'] = f'private, max-age={STREAM_MAX_AGE}'
+    return response
+
+
+def protected_media(request):
+    """DEBUG'da MEDIA_URL/videos/ to'g'ridan-to'g'ri berilmaydi (kirish huquqini chetlab o'tmasin)"""
+    raise Http404("Videolar /api/videos/<id>/stream/ orqali beriladi")
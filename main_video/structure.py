@@ -0,0 +1,173 @@
+import uuid
+from bisect import bisect_right
+from threading import Lock
+
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import Section, Video
+
+
+# Section/Video o'zgarganda signals.py shu versiyani yangilaydi. Versiya Django cache'da turadi,
+# shuning uchun umumiy backend (file, redis...) bo'lsa boshqa processlar ham yangilanadi.
+STRUCTURE_VERSION_KEY = 'course_structure_version'
+
+# Faqat shu maydonlar o'zgarsa tartib/navigatsiya o'zgaradi
+STRUCTURE_FIELDS = {'order', 'section', 'section_id', 'course', 'course_id', 'title'}
+
+
+class CourseStructure:
+    """Bitta kursning section -> video tartibi (faqat id, order va title)"""
+
+    def __init__(self, course_id, sections, videos):
+        self.course_id = course_id
+        # sections: [(id, order)], videos: [(id, section_id, order, title)] — order, id bo'yicha
+        self.section_ids = [section_id for section_id, _ in sections]
+        self.section_orders = [order for _, order in sections]
+
+        self.section_videos = {section_id: [] for section_id in self.section_ids}
+        self.video_orders = {section_id: [] for section_id in self.section_ids}
+        self.videos = {}
+        for video_id, section_id, order, title in videos:
+            self.section_videos[section_id].append(video_id)
+            self.video_orders[section_id].append(order)
+            self.videos[video_id] = (section_id, order, title)
+
+    # ----------------------------
+    # Sectionlar
+    # ----------------------------
+    def max_section_order(self):
+        return max(self.section_orders, default=None)
+
+    def next_section_id(self, order):
+        """order'i berilgandan katta birinchi section"""
+        index = bisect_right(self.section_orders, order)
+        return self.section_ids[index] if index < len(self.section_ids) else None
+
+    # ----------------------------
+    # Videolar
+    # ----------------------------
+    def video_ids(self, section_id):
+        return self.section_videos.get(section_id, [])
+
+    def video_order_pairs(self, section_id):
+        return list(zip(self.section_videos.get(section_id, []), self.video_orders.get(section_id, [])))
+
+    def max_video_order(self, section_id):
+        return max(self.video_orders.get(section_id, []), default=None)
+
+    def first_video_id(self, section_id):
+        video_ids = self.section_videos.get(section_id)
+        return video_ids[0] if video_ids else None
+
+    def next_video_id(self, section_id, order):
+        """Sectiondagi order'i berilgandan katta birinchi video"""
+        orders = self.video_orders.get(section_id, [])
+        index = bisect_right(orders, order)
+        return self.section_videos[section_id][index] if index < len(orders) else None
+
+    def video(self, video_id):
+        """Cache'dagi maydonlar bilan Video (qolgan maydonlar kerak bo'lganda bazadan olinadi)"""
+        if video_id is None:
+            return None
+        section_id, order, title = self.videos[video_id]
+        # qiymatlar model maydonlari tartibida bo'lishi kerak (id, title, section, order)
+        return Video.from_db('default', ['id', 'title', 'section_id', 'order'], [video_id, title, section_id, order])
+
+
+class StructureCache:
+    def __init__(self):
+        self._lock = Lock()
+        self._version = None
+        self._courses = {}           # course_id -> CourseStructure
+        self._section_course = {}    # section_id -> course_id
+
+    def _check_version(self):
+        version = cache.get(STRUCTURE_VERSION_KEY)
+        if version != self._version:
+            with self._lock:
+                self._courses = {}
+                self._section_course = {}
+                self._version = version
+        return version
+
+    @staticmethod
+    def _bypass():
+        # tranzaksiya ichida: commit qilinmagan (rollback bo'lishi mumkin) qatorlar umumiy cache'ga tushmasligi,
+        # cache'dagi nusxa esa shu tranzaksiyadagi o'zgarishlarni ko'rmasligi mumkin — to'g'ridan-to'g'ri bazadan
+        return transaction.get_connection().in_atomic_block
+
+    def course(self, course_id):
+        if self._bypass():
+            return self._load(course_id)
+        version = self._check_version()
+        structure = self._courses.get(course_id)
+        if structure is None:
+            structure = self._build(course_id, version)
+        return structure
+
+    def section(self, section_id):
+        bypass = self._bypass()
+        if not bypass:
+            self._check_version()
+        course_id = None if bypass else self._section_course.get(section_id)
+        if course_id is None:
+            course_id = Section.objects.filter(pk=section_id).values_list('course_id', flat=True).first()
+            if course_id is None:
+                return CourseStructure(None, [], [])
+        return self.course(course_id)
+
+    def sections(self, section_ids):
+        """{section_id: CourseStructure} — noma'lum sectionlar kursi bitta so'rovda aniqlanadi"""
+        bypass = self._bypass()
+        section_course = {} if bypass else self._section_course
+        if not bypass:
+            self._check_version()
+        unknown = [section_id for section_id in section_ids if section_id not in section_course]
+        course_ids = dict(Section.objects.filter(pk__in=unknown).values_list('id', 'course_id')) if unknown else {}
+        result = {}
+        for section_id in section_ids:
+            course_id = section_course.get(section_id) or course_ids.get(section_id)
+            result[section_id] = self.course(course_id) if course_id else CourseStructure(None, [], [])
+        return result
+
+    @staticmethod
+    def _load(course_id):
+        sections = Section.objects.filter(course_id=course_id).order_by('order', 'id').values_list('id', 'order')
+        videos = Video.objects.filter(section__course_id=course_id).order_by('order', 'id').values_list(
+            'id', 'section_id', 'order', 'title'
+        )
+        return CourseStructure(course_id, list(sections), list(videos))
+
+    def _build(self, course_id, version):
+        structure = self._load(course_id)
+        with self._lock:
+            if self._version != version:
+                # qurish davomida kontent o'zgardi: saqlamaymiz
+                return structure
+            self._courses[course_id] = structure
+            for section_id in structure.section_ids:
+                self._section_course[section_id] = course_id
+        return structure
+
+
+structure_cache = StructureCache()
+
+
+def get_course_structure(course_id):
+    return structure_cache.course(course_id)
+
+
+def get_section_structure(section_id):
+    return structure_cache.section(section_id)
+
+
+def get_section_structures(section_ids):
+    return structure_cache.sections(section_ids)
+
+
+def bump_structure_version():
+    # hisoblagich emas, tasodifiy token: kalit cache'dan o'chib ketsa ham eski nusxa "to'g'ri" bo'lib qolmaydi.
+    # Tranzaksiya ichidan transaction.on_commit orqali chaqiriladi: aks holda parallel so'rov commitdan
+    # oldingi tartibni yangi versiya bilan cache'lab qo'yadi
+    cache.set(STRUCTURE_VERSION_KEY, uuid.uuid4().hex, timeout=None)
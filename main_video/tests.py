@@ -1,3 +1,741 @@
-from django.test import TestCase
+import base64
+import io
+import json
+import os
+import shutil
+import tempfile
+import time
+from datetime import timedelta
+from urllib.parse import parse_qs, urlsplit
+from unittest import mock, skipIf
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.serializers.json import DjangoJSONEncoder
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from PIL import ExifTags, Image
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .models import (
+    Users, Category, Course, Section, Video, Missiya, Vazifa_bajarish, SectionProgress, CourseProgress, Upload,
+    VideoRating, RatingSummary, CourseRatingSummary, CategoryRatingSummary, VideoProgress, Comment
+)
+from .access import VideoAccessResolver
+from .views import CommentViewSet, CourseMainViewSet, SectionOneViewSet
+from .signed_media import signature
+from .caching import RATINGS, get_version
+from .ratings import SUMMARY_FIELDS, apply_rating_change, rebuild_rating_summaries
+from .uploads import UploadError, append_chunk, completed_upload, create_upload, fcntl, finish_upload, temp_path
+from . import search
+from .images import make_variants
+from .ordering import reorder
+from .structure import STRUCTURE_VERSION_KEY, get_course_structure
+from .views import update_section_progress
+
+
+class WatchProgressCountersTests(TestCase):
+    def setUp(self):
+        self.user = Users.objects.create(hemis_id='student', username='student', role='student')
+        category = Category.objects.create(title='Kategoriya')
+        self.course = Course.objects.create(title='Kurs', category=category, author='a', small_description='-')
+        self.section = Section.objects.create(title='Section', course=self.course, small_description='-')
+        self.videos = [
+            Video.objects.create(title=f'Video {index}', section=self.section, video_file=f'videos/{index}.mp4')
+            for index in range(3)
+        ]
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def watch_all(self):
+        for video in self.videos:
+            response = self.client.post(f'/api/videos/{video.pk}/mark_as_watched/')
+            self.assertEqual(response.status_code, 200, response.content)
+
+    def assert_completed(self):
+        section_progress = SectionProgress.objects.get(user=self.user, section=self.section)
+        self.assertEqual((section_progress.completed_videos, section_progress.total_videos), (3, 3))
+        self.assertTrue(section_progress.is_completed)
+        course_progress = CourseProgress.objects.get(user=self.user, course=self.course)
+        self.assertEqual((course_progress.completed_sections, course_progress.total_sections), (1, 1))
+        self.assertEqual(course_progress.progress_percent, 100)
+        self.assertTrue(course_progress.is_completed)
+
+    def test_watching_all_videos_completes_section_and_course(self):
+        self.watch_all()
+        self.assert_completed()
+
+    def test_section_row_created_by_vazifa_is_recounted(self):
+        # vazifa yo'li SectionProgress'ni total_videos=0 bilan yaratadi
+        missiya = Missiya.objects.create(section=self.section, description='-')
+        Vazifa_bajarish.objects.create(missiya=missiya, user=self.user)
+        update_section_progress(self.user, self.section)
+        section_progress = SectionProgress.objects.get(user=self.user, section=self.section)
+        self.assertEqual(section_progress.total_videos, 0)
+        self.assertFalse(CourseProgress.objects.filter(user=self.user).exists())
+
+        self.watch_all()
+        self.assert_completed()
+
+
+def legacy_check_video_access(video, user):
+    """VideoAccessResolver'dan oldingi Video.check_video_access (har video uchun alohida so'rovlar)"""
+    if user.role in ['admin', 'teacher']:
+        return True
+    section_videos = Video.objects.filter(section=video.section).order_by('order')
+    if not section_videos.exists():
+        return False
+    if video.id == section_videos.first().id:
+        return True
+    if VideoProgress.objects.filter(user=user, video=video, is_completed=True).exists():
+        return True
+    previous_video = section_videos.filter(order__lt=video.order).order_by('-order').first()
+    if previous_video:
+        return VideoProgress.objects.filter(user=user, video=previous_video, is_completed=True).exists()
+    return False
+
+
+class VideoAccessResolverTests(TestCase):
+    def setUp(self):
+        # javoblar cache'i: oldingi testlardagi (rollback qilingan) bir xil id'lar
+        cache.clear()
+        category = Category.objects.create(title='Kategoriya')
+        course = Course.objects.create(title='Kurs', category=category, author='a', small_description='-')
+        self.section = Section.objects.create(title='Section', course=course, small_description='-')
+        self.videos = [
+            Video.objects.create(title=f'Video {index}', section=self.section, video_file=f'videos/{index}.mp4')
+            for index in range(4)
+        ]
+        # is_blocked kirish huquqiga ta'sir qilmaydi (faqat ko'rsatiladi)
+        Video.objects.filter(pk=self.videos[2].pk).update(is_blocked=True)
+        self.videos = list(Video.objects.filter(section=self.section).order_by('order'))
+
+    def user(self, role, completed=()):
+        username = f'{role}{Users.objects.count()}'
+        user = Users.objects.create(hemis_id=username, username=username, role=role)
+        for index in completed:
+            VideoProgress.objects.create(user=user, video=self.videos[index], is_completed=True)
+        return user
+
+    def assert_access(self, user, expected):
+        legacy = [legacy_check_video_access(video, user) for video in self.videos]
+        resolver = VideoAccessResolver(user)
+        self.assertEqual([resolver.has_access(video) for video in self.videos], legacy)
+        self.assertEqual(list(VideoAccessResolver(user).section_access(self.section.pk).values()), legacy)
+        self.assertEqual([video.check_video_access(user) for video in self.videos], legacy)
+        self.assertEqual(legacy, expected)
+
+        client = APIClient()
+        client.force_authenticate(user)
+        response = client.get(f'/api/sections/{self.section.pk}/videos_with_access/')
+        self.assertEqual([row['has_access'] for row in response.json()], legacy)
+
+    def test_only_first_video_open_without_progress(self):
+        self.assert_access(self.user('student'), [True, False, False, False])
+
+    def test_previous_completed_opens_next(self):
+        self.assert_access(self.user('student', completed=[0]), [True, True, False, False])
+        # bloklangan video ham oldingisi ko'rilgan bo'lsa ochiq
+        self.assert_access(self.user('student', completed=[0, 1]), [True, True, True, False])
+
+    def test_completed_video_stays_open(self):
+        # oldingisi ko'rilmagan, lekin o'zi ko'rilgan
+        self.assert_access(self.user('student', completed=[2]), [True, False, True, True])
+
+    def test_teacher_and_admin_see_everything(self):
+        self.assert_access(self.user('teacher'), [True] * 4)
+        self.assert_access(self.user('admin'), [True] * 4)
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = Users.objects.create(hemis_id='student', username='student', role='student')
+        category = Category.objects.create(title='Kategoriya')
+        course = Course.objects.create(title='Kurs', category=category, author='a', small_description='-')
+        section = Section.objects.create(title='Section', course=course, small_description='-')
+        self.video = Video.objects.create(title='Video', section=section, video_file='videos/a.mp4')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def create_rows(self, model, **fields):
+        """7 qator: 3 tasi bir xil yangi created_at, 4 tasi bir xil eski — tartib id bilan ajraladi"""
+        rows = [model.objects.create(video=self.video, user=self.user, **fields) for _ in range(7)]
+        now = timezone.now()
+        model.objects.filter(pk__in=[row.pk for row in rows[:4]]).update(created_at=now - timedelta(days=1))
+        model.objects.filter(pk__in=[row.pk for row in rows[4:]]).update(created_at=now)
+        return [row.pk for row in rows[4:][::-1] + rows[:4][::-1]]
+
+    def walk(self, url, link):
+        pages = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            data = response.json()
+            # COUNT(*) yo'q: faqat next/previous/results
+            self.assertEqual(list(data), ['next', 'previous', 'results'])
+            pages.append([row['id'] for row in data['results']])
+            url = data[link]
+        return pages
+
+    def assert_pages(self, url, expected):
+        pages = self.walk(f'{url}?video={self.video.pk}&page_size=2', 'next')
+        self.assertEqual(pages, [expected[index:index + 2] for index in range(0, len(expected), 2)])
+
+        last = self.client.get(f'{url}?video={self.video.pk}&page_size=2')
+        for _ in range(len(pages) - 1):
+            last = self.client.get(last.json()['next'])
+        self.assertEqual(self.walk(last.json()['previous'], 'previous'), pages[-2::-1])
+
+    def test_comment_cursors(self):
+        self.assert_pages('/api/comments/', self.create_rows(Comment, comment='-'))
+
+    def test_rating_cursors(self):
+        self.assert_pages('/api/ratings/', self.create_rows(VideoRating, rating=5))
+
+    def test_invalid_cursor_is_404(self):
+        for cursor in ('garbage!', base64.urlsafe_b64encode(b'[1, 2]').decode(), 'eyJ0IjoieCJ9'):
+            response = self.client.get('/api/comments/', {'video': self.video.pk, 'cursor': cursor})
+            self.assertEqual(response.status_code, 404, cursor)
+
+
+class ImageVariantsTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.storage = FileSystemStorage(location=self.directory)
+
+    def save_jpeg(self, size, orientation=1):
+        exif = Image.Exif()
+        exif[ExifTags.Base.Orientation] = orientation
+        buffer = io.BytesIO()
+        Image.new('RGB', size, (200, 100, 50)).save(buffer, 'JPEG', exif=exif)
+        return self.storage.save('category/photo.jpg', ContentFile(buffer.getvalue()))
+
+    def variant_sizes(self, variants):
+        return [Image.open(self.storage.path(variant['jpeg'])).size for variant in variants]
+
+    @override_settings(IMAGE_VARIANT_WIDTHS=(320, 640, 1280))
+    def test_variants_are_not_upscaled(self):
+        variants = make_variants(self.storage, self.save_jpeg((1000, 600)))
+        self.assertEqual([variant['width'] for variant in variants], [320, 640])
+        self.assertEqual(self.variant_sizes(variants), [(320, 192), (640, 384)])
+
+    @override_settings(IMAGE_VARIANT_WIDTHS=(320, 640, 1280))
+    def test_rotated_photo_uses_displayed_width(self):
+        # 1600x1000 xom, orientation 6 — ko'rinishda 1000x1600
+        variants = make_variants(self.storage, self.save_jpeg((1600, 1000), orientation=6))
+        self.assertEqual([variant['width'] for variant in variants], [320, 640])
+        self.assertEqual(self.variant_sizes(variants), [(320, 512), (640, 1024)])
+
+
+class UploadPermissionTests(TestCase):
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        override = override_settings(MEDIA_ROOT=directory, UPLOAD_TEMP_DIR=directory)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.admin = Users.objects.create(hemis_id='admin', username='admin', role='admin')
+        self.teacher = Users.objects.create(hemis_id='teacher', username='teacher', role='teacher')
+        self.student = Users.objects.create(hemis_id='student', username='student', role='student')
+
+    def test_student_cannot_create_untargeted_video_upload(self):
+        with self.assertRaises(UploadError) as context:
+            create_upload(self.student, 10, {'kind': 'video', 'filename': 'a.mp4'})
+        self.assertEqual(context.exception.status, 403)
+        self.assertFalse(Upload.objects.exists())
+
+    def test_completed_upload_only_from_self_or_admin(self):
+        teacher_upload = create_upload(self.teacher, 0, {'kind': 'video', 'filename': 'a.mp4'})
+        admin_upload = create_upload(self.admin, 0, {'kind': 'video', 'filename': 'b.mp4'})
+        self.assertEqual(completed_upload(teacher_upload.pk, 'video', self.teacher), teacher_upload)
+        self.assertEqual(completed_upload(admin_upload.pk, 'video', self.teacher), admin_upload)
+        other_admin = Users.objects.create(hemis_id='admin2', username='admin2', role='admin')
+        self.assertIsNone(completed_upload(teacher_upload.pk, 'video', other_admin))
+
+
+class UploadChunkTests(TransactionTestCase):
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        override = override_settings(MEDIA_ROOT=directory, UPLOAD_TEMP_DIR=os.path.join(directory, 'tmp'))
+        override.enable()
+        self.addCleanup(override.disable)
+        self.teacher = Users.objects.create(hemis_id='teacher', username='teacher', role='teacher')
+        self.upload = create_upload(self.teacher, 10, {'kind': 'video', 'filename': 'a.mp4'})
+
+    def test_body_is_read_outside_transaction(self):
+        test = self
+
+        class Body(io.BytesIO):
+            def read(self, size=-1):
+                test.assertFalse(transaction.get_connection().in_atomic_block)
+                return super().read(size)
+
+        append_chunk(self.upload.pk, self.teacher, '0', Body(b'01234'), 5)
+        upload = append_chunk(self.upload.pk, self.teacher, '5', Body(b'56789'), 5)
+        upload.refresh_from_db()
+        self.assertIsNotNone(upload.completed_at)
+        self.assertFalse(os.path.exists(temp_path(upload)))
+        with open(Video._meta.get_field('video_file').storage.path(upload.file), 'rb') as file:
+            self.assertEqual(file.read(), b'0123456789')
+
+    def test_rolled_back_finish_keeps_temp_file(self):
+        with open(temp_path(self.upload), 'wb') as file:
+            file.write(b'0123456789')
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            finish_upload(self.upload)
+            raise RuntimeError
+        self.assertTrue(os.path.exists(temp_path(self.upload)))
+        self.assertIsNone(Upload.objects.get(pk=self.upload.pk).completed_at)
+
+    @skipIf(fcntl is None, "fcntl yo'q")
+    def test_parallel_patch_is_rejected(self):
+        with open(temp_path(self.upload), 'r+b') as file:
+            fcntl.flock(file.fileno(), fcntl.LOCK_EX)
+            with self.assertRaises(UploadError) as context:
+                append_chunk(self.upload.pk, self.teacher, '0', io.BytesIO(b'01234'), 5)
+        self.assertEqual(context.exception.status, 423)
+        self.assertEqual(Upload.objects.get(pk=self.upload.pk).offset, 0)
+
+
+class RatingRollupTests(TestCase):
+    def setUp(self):
+        self.categories = [Category.objects.create(title=f'Kategoriya {index}') for index in range(2)]
+        self.courses = [
+            Course.objects.create(title=f'Kurs {index}', category=category, author='a', small_description='-')
+            for index, category in enumerate(self.categories)
+        ]
+        self.sections = [
+            Section.objects.create(title='Section', course=course, small_description='-') for course in self.courses
+        ]
+        self.video = Video.objects.create(title='Video', section=self.sections[0], video_file='videos/a.mp4')
+        self.users = [
+            Users.objects.create(hemis_id=f'student{index}', username=f'student{index}', role='student')
+            for index in range(2)
+        ]
+        self.ratings = [self.rate(user, stars) for user, stars in zip(self.users, (5, 3))]
+
+    def rate(self, user, stars, video=None):
+        video = video or self.video
+        rating = VideoRating.objects.create(video=video, user=user, rating=stars)
+        apply_rating_change(video.pk, None, stars)
+        return rating
+
+    def snapshot(self):
+        return {
+            (model.__name__, row.pk): tuple(getattr(row, field) for field in SUMMARY_FIELDS)
+            for model in (RatingSummary, CourseRatingSummary, CategoryRatingSummary)
+            for row in model.objects.all() if row.rating_count
+        }
+
+    def assert_rollups_match_rebuild(self):
+        current = self.snapshot()
+        rebuild_rating_summaries()
+        self.assertEqual(current, self.snapshot())
+
+    def test_video_moved_to_other_course(self):
+        self.video.section = self.sections[1]
+        self.video.save()
+        self.assertEqual(CourseRatingSummary.objects.get(course=self.courses[1]).rating_count, 2)
+        self.assert_rollups_match_rebuild()
+
+    def test_section_moved_to_other_course(self):
+        self.sections[0].course = self.courses[1]
+        self.sections[0].save()
+        self.assert_rollups_match_rebuild()
+
+    def test_course_moved_to_other_category(self):
+        self.courses[0].category = self.categories[1]
+        self.courses[0].save()
+        self.assertEqual(CategoryRatingSummary.objects.get(category=self.categories[1]).rating_sum, 8)
+        self.assert_rollups_match_rebuild()
+
+    def test_user_delete_removes_rating(self):
+        self.users[0].delete()
+        self.assertEqual(CourseRatingSummary.objects.get(course=self.courses[0]).rating_sum, 3)
+        self.assert_rollups_match_rebuild()
+
+    def test_api_delete_counted_once(self):
+        client = APIClient()
+        client.force_authenticate(self.users[0])
+        response = client.delete(f'/api/ratings/{self.ratings[0].pk}/')
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(CourseRatingSummary.objects.get(course=self.courses[0]).rating_count, 1)
+        self.assert_rollups_match_rebuild()
+
+    def test_video_delete_bumps_ratings_version(self):
+        other = Video.objects.create(title='Video 2', section=self.sections[0], video_file='videos/b.mp4')
+        self.rate(self.users[0], 4, other)
+        version = get_version(RATINGS)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.video.delete()
+        self.assertNotEqual(get_version(RATINGS), version)
+        self.assertEqual(CourseRatingSummary.objects.get(course=self.courses[0]).rating_sum, 4)
+        self.assert_rollups_match_rebuild()
+
+
+class RankedSearchTests(TestCase):
+    def setUp(self):
+        self.user = Users.objects.create(hemis_id='student', username='student', role='student')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_filtered_search_is_not_cut_by_global_limit(self):
+        popular = Category.objects.create(title='Dasturlash')
+        other = Category.objects.create(title='Boshqa')
+        Course.objects.bulk_create([
+            Course(title=f'Python {index}', category=popular, author='a', small_description='python python')
+            for index in range(search.SEARCH_LIMIT + 5)
+        ])
+        search.rebuild_search_index()
+        course = Course.objects.create(title='Kirish', category=other, author='a', small_description='python')
+
+        response = self.client.get('/api/course_main/', {'search': 'python', 'category': other.pk})
+        self.assertEqual(response.status_code, 200)
+        results = response.json()
+        results = results['results'] if isinstance(results, dict) else results
+        self.assertEqual([row['id'] for row in results], [course.pk])
+
+    def test_fallback_backend_is_not_cached(self):
+        self.addCleanup(setattr, search, '_backend', search._backend)
+        search._backend = None
+        with mock.patch.object(search, 'fts5_available', return_value=False):
+            self.assertIs(type(search.get_search_backend()), search.SearchBackend)
+        self.assertIsInstance(search.get_search_backend(), search.Fts5SearchBackend)
+
+
+class VersionedCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        category = Category.objects.create(title='Kategoriya')
+        course = Course.objects.create(title='Kurs', category=category, author='a', small_description='-')
+        self.section = Section.objects.create(title='Section', course=course, small_description='-')
+        self.videos = [
+            Video.objects.create(title=f'Video {index}', section=self.section, video_file=f'videos/{index}.mp4')
+            for index in range(2)
+        ]
+        self.url = f'/api/sections/{self.section.pk}/videos_with_access/'
+
+    def client_for(self, hemis_id):
+        # JWT: user (va progress_version) har so'rovda bazadan o'qiladi, force_authenticate kabi eski obyekt emas
+        user = Users.objects.create(hemis_id=hemis_id, username=hemis_id, role='student')
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+        return client
+
+    def access(self, response):
+        self.assertEqual(response.status_code, 200)
+        return [row['has_access'] for row in response.json()]
+
+    def test_if_none_match_returns_304(self):
+        client = self.client_for('student')
+        response = client.get(self.url)
+        etag = response['ETag']
+        self.assertEqual(self.access(response), [True, False])
+
+        for header in (etag, f'W/{etag}', f'"other", W/{etag}'):
+            response = client.get(self.url, HTTP_IF_NONE_MATCH=header)
+            self.assertEqual(response.status_code, 304, header)
+            self.assertEqual(response['ETag'], etag)
+            self.assertEqual(response.content, b'')
+        self.assertEqual(client.get(self.url, HTTP_IF_NONE_MATCH='"other"').status_code, 200)
+
+    def test_mark_as_watched_invalidates_only_that_user(self):
+        watcher, other = self.client_for('watcher'), self.client_for('other')
+        watcher_etag = watcher.get(self.url)['ETag']
+        other_response = other.get(self.url)
+        self.assertNotEqual(other_response['ETag'], watcher_etag)
+
+        response = watcher.post(f'/api/videos/{self.videos[0].pk}/mark_as_watched/')
+        self.assertEqual(response.status_code, 200)
+
+        response = watcher.get(self.url, HTTP_IF_NONE_MATCH=watcher_etag)
+        self.assertEqual(self.access(response), [True, True])
+        self.assertNotEqual(response['ETag'], watcher_etag)
+        self.assertEqual(other.get(self.url, HTTP_IF_NONE_MATCH=other_response['ETag']).status_code, 304)
+        # cache'dagi javob (serializer ishlamaydi) o'zgarmagan
+        self.assertEqual(other.get(self.url).content, other_response.content)
+
+    def test_content_change_after_commit_changes_etag(self):
+        client = self.client_for('student')
+        etag = client.get('/api/category_main/')['ETag']
+        self.assertEqual(client.get('/api/category_main/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        with self.captureOnCommitCallbacks(execute=True):
+            Category.objects.create(title='Yangi')
+        response = client.get('/api/category_main/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Yangi', [row['title'] for row in response.json()])
+
+
+class MediaFilesMixin:
+    """MEDIA_ROOT vaqtinchalik papkada; sectionda 2 video: birinchisi ochiq, ikkinchisi — oldingisi ko'rilgach"""
+    content = bytes(range(256)) * 4
+
+    def setUp(self):
+        cache.clear()
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        override = override_settings(MEDIA_ROOT=directory)
+        override.enable()
+        self.addCleanup(override.disable)
+        os.makedirs(os.path.join(directory, 'videos'))
+        for name in ('a b.mp4', 'b.mp4'):
+            with open(os.path.join(directory, 'videos', name), 'wb') as file:
+                file.write(self.content)
+
+        category = Category.objects.create(title='Kategoriya')
+        course = Course.objects.create(title='Kurs', category=category, author='a', small_description='-')
+        section = Section.objects.create(title='Section', course=course, small_description='-')
+        self.videos = [
+            Video.objects.create(title=name, section=section, video_file=f'videos/{name}')
+            for name in ('a b.mp4', 'b.mp4')
+        ]
+        self.user = Users.objects.create(hemis_id='student', username='student', role='student')
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}')
+
+    def body(self, response):
+        content = b''.join(response.streaming_content) if response.streaming else response.content
+        response.close()
+        return content
+
+
+class VideoStreamTests(MediaFilesMixin, TestCase):
+    def stream(self, video, **headers):
+        return self.client.get(f'/api/videos/{video.pk}/stream/', **headers)
+
+    def test_full_file_and_ranges(self):
+        response = self.stream(self.videos[0])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertEqual(self.body(response), self.content)
+
+        size = len(self.content)
+        for header, start, end in (
+            ('bytes=0-99', 0, 99), ('bytes=1000-', 1000, size - 1), ('bytes=-10', size - 10, size - 1),
+            ('bytes=1020-5000', 1020, size - 1),
+        ):
+            response = self.stream(self.videos[0], HTTP_RANGE=header)
+            self.assertEqual(response.status_code, 206, header)
+            self.assertEqual(response['Content-Range'], f'bytes {start}-{end}/{size}')
+            self.assertEqual(response['Content-Length'], str(end - start + 1))
+            self.assertEqual(self.body(response), self.content[start:end + 1], header)
+
+    def test_unsatisfiable_range_is_416(self):
+        for header in (f'bytes={len(self.content)}-', 'bytes=-0', 'bytes=50-10'):
+            response = self.stream(self.videos[0], HTTP_RANGE=header)
+            self.assertEqual(response.status_code, 416, header)
+            self.assertEqual(response['Content-Range'], f'bytes */{len(self.content)}')
+
+    def test_conditional_requests(self):
+        response = self.stream(self.videos[0])
+        etag = response['ETag']
+        response.close()
+        self.assertEqual(self.stream(self.videos[0], HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        # If-Range mos kelmasa butun fayl (200)
+        response = self.stream(self.videos[0], HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE='"old"')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.body(response), self.content)
+        response = self.stream(self.videos[0], HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE=etag)
+        self.assertEqual(response.status_code, 206)
+        response.close()
+
+    def test_locked_video_is_403_until_previous_watched(self):
+        response = self.stream(self.videos[1], HTTP_RANGE='bytes=0-9')
+        self.assertEqual(response.status_code, 403)
+        self.assertIn('error', response.json())
+        self.assertEqual(self.client.post(f'/api/videos/{self.videos[0].pk}/mark_as_watched/').status_code, 200)
+        # cache'langan ruxsat progress_version bilan eskiradi
+        response = self.stream(self.videos[1], HTTP_RANGE='bytes=0-9')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(self.body(response), self.content[:10])
+
+    def test_anonymous_is_rejected(self):
+        self.assertEqual(APIClient().get(f'/api/videos/{self.videos[0].pk}/stream/').status_code, 401)
+
+
+@override_settings(SIGNED_MEDIA_SERVER='django', SIGNED_MEDIA_TTL=3600)
+class SignedMediaTests(MediaFilesMixin, TestCase):
+    def signed_url(self, video):
+        response = self.client.get(f'/api/videos/{video.pk}/')
+        self.assertEqual(response.status_code, 200)
+        return response.json()['video_file']
+
+    def signed_get(self, name, **params):
+        query = {'u': str(self.user.pk), 'e': str(int(time.time()) + 60)}
+        query.update(params)
+        query.setdefault('s', signature(name, query['u'], query['e']))
+        return self.client.get(f'/media-signed/{name}', query)
+
+    def test_signed_url_serves_file(self):
+        url = self.signed_url(self.videos[0])
+        self.assertIn('/media-signed/videos/a%20b.mp4?', url)
+        response = self.client.get(url, HTTP_RANGE='bytes=0-9')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(self.body(response), self.content[:10])
+
+    def test_locked_video_has_no_url(self):
+        self.assertIsNone(self.signed_url(self.videos[1]))
+
+    def test_tampered_signature_is_403(self):
+        url = urlsplit(self.signed_url(self.videos[0]))
+        query = {key: value[0] for key, value in parse_qs(url.query).items()}
+        self.assertEqual(self.client.get(url.path, query).status_code, 200)
+        for change in ({'s': query['s'][:-1] + ('0' if query['s'][-1] != '0' else '1')}, {'u': '999'},
+                       {'e': str(int(query['e']) + 3600)}, {'s': ''}):
+            response = self.client.get(url.path, {**query, **change})
+            self.assertEqual(response.status_code, 403, change)
+        # boshqa faylga shu imzo bilan
+        self.assertEqual(self.client.get('/media-signed/videos/b.mp4', query).status_code, 403)
+
+    def test_expired_url_is_403(self):
+        self.assertEqual(self.signed_get('videos/b.mp4', e=str(int(time.time()) - 1)).status_code, 403)
+        self.assertEqual(self.signed_get('videos/b.mp4', e='abc').status_code, 403)
+        response = self.signed_get('videos/b.mp4')
+        self.assertEqual(response.status_code, 200)
+        response.close()
+
+    def test_path_traversal_is_404(self):
+        for name in ('videos/../videos/b.mp4', 'videos//b.mp4'):
+            self.assertEqual(self.signed_get(name).status_code, 404, name)
+
+    @override_settings(SIGNED_MEDIA_SERVER='nginx', SIGNED_MEDIA_INTERNAL_PREFIX='/protected-media/')
+    def test_nginx_accel_redirect(self):
+        response = self.client.get(self.signed_url(self.videos[0]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['X-Accel-Redirect'], '/protected-media/videos/a%20b.mp4')
+        self.assertEqual(response['Content-Type'], 'video/mp4')
+        self.assertEqual(response.content, b'')
+        # imzo baribir tekshiriladi
+        self.assertEqual(self.signed_get('videos/b.mp4', s='0' * 32).status_code, 403)
+
+    @override_settings(SIGNED_MEDIA_SERVER='sendfile')
+    def test_sendfile(self):
+        response = self.signed_get('videos/b.mp4')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['X-Sendfile'], os.path.join(settings.MEDIA_ROOT, 'videos', 'b.mp4'))
+
+
+class ValuesSerializerParityTests(TestCase):
+    """fastpath.ValuesSerializer natijasi endpointning odatiy ModelSerializer natijasi bilan bir xil"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = Users.objects.create(hemis_id='student', username='student', role='student')
+        other = Users.objects.create(hemis_id='other', username='other', role='student')
+        teacher = Users.objects.create(hemis_id='teacher', username='teacher', role='teacher')
+        self.category = Category.objects.create(title='Kategoriya')
+        self.course = Course.objects.create(
+            title='Kurs', category=self.category, author='a', small_description='-', img='course/photo.jpg',
+            img_variants=[{'width': 320, 'webp': 'course/variants/photo-320w.webp',
+                           'jpeg': 'course/variants/photo-320w.jpg'}],
+        )
+        self.course.teacher.add(teacher, other)
+        Course.objects.create(title='Rasmsiz', category=self.category, author='b', small_description='-')
+        sections = [
+            Section.objects.create(title=f'Section {index}', course=self.course, small_description='-')
+            for index in range(2)
+        ]
+        videos = [
+            Video.objects.create(title=f'Video {index}', section=section, video_file=f'videos/{index}.mp4')
+            for section in sections for index in range(3)
+        ]
+        VideoProgress.objects.create(user=self.user, video=videos[0], is_completed=True, completed_at=timezone.now())
+        for user, video, stars in ((self.user, videos[0], 4), (other, videos[0], 5), (other, videos[4], 2)):
+            VideoRating.objects.create(user=user, video=video, rating=stars)
+            apply_rating_change(video.pk, None, stars)
+        Missiya.objects.create(section=sections[0], description='Fayl bilan', file='missiya/a.pdf')
+        Missiya.objects.create(section=sections[1], description='Faylsiz')
+        for index in range(3):
+            Comment.objects.create(user=other if index % 2 else self.user, video=videos[0], comment=f'izoh {index}')
+        self.video = videos[0]
+
+    def assert_same(self, viewset_class, query, user):
+        def view():
+            # har safar yangi request: access resolver va loader keshi ikki yo'lda umumiy bo'lmasin
+            request = Request(APIRequestFactory().get('/', query))
+            request.user = user
+            instance = viewset_class(request=request, action='list', format_kwarg=None, args=(), kwargs={})
+            return instance, request, instance.filter_queryset(instance.get_queryset())
+
+        instance, request, queryset = view()
+        expected = instance.get_serializer(queryset, many=True).data
+        instance, request, queryset = view()
+        values = instance.values_serializer_class(request).serialize(queryset)
+        self.assertTrue(expected)
+        self.assertEqual(json.loads(json.dumps(values, cls=DjangoJSONEncoder)),
+                         json.loads(json.dumps(expected, cls=DjangoJSONEncoder)))
+
+    def test_section_one(self):
+        for user in (self.user, AnonymousUser()):
+            self.assert_same(SectionOneViewSet, {'course': self.course.pk}, user)
+
+    def test_course_main(self):
+        for user in (self.user, AnonymousUser()):
+            self.assert_same(CourseMainViewSet, {'category': self.category.pk}, user)
+
+    def test_comments(self):
+        self.assert_same(CommentViewSet, {'video': self.video.pk}, self.user)
+
+
+class UserChangedSignalTests(TestCase):
+    def test_non_teacher_save_does_not_query(self):
+        user = Users.objects.create(hemis_id='student', username='student', role='student')
+        user.first_name = 'Ali'
+        with self.assertNumQueries(1):
+            user.save()
+        with self.assertNumQueries(1):
+            user.save(update_fields=['password'])
+
+
+class StructureCacheTransactionTests(TransactionTestCase):
+    def setUp(self):
+        category = Category.objects.create(title='Kategoriya')
+        self.course = Course.objects.create(title='Kurs', category=category, author='a', small_description='-')
+
+    def create_section(self, title):
+        return Section.objects.create(title=title, course=self.course, small_description='-')
+
+    def test_version_bumped_after_commit(self):
+        version = cache.get(STRUCTURE_VERSION_KEY)
+        with transaction.atomic():
+            self.create_section('1')
+            self.assertEqual(cache.get(STRUCTURE_VERSION_KEY), version)
+        self.assertNotEqual(cache.get(STRUCTURE_VERSION_KEY), version)
+
+    def test_rolled_back_rows_are_not_cached(self):
+        self.assertEqual(self.create_section('1').order, 1024)
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            self.assertEqual(self.create_section('2').order, 2048)
+            self.assertEqual(get_course_structure(self.course.pk).max_section_order(), 2048)
+            raise RuntimeError
+        self.assertEqual(get_course_structure(self.course.pk).max_section_order(), 1024)
+        self.assertEqual(self.create_section('3').order, 2048)
+
+    def test_reorder_bumps_version_after_commit(self):
+        first, second = self.create_section('1'), self.create_section('2')
+        version = cache.get(STRUCTURE_VERSION_KEY)
+        with transaction.atomic():
+            reorder(Section, self.course.pk, [second.pk, first.pk])
+            self.assertEqual(cache.get(STRUCTURE_VERSION_KEY), version)
+        self.assertNotEqual(cache.get(STRUCTURE_VERSION_KEY), version)
+        self.assertEqual(get_course_structure(self.course.pk).section_ids, [second.pk, first.pk])
+
+
+class OpenAPISchemaTests(TestCase):
+    @override_settings(OPENAPI_SCHEMA_FILE=None)
+    def test_yaml_schema(self):
+        response = self.client.get('/swagger.yaml')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/yaml')
+        self.assertTrue(response.content.startswith(b'swagger:'))
+        response = self.client.get('/swagger.yaml', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
@@ -0,0 +1,152 @@
+import random
+import unicodedata
+from bisect import bisect_left, insort
+from threading import Lock
+
+from django.core.cache import cache
+
+from .models import Course, Section, Video
+
+
+# ----------------------------
+# Matnni normallashtirish (lotin/kirill, apostroflar, katta-kichik harf)
+# ----------------------------
+CYRILLIC_TO_LATIN = {
+    'а': 'a', 'б': 'b', 'в': 'v', 'г': 'g', 'ғ': 'g', 'д': 'd', 'е': 'e', 'ё': 'yo', 'ж': 'j',
+    'з': 'z', 'и': 'i', 'й': 'y', 'к': 'k', 'қ': 'q', 'л': 'l', 'м': 'm', 'н': 'n', 'о': 'o',
+    'ў': 'o', 'п': 'p', 'р': 'r', 'с': 's', 'т': 't', 'у': 'u', 'ф': 'f', 'х': 'x', 'ҳ': 'h',
+    'ц': 's', 'ч': 'ch', 'ш': 'sh', 'щ': 'sh', 'ъ': '', 'ь': '', 'ы': 'i', 'э': 'e', 'ю': 'yu',
+    'я': 'ya',
+}
+VOWELS = set('аеёиоуўэюя')
+# oʻ, gʻ va tutuq belgisi: har xil yozilishi bir xil bo'lishi uchun olib tashlanadi
+APOSTROPHES = set("'`ʻʼ‘’")
+
+
+def normalize(text):
+    """'Oʻzbek tili', "O'zbek tili" va 'Ўзбек тили' -> 'ozbek tili'"""
+    result = []
+    previous = ' '
+    for char in (text or '').lower():
+        if char == 'е' and (not previous.isalpha() or previous in VOWELS):
+            result.append('ye')   # so'z boshida va unlidan keyin: ер -> yer
+        elif char in CYRILLIC_TO_LATIN:
+            result.append(CYRILLIC_TO_LATIN[char])
+        elif char in APOSTROPHES:
+            pass
+        else:
+            result.append(char if char.isalnum() else ' ')
+        if char not in APOSTROPHES:
+            previous = char
+    decomposed = unicodedata.normalize('NFKD', ''.join(result))
+    return ' '.join(''.join(c for c in decomposed if not unicodedata.combining(c)).split())
+
+
+def title_keys(title):
+    """Sarlavhaning har bir so'zidan boshlanadigan kalitlar: 'a b c' -> ['a b c', 'b c', 'c']"""
+    words = normalize(title).split()
+    return [' '.join(words[index:]) for index in range(len(words))]
+
+
+# ----------------------------
+# Prefiks indeksi
+# ----------------------------
+SOURCES = {
+    'course': Course,
+    'section': Section,
+    'video': Video,
+}
+
+# har o'zgarishda +1. Boshqa process ham o'zgartirgan bo'lsa (+1 dan ko'p) indeks bazadan qayta quriladi
+TYPEAHEAD_VERSION_KEY = 'typeahead_version'
+
+
+class TypeaheadIndex:
+    """Kurs, section va video sarlavhalari bo'yicha tartiblangan kalitlar + bisect"""
+
+    def __init__(self):
+        self._lock = Lock()
+        self._version = None
+        # ([(key, kind, id)] key bo'yicha tartiblangan, {(kind, id): title}) — bitta atribut,
+        # suggest() lock'siz o'qiydi, update() nusxada o'zgartirib almashtiradi
+        self._data = None
+
+    @staticmethod
+    def _current_version():
+        version = cache.get(TYPEAHEAD_VERSION_KEY)
+        if version is None:
+            # tasodifiy boshlang'ich qiymat: kalit o'chib qayta paydo bo'lsa eski versiyalar bilan to'qnashmaydi
+            cache.add(TYPEAHEAD_VERSION_KEY, random.getrandbits(48), timeout=None)
+            version = cache.get(TYPEAHEAD_VERSION_KEY)
+        return version
+
+    def _build(self):
+        version = self._current_version()
+        entries = []
+        titles = {}
+        for kind, model in SOURCES.items():
+            for object_id, title in model.objects.values_list('id', 'title').iterator():
+                titles[(kind, object_id)] = title
+                entries.extend((key, kind, object_id) for key in title_keys(title))
+        entries.sort()
+        self._data, self._version = (entries, titles), version
+        return self._data
+
+    def _fresh_data(self):
+        data = self._data
+        if data is None or self._current_version() != self._version:
+            with self._lock:
+                data = self._data
+                if data is None or self._current_version() != self._version:
+                    data = self._build()
+        return data
+
+    # ----------------------------
+    # O'zgarishlar (signals.py, commitdan keyin)
+    # ----------------------------
+    def update(self, kind, object_id, title):
+        """title=None — obyekt o'chirildi"""
+        with self._lock:
+            try:
+                version = cache.incr(TYPEAHEAD_VERSION_KEY)
+            except ValueError:
+                version = None
+            if self._data is None or version is None or version != self._version + 1:
+                # bu process boshqa o'zgarishlarni ko'rmagan: keyingi so'rovda to'liq quriladi
+                self._data = None
+                return
+            entries, titles = list(self._data[0]), dict(self._data[1])
+            old_title = titles.pop((kind, object_id), None)
+            for key in title_keys(old_title) if old_title is not None else []:
+                index = bisect_left(entries, (key, kind, object_id))
+                if index < len(entries) and entries[index] == (key, kind, object_id):
+                    del entries[index]
+            if title is not None:
+                titles[(kind, object_id)] = title
+                for key in title_keys(title):
+                    insort(entries, (key, kind, object_id))
+            self._data, self._version = (entries, titles), version
+
+    # ----------------------------
+    # Qidirish
+    # ----------------------------
+    def suggest(self, query, limit=10):
+        prefix = normalize(query)
+        if not prefix:
+            return []
+        entries, titles = self._fresh_data()
+        result = []
+        seen = set()
+        index = bisect_left(entries, (prefix,))
+        while index < len(entries) and len(result) < limit:
+            key, kind, object_id = entries[index]
+            if not key.startswith(prefix):
+                break
+            if (kind, object_id) not in seen:
+                seen.add((kind, object_id))
+                result.append({'type': kind, 'id': object_id, 'title': titles[(kind, object_id)]})
+            index += 1
+        return result
+
+
+typeahead_index = TypeaheadIndex()
@@ -0,0 +1,253 @@
+import base64
+import binascii
+import os
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.http.request import UnreadablePostError
+from django.utils import timezone
+
+from .models import Upload, Video, Vazifa_bajarish
+from .ordering import can_reorder
+
+try:
+    import fcntl
+except ImportError:  # Windows (dev server): fayl qulfi yo'q, faqat offset tekshiruvi
+    fcntl = None
+
+
+# ----------------------------
+# Sozlamalar (settings.py'da o'zgartirish mumkin)
+# ----------------------------
+TUS_VERSION = '1.0.0'
+TUS_EXTENSIONS = 'creation,termination'
+DEFAULT_MAX_SIZE = 5 * 1024 ** 3        # 5 GB
+CHUNK_READ_SIZE = 1024 * 1024           # request body'dan o'qish bo'lagi (xotirada faqat shu)
+OFFSET_CONTENT_TYPE = 'application/offset+octet-stream'
+
+# kind -> (model, fayl maydoni)
+TARGETS = {
+    'video': (Video, 'video_file'),
+    'vazifa': (Vazifa_bajarish, 'file'),
+}
+
+
+class UploadError(Exception):
+    def __init__(self, message, status):
+        super().__init__(message)
+        self.status = status
+
+
+def get_setting(name, default):
+    return getattr(settings, name, default)
+
+
+def max_size():
+    return get_setting('UPLOAD_MAX_SIZE', DEFAULT_MAX_SIZE)
+
+
+def temp_dir():
+    # MEDIA_ROOT bilan bir fayl tizimida bo'lishi kerak: tugagan fayl rename bilan ko'chiriladi
+    return get_setting('UPLOAD_TEMP_DIR', os.path.join(settings.MEDIA_ROOT, 'uploads-tmp'))
+
+
+def temp_path(upload):
+    return os.path.join(temp_dir(), f'{upload.pk}.part')
+
+
+def parse_metadata(header):
+    """tus Upload-Metadata: 'filename ZmlsZS5tcDQ=,kind dmlkZW8=' -> {'filename': 'file.mp4', 'kind': 'video'}"""
+    result = {}
+    for pair in (header or '').split(','):
+        key, _, value = pair.strip().partition(' ')
+        if not key:
+            continue
+        try:
+            result[key] = base64.b64decode(value.strip(), validate=True).decode() if value else ''
+        except (binascii.Error, UnicodeDecodeError):
+            raise UploadError(f"Upload-Metadata: '{key}' base64 emas", 400)
+    return result
+
+
+# ----------------------------
+# Yaratish
+# ----------------------------
+def is_privileged(user):
+    """admin yoki staff"""
+    return user.is_staff or user.role == 'admin'
+
+
+def check_target(user, kind, target_id):
+    """Faylni qaysi obyektga ulash mumkinligi: video — admin/staff yoki (kurs) teacheri, vazifa — egasi.
+    Video yuklash target'siz ham faqat shu rollarga ochiq (admin formasida keyin ulanadi)."""
+    if kind not in TARGETS:
+        raise UploadError("kind 'video' yoki 'vazifa' bo'lishi kerak", 400)
+    if kind == 'video' and not (is_privileged(user) or user.role == 'teacher'):
+        raise UploadError("Videoni faqat admin yoki teacher yuklay oladi", 403)
+    if target_id is None:
+        return
+    model, _ = TARGETS[kind]
+    if kind == 'video':
+        video = model.objects.select_related('section__course').filter(pk=target_id).first()
+        if video is None:
+            raise UploadError("Video topilmadi", 404)
+        if not can_reorder(user, video.section.course):
+            raise UploadError("Videoni faqat admin yoki kurs teacheri yuklay oladi", 403)
+    elif not model.objects.filter(pk=target_id, user=user).exists():
+        raise UploadError("Vazifa topilmadi", 404)
+
+
+def create_upload(user, length, metadata):
+    if length is None or not str(length).isdigit():
+        raise UploadError("Upload-Length butun son bo'lishi kerak", 400)
+    length = int(length)
+    if length > max_size():
+        raise UploadError(f"Fayl {max_size()} baytdan katta bo'lmasligi kerak", 413)
+    kind = metadata.get('kind', '')
+    target = metadata.get('target') or None
+    if target is not None and not target.isdigit():
+        raise UploadError("target butun son bo'lishi kerak", 400)
+    target_id = int(target) if target is not None else None
+    check_target(user, kind, target_id)
+
+    filename = os.path.basename(metadata.get('filename') or 'upload')[:255]
+    upload = Upload.objects.create(user=user, kind=kind, target_id=target_id, filename=filename, length=length)
+    os.makedirs(temp_dir(), exist_ok=True)
+    # bo'sh fayl; bo'laklar shunga offset bo'yicha yoziladi
+    open(temp_path(upload), 'wb').close()
+    if length == 0:
+        finish_upload(upload)
+    return upload
+
+
+# ----------------------------
+# Bo'lak (PATCH)
+# ----------------------------
+def lock_file(file):
+    """Bitta upload'ga parallel PATCH'lar: fayl qulfi bilan (DB tranzaksiyasi body o'qilguncha ochiq turmaydi)"""
+    if fcntl is None:
+        return True
+    try:
+        fcntl.flock(file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        return False
+    return True
+
+
+def check_offset(upload_id, user, offset):
+    upload = Upload.objects.filter(pk=upload_id, user=user).first()
+    if upload is None:
+        raise UploadError("Upload topilmadi", 404)
+    if upload.completed_at is not None:
+        raise UploadError("Upload allaqachon tugagan", 409)
+    if offset is None or not str(offset).isdigit() or int(offset) != upload.offset:
+        raise UploadError("Upload-Offset mos emas", 409)
+    return upload
+
+
+def append_chunk(upload_id, user, offset, stream, content_length):
+    """Request body'ni to'g'ridan-to'g'ri vaqtinchalik faylga (offset'dan) yozadi. Ulanish uzilsa ham
+    qabul qilingan baytlar saqlanadi va offset shunga teng bo'ladi (client HEAD bilan davom ettiradi).
+    Body o'qilayotganda tranzaksiya ochiq emas (SQLite'da boshqa yozuvchilar kutib qolmaydi)."""
+    upload = check_offset(upload_id, user, offset)
+    try:
+        file = open(temp_path(upload), 'r+b')
+    except FileNotFoundError:
+        # shu orada tugadi yoki o'chirildi
+        raise UploadError("Upload topilmadi", 404)
+
+    with file:
+        if not lock_file(file):
+            raise UploadError("Upload boshqa so'rov bilan yozilmoqda", 423)
+        # qulf olinguncha oldingi PATCH offset'ni surgan bo'lishi mumkin
+        upload = check_offset(upload_id, user, offset)
+        remaining = upload.length - upload.offset
+        if content_length is not None and content_length > remaining:
+            raise UploadError("Bo'lak Upload-Length'dan oshib ketadi", 413)
+
+        written = 0
+        file.seek(upload.offset)
+        try:
+            while written < remaining:
+                chunk = stream.read(min(CHUNK_READ_SIZE, remaining - written))
+                if not chunk:
+                    break
+                file.write(chunk)
+                written += len(chunk)
+        except (UnreadablePostError, OSError):
+            # client uzildi: yozilgani saqlanadi
+            pass
+        # oldingi uzilgan PATCH'dan qolgan ortiqcha baytlar
+        file.truncate()
+        file.flush()
+
+        with transaction.atomic():
+            # shu orada DELETE qilingan bo'lsa yozilgan baytlar tashlab yuboriladi
+            current = Upload.objects.select_for_update().filter(
+                pk=upload.pk, offset=upload.offset, completed_at__isnull=True
+            )
+            if not current.exists():
+                raise UploadError("Upload topilmadi", 404)
+            upload.offset += written
+            current.update(offset=upload.offset)
+            if upload.offset == upload.length:
+                finish_upload(upload)
+    return upload
+
+
+# ----------------------------
+# Tugatish: atomik rename va obyektga ulash
+# ----------------------------
+def finish_upload(upload):
+    """Vaqtinchalik fayl storage'dagi joyiga os.replace bilan ko'chiriladi (nusxa olinmaydi).
+    target berilgan bo'lsa obyektning fayl maydoni yangilanadi. Rename commitdan keyin:
+    tranzaksiya rollback bo'lsa fayl vaqtinchalik joyida qoladi."""
+    model, field_name = TARGETS[upload.kind]
+    field = model._meta.get_field(field_name)
+    storage = field.storage
+    target = model.objects.filter(pk=upload.target_id).first() if upload.target_id else None
+
+    name = storage.get_available_name(field.generate_filename(target, upload.filename), max_length=field.max_length)
+    source, path = temp_path(upload), storage.path(name)
+
+    def move():
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(source, path)
+
+    with transaction.atomic():
+        # attach() rejalashtiradigan ishlardan (process_video) oldin bajarilishi uchun birinchi ro'yxatga olinadi
+        transaction.on_commit(move)
+        upload.file = name
+        upload.completed_at = timezone.now()
+        Upload.objects.filter(pk=upload.pk).update(file=name, completed_at=upload.completed_at)
+        if target is not None:
+            attach(target, field_name, name)
+    return upload
+
+
+def attach(instance, field_name, name):
+    """save(update_fields) — signal'lar (cache versiyalari) odatdagidek ishlaydi"""
+    setattr(instance, field_name, name)
+    update_fields = [field_name]
+    if hasattr(instance, 'updated_at'):
+        update_fields.append('updated_at')
+    instance.save(update_fields=update_fields)
+
+
+def completed_upload(upload_id, kind, user):
+    """Admin formasi uchun: tugagan, hali hech narsaga ulanmagan yuklash — userning o'zi yoki admin/staff yuklagan"""
+    uploads = Upload.objects.filter(pk=upload_id, kind=kind, completed_at__isnull=False, target_id__isnull=True)
+    return uploads.filter(Q(user=user) | Q(user__is_staff=True) | Q(user__role='admin')).first()
+
+
+def mark_attached(upload, instance):
+    Upload.objects.filter(pk=upload.pk).update(target_id=instance.pk)
+
+
+def delete_upload(upload):
+    try:
+        os.remove(temp_path(upload))
+    except FileNotFoundError:
+        pass
+    upload.delete()
@@ -15,7 +15,7 @@ from main_video.views import (
     VideoViewSet,
     VideoRatingViewSet,
     CommentViewSet, CategoryMainViewSet, CourseMainViewSet, UserOneViewSet, SectionOneViewSet,
-    AdminVazifaApproveViewSet, SectionVazifasViewSet
+    AdminVazifaApproveViewSet, SectionVazifasViewSet, TypeaheadViewSet, UploadViewSet
 )
 
 router = DefaultRouter()
@@ -40,6 +40,8 @@ router.register("video_progres",VideoViewSet, basename='video_progres')
 
 router.register(r'comments', CommentViewSet, basename='comments')
 router.register(r'ratings', VideoRatingViewSet, basename='rating    ')
+router.register(r'typeahead', TypeaheadViewSet, basename='typeahead')
+router.register(r'uploads', UploadViewSet, basename='uploads')
 from django.urls import re_path
 from . import consumers
 
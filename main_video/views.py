@@ -3,6 +3,7 @@ from rest_framework.viewsets import ModelViewSet
 from rest_framework_simplejwt.views import TokenObtainPairView
 
 from main_video.models import *
+from main_video.renderers import StreamingListMixin
 from main_video.serializers import MyTokenObtainPairSerializer, UserModelSerializer, \
     CourseWithProgressSerializer, CategoryWithCoursesSerializer, SectionWithAccessSerializer, CategoryMainSerializer, \
      SectionOneSerializer, SectionVazifaSerializer, VazifaSerializer, VideoProgressSerializer
@@ -13,8 +14,8 @@ class MyTokenObtainPairView(TokenObtainPairView):
     serializer_class = MyTokenObtainPairSerializer
 
 
-class UserViewSet(ModelViewSet):
-    queryset = Users.objects.all()
+class UserViewSet(StreamingListMixin, ModelViewSet):
+    queryset = Users.objects.prefetch_related('groups', 'user_permissions')
     serializer_class = UserModelSerializer
     parser_classes = (FormParser, MultiPartParser)
 
@@ -38,6 +39,7 @@ class UserOneViewSet(ModelViewSet):
 
 
 from rest_framework import viewsets, permissions
+from django.db.models import Prefetch
 
 from .models import (
     Group, Users, Category, Course, CourseProgress, Section, Missiya,
@@ -56,8 +58,12 @@ class GroupViewSet(viewsets.ModelViewSet):
 
 
 
-class CourseProgressViewSet(viewsets.ModelViewSet):
-    queryset = CourseProgress.objects.all()
+class CourseProgressViewSet(StreamingListMixin, viewsets.ModelViewSet):
+    # CourseProgressSerializer butun kurs daraxtini chiqaradi: stream'da har bir chunk uchun prefetch
+    queryset = CourseProgress.objects.select_related('user__group', 'course').prefetch_related(
+        Prefetch('course__teacher', queryset=Users.objects.select_related('group')),
+        'course__section_set__video_set',
+    )
     serializer_class = CourseProgressSerializer
     # permission_classes = [permissions.IsAuthenticated]
 
@@ -67,16 +73,17 @@ class MissiyaViewSet(viewsets.ModelViewSet):
     serializer_class = MissiyaSerializer
     # permission_classes = [permissions.IsAuthenticated]
 
-class SectionProgressViewSet(viewsets.ModelViewSet):
-    queryset = SectionProgress.objects.all()
+class SectionProgressViewSet(StreamingListMixin, viewsets.ModelViewSet):
+    queryset = SectionProgress.objects.select_related('user__group', 'section').prefetch_related('section__video_set')
     serializer_class = SectionProgressSerializer
     permission_classes = [permissions.IsAuthenticated]
 
 
 from rest_framework import viewsets
+from .caching import VersionedCacheMixin, CONTENT, RATINGS
 
 
-class CategoryMainViewSet(viewsets.ModelViewSet):
+class CategoryMainViewSet(VersionedCacheMixin, viewsets.ModelViewSet):
     queryset = Category.objects.all()
     serializer_class =CategoryMainSerializer
 import django_filters
@@ -93,21 +100,30 @@ class CourseFilter(django_filters.FilterSet):
         fields = ['category', 'teacher', 'is_blocked']
 
 from rest_framework import viewsets, filters
+from django.db.models import Prefetch, OuterRef, Subquery, Count, Sum, Value, IntegerField
+from django.db.models.functions import Coalesce
 from django_filters.rest_framework import DjangoFilterBackend
 from .models import Course
-from .serializers import CourseMainSerializer
+from .serializers import (
+    CourseMainSerializer, CourseSummarySerializer, CategorySummarySerializer, SectionSummarySerializer,
+    requested_fields, wants, sub_spec
+)
+from .search import RankedSearchFilter, RelevanceOrderingFilter
+from .fastpath import ValuesListMixin, CourseMainValuesSerializer, SectionOneValuesSerializer, CommentValuesSerializer
 
 
 
-class CourseMainViewSet(viewsets.ModelViewSet):
+class CourseMainViewSet(VersionedCacheMixin, ValuesListMixin, viewsets.ModelViewSet):
     queryset = Course.objects.all()
     serializer_class = CourseMainSerializer
+    values_serializer_class = CourseMainValuesSerializer
 
     filter_backends = [
         DjangoFilterBackend,
-        filters.SearchFilter,
-        filters.OrderingFilter,
+        RankedSearchFilter,
+        RelevanceOrderingFilter,
     ]
+    search_index = 'course'
 
     filterset_class = CourseFilter
 
@@ -121,10 +137,148 @@ class CourseMainViewSet(viewsets.ModelViewSet):
     ordering_fields = ['created_at', 'title']
     ordering = ['-created_at']
 
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        fields, expand = requested_fields(self.request), requested_fields(self.request, 'expand') or {}
+        if 'category' in expand and wants(fields, 'category'):
+            queryset = queryset.select_related('category')
+        if 'teacher' in expand and wants(fields, 'teacher'):
+            queryset = queryset.prefetch_related(Prefetch('teacher', queryset=Users.objects.select_related('group')))
+        elif wants(fields, 'teacher'):
+            # teacher id'lari: har bir kurs uchun alohida so'rov bo'lmasligi uchun
+            queryset = queryset.prefetch_related(Prefetch('teacher', queryset=Users.objects.only('id')))
+        return queryset
+
+
+def course_tree_queryset(user, fields=None, expand=None):
+    """Kurs -> teacher, section -> video va userning progressi: hammasi prefetch bilan (so'rovlar soni o'zgarmas).
+
+    fields/expand — ?fields= va ?expand= spec'i: so'ralmagan maydonlar uchun prefetch qilinmaydi.
+    """
+    queryset = Course.objects.all()
+    if wants(fields, 'average_video_rating'):
+        queryset = queryset.select_related('rating_summary')
+    if wants(fields, 'category') and 'category' in (expand or {}):
+        queryset = queryset.select_related('category')
+    if wants(fields, 'teacher'):
+        queryset = queryset.prefetch_related(Prefetch('teacher', queryset=Users.objects.select_related('group')))
+    if wants(fields, 'sections'):
+        sections = Section.objects.order_by('order')
+        if wants(sub_spec(fields, 'sections'), 'accessible_videos_count', 'total_videos_count'):
+            sections = sections.prefetch_related(Prefetch('video_set', queryset=Video.objects.order_by('order', 'id')))
+        queryset = queryset.prefetch_related(Prefetch('section_set', queryset=sections))
+    if wants(fields, 'total_progress'):
+        if user.is_authenticated:
+            progress = CourseProgress.objects.filter(user_id=user.id)
+        else:
+            progress = CourseProgress.objects.none()
+        queryset = queryset.prefetch_related(Prefetch('courseprogress_set', queryset=progress, to_attr='user_progress'))
+    return queryset
+
+
+def category_tree_queryset(user, fields=None, expand=None):
+    """Kategoriya -> kurslar daraxti (course_tree_queryset bilan)"""
+    queryset = Category.objects.all()
+    if wants(fields, 'average_rating'):
+        queryset = queryset.select_related('rating_summary')
+    if wants(fields, 'courses'):
+        courses = course_tree_queryset(user, sub_spec(fields, 'courses'), sub_spec(expand, 'courses'))
+        queryset = queryset.prefetch_related(Prefetch('course_set', queryset=courses))
+    return queryset
+
+
+# ----------------------------
+# Ro'yxatlar uchun: sonlar va progress korrelyatsiyalangan subquery'lar bilan (bitta so'rov, prefetch'siz)
+# ----------------------------
+def aggregate_subquery(queryset, field, aggregate=Count('pk')):
+    """OuterRef bo'yicha filtrlangan queryset'ning field guruhidagi agregati (yo'q bo'lsa 0)"""
+    values = queryset.order_by().values(field).annotate(value=aggregate).values('value')
+    return Coalesce(Subquery(values), Value(0), output_field=IntegerField())
+
+
+def user_subquery(user, queryset, field):
+    """Userning progress qatoridagi hisoblagich (qator bo'lmasa yoki anonim user bo'lsa 0)"""
+    if not user.is_authenticated:
+        return Value(0, output_field=IntegerField())
+    values = queryset.filter(user_id=user.id).values(field)[:1]
+    return Coalesce(Subquery(values), Value(0), output_field=IntegerField())
+
+
+def section_summary_queryset(user, fields=None):
+    queryset = Section.objects.all()
+    if wants(fields, 'videos_count', 'progress_percent'):
+        queryset = queryset.annotate(
+            videos_count=aggregate_subquery(Video.objects.filter(section=OuterRef('pk')), 'section')
+        )
+    if wants(fields, 'completed_videos', 'progress_percent'):
+        queryset = queryset.annotate(completed_videos=user_subquery(
+            user, SectionProgress.objects.filter(section=OuterRef('pk')), 'completed_videos'
+        ))
+    return queryset
+
+
+def course_summary_queryset(user, fields=None, expand=None):
+    queryset = Course.objects.all()
+    if wants(fields, 'average_video_rating'):
+        queryset = queryset.select_related('rating_summary')
+    if wants(fields, 'category') and 'category' in (expand or {}):
+        queryset = queryset.select_related('category')
+    if wants(fields, 'sections_count'):
+        queryset = queryset.annotate(
+            sections_count=aggregate_subquery(Section.objects.filter(course=OuterRef('pk')), 'course')
+        )
+    if wants(fields, 'videos_count'):
+        queryset = queryset.annotate(
+            videos_count=aggregate_subquery(Video.objects.filter(section__course=OuterRef('pk')), 'section__course')
+        )
+    progress = CourseProgress.objects.filter(course=OuterRef('pk'))
+    if wants(fields, 'completed_sections'):
+        queryset = queryset.annotate(completed_sections=user_subquery(user, progress, 'completed_sections'))
+    if wants(fields, 'total_progress'):
+        queryset = queryset.annotate(total_progress=user_subquery(user, progress, 'progress_percent'))
+    return queryset
+
 
-class CategoryViewSet(viewsets.ModelViewSet):
+def category_summary_queryset(user, fields=None):
+    queryset = Category.objects.all()
+    if wants(fields, 'average_rating'):
+        queryset = queryset.select_related('rating_summary')
+    if wants(fields, 'courses_count', 'total_progress'):
+        queryset = queryset.annotate(
+            courses_count=aggregate_subquery(Course.objects.filter(category=OuterRef('pk')), 'category')
+        )
+    if wants(fields, 'total_progress'):
+        if user.is_authenticated:
+            progress_sum = aggregate_subquery(
+                CourseProgress.objects.filter(course__category=OuterRef('pk'), user_id=user.id),
+                'course__category', Sum('progress_percent')
+            )
+        else:
+            progress_sum = Value(0, output_field=IntegerField())
+        queryset = queryset.annotate(progress_sum=progress_sum)
+    return queryset
+
+
+class CategoryViewSet(VersionedCacheMixin, viewsets.ModelViewSet):
     queryset = Category.objects.all()
     serializer_class = CategoryWithCoursesSerializer
+    # javobda userning progressi va ratinglar ham bor
+    cache_versions = (CONTENT, RATINGS)
+    cache_per_user = True
+
+    def get_queryset(self):
+        fields = requested_fields(self.request)
+        if self.action == 'list':
+            return category_summary_queryset(self.request.user, fields)
+        if self.action == 'retrieve':
+            return category_tree_queryset(self.request.user, fields, requested_fields(self.request, 'expand'))
+        return super().get_queryset()
+
+    def get_serializer_class(self):
+        # ro'yxatda faqat sonlar va progress, kurslar daraxti retrieve'da
+        if self.action == 'list':
+            return CategorySummarySerializer
+        return super().get_serializer_class()
 
     def get_serializer_context(self):
         """Request contextini serializer'ga o'tkazish"""
@@ -136,16 +290,26 @@ class CategoryViewSet(viewsets.ModelViewSet):
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from django.db import transaction
 from django.utils import timezone
-import math
 
 from .models import Video, VideoProgress, SectionProgress, CourseProgress, Section
+from .progress import (
+    progress_percent, shift_counter, mark_video_completed, upsert_section_video_completed,
+    upsert_course_section_delta, bump_progress_version
+)
 from .serializers import VideosSerializer, VideoAccessSerializer
+from .access import VideoAccessResolver, get_access_resolver
+from .caching import VersionedCacheMixin, cached_action, CONTENT, RATINGS
+from .streaming import PassthroughRenderer, has_stream_access, serve_file
+from django.http import HttpResponseRedirect
 
-class VideoViewSet(viewsets.ModelViewSet):
+class VideoViewSet(VersionedCacheMixin, viewsets.ModelViewSet):
     queryset = Video.objects.all()
     serializer_class = VideosSerializer
     permission_classes = [permissions.IsAuthenticated]  # Faqat avtorizatsiyalangan userlar
+    cache_actions = ('check_access',)
+    cache_per_user = True
 
     def get_serializer_context(self):
         context = super().get_serializer_context()
@@ -159,140 +323,201 @@ class VideoViewSet(viewsets.ModelViewSet):
         user = request.user
 
         # Video'ga kirish huquqini tekshirish
-        if not video.check_video_access(user):
+        if not VideoAccessResolver(user).has_access(video):
             return Response({
                 'error': 'Bu videoni ko‘rish huquqingiz yo‘q. Avval oldingi videoni ko‘rib bo‘lishingiz kerak.'
             }, status=status.HTTP_403_FORBIDDEN)
 
-        # VideoProgressni yangilash yoki yaratish
-        progress, created = VideoProgress.objects.get_or_create(
-            user=user,
-            video=video,
-            defaults={'is_completed': True, 'completed_at': timezone.now()}
-        )
-
-        if not created:
-            progress.is_completed = True
-            progress.completed_at = timezone.now()
-            progress.save()
+        # VideoProgressni yangilash yoki yaratish (bitta upsert)
+        newly_completed = mark_video_completed(user.id, video.id, timezone.now())
 
         next_video = video.get_next_video()
 
-        self._update_section_progress(user, video.section)
+        # hisoblagichlar faqat video birinchi marta ko'rilganda o'zgaradi
+        if newly_completed:
+            with transaction.atomic():
+                section_delta = self._update_section_progress(user, video.section)
+                # kurs qatori har safar upsert qilinadi: section qatori vazifa yo'lida oldinroq yaratilgan bo'lishi mumkin
+                self._update_course_progress(user, video.section.course, section_delta)
 
-        self._update_course_progress(user, video.section.course)
+        # userning cache'langan javoblari eskirdi (upsertlar signal chiqarmaydi)
+        bump_progress_version(user.id)
+
+        # progress yangilangandan keyin qayta hisoblanadi
+        next_open = next_video and VideoAccessResolver(user).has_access(next_video)
 
         return Response({
             'success': True,
             'message': 'Video ko‘rib bo‘ldi',
             'video_id': video.id,
-            'next_video_id': next_video.id if next_video and next_video.check_video_access(user) else None,
-            'next_video_title': next_video.title if next_video and next_video.check_video_access(user) else None
+            'next_video_id': next_video.id if next_open else None,
+            'next_video_title': next_video.title if next_open else None
         })
 
+    @action(detail=True, methods=['get'], renderer_classes=[PassthroughRenderer])
+    def stream(self, request, pk=None):
+        """Video fayli: Range (206), ETag, Last-Modified. Kirish huquqi bir marta tekshiriladi (streaming.py)"""
+        video = self.get_object()
+        if not has_stream_access(request.user, video):
+            return Response({
+                'error': 'Bu videoni ko‘rish huquqingiz yo‘q. Avval oldingi videoni ko‘rib bo‘lishingiz kerak.'
+            }, status=status.HTTP_403_FORBIDDEN)
+        if not video.video_file:
+            return Response({'error': 'Video fayli yo‘q'}, status=status.HTTP_404_NOT_FOUND)
+        try:
+            path = video.video_file.path
+        except NotImplementedError:
+            # tashqi storage (S3 va h.k.) Range'ni o'zi qo'llab-quvvatlaydi
+            return HttpResponseRedirect(video.video_file.url)
+        return serve_file(request, path)
+
     @action(detail=True, methods=['get'])
+    @cached_action
     def check_access(self, request, pk=None):
         video = self.get_object()
         user = request.user
 
-        has_access = video.check_video_access(user)
+        resolver = VideoAccessResolver(user)
+        has_access = resolver.has_access(video)
         next_video = video.get_next_video() if has_access else None
 
         serializer = VideoAccessSerializer({
             'has_access': has_access,
             'message': 'Mavjud' if has_access else 'Bloklangan',
-            'next_video_id': next_video.id if next_video and next_video.check_video_access(user) else None
+            'next_video_id': next_video.id if next_video and resolver.has_access(next_video) else None
         })
 
         return Response(serializer.data)
 
     def _update_section_progress(self, user, section):
-
-        videos = Video.objects.filter(section=section)
-        total_videos = videos.count()
-
-        completed_videos = VideoProgress.objects.filter(
-            user=user,
-            video__in=videos,
-            is_completed=True
-        ).count()
-
-        progress_percent = math.floor((completed_videos / total_videos) * 100) if total_videos > 0 else 0
-        is_completed = progress_percent == 100
-
-        section_progress, _ = SectionProgress.objects.get_or_create(
-            user=user,
-            section=section
-        )
-
-        section_progress.is_completed = is_completed
-        if is_completed and not section_progress.completed_at:
-            section_progress.completed_at = timezone.now()
-        section_progress.save()
-
-    def _update_course_progress(self, user, course):
-        sections = Section.objects.filter(course=course)
-        total_sections = sections.count()
-
-        completed_sections = SectionProgress.objects.filter(
-            user=user,
-            section__in=sections,
-            is_completed=True
-        ).count()
-
-        progress_percent = math.floor((completed_sections / total_sections) * 100) if total_sections > 0 else 0
-        is_completed = progress_percent == 100
-
-        course_progress, _ = CourseProgress.objects.get_or_create(
-            user=user,
-            course=course
-        )
-
-        course_progress.progress_percent = progress_percent
-        course_progress.is_completed = is_completed
-        if is_completed and not course_progress.completed_at:
-            course_progress.completed_at = timezone.now()
-        course_progress.save()
+        """Bitta video tugallandi: completed_videos += 1. Section holati o'zgarishini qaytaradi (-1, 0, 1)"""
+        section_progress, _ = upsert_section_video_completed(user.id, section.id)
+        was_completed = section_progress.is_completed
+        is_completed = progress_percent(section_progress.completed_videos, section_progress.total_videos) >= 100
+
+        if is_completed != was_completed:
+            section_progress.is_completed = is_completed
+            if is_completed and not section_progress.completed_at:
+                section_progress.completed_at = timezone.now()
+            SectionProgress.objects.filter(pk=section_progress.pk).update(
+                is_completed=section_progress.is_completed,
+                completed_at=section_progress.completed_at
+            )
+        return int(is_completed) - int(was_completed)
+
+    def _update_course_progress(self, user, course, section_delta=0):
+        course_progress = upsert_course_section_delta(user.id, course.id, section_delta)
+
+        progress = min(progress_percent(course_progress.completed_sections, course_progress.total_sections), 100)
+        is_completed = progress == 100
+
+        if (progress, is_completed) != (course_progress.progress_percent, course_progress.is_completed):
+            course_progress.progress_percent = progress
+            course_progress.is_completed = is_completed
+            if is_completed and not course_progress.completed_at:
+                course_progress.completed_at = timezone.now()
+            CourseProgress.objects.filter(pk=course_progress.pk).update(
+                progress_percent=course_progress.progress_percent,
+                is_completed=course_progress.is_completed,
+                completed_at=course_progress.completed_at
+            )
 
 from rest_framework.decorators import action
 from rest_framework.response import Response
-
-class SectionViewSet(viewsets.ModelViewSet):
+from .ordering import ReorderError, can_reorder, move, reorder
+
+
+def reorder_response(request, model, parent_id, course):
+    """{"ids": [...]} — yangi tartib (bitta bulk_update) yoki {"move": id, "after": id|null} — bitta qator"""
+    if not can_reorder(request.user, course):
+        return Response({'error': 'Tartibni faqat admin yoki kurs teacheri o‘zgartira oladi'},
+                        status=status.HTTP_403_FORBIDDEN)
+    ids, move_id = request.data.get('ids'), request.data.get('move')
+    try:
+        if ids is not None:
+            if not isinstance(ids, list):
+                raise TypeError
+            result = reorder(model, parent_id, [int(pk) for pk in ids])
+        elif move_id is not None:
+            after = request.data.get('after')
+            result = move(model, parent_id, int(move_id), int(after) if after is not None else None)
+        else:
+            return Response({'error': '"ids" yoki "move" berilishi kerak'}, status=status.HTTP_400_BAD_REQUEST)
+    except ReorderError as error:
+        return Response({'error': str(error)}, status=status.HTTP_400_BAD_REQUEST)
+    except (TypeError, ValueError):
+        return Response({'error': 'id’lar butun son bo‘lishi kerak'}, status=status.HTTP_400_BAD_REQUEST)
+    return Response([{'id': pk, 'order': order} for pk, order in result])
+
+
+class SectionViewSet(VersionedCacheMixin, viewsets.ModelViewSet):
     queryset = Section.objects.all()
     serializer_class = SectionWithAccessSerializer
     permission_classes = [IsAuthenticated]
+    cache_actions = ('videos_with_access',)
+    cache_per_user = True
+
+    def get_queryset(self):
+        if self.action == 'list':
+            return section_summary_queryset(self.request.user, requested_fields(self.request))
+        return super().get_queryset()
+
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return SectionSummarySerializer
+        return super().get_serializer_class()
 
     @action(detail=True, methods=['get'])
+    @cached_action
     def videos_with_access(self, request, pk=None):
         section = self.get_object()
-        videos = Video.objects.filter(section=section).order_by('order')  # order bo'yicha
+        resolver = get_access_resolver(request)
 
         result = []
-        for video in videos:
-            has_access = video.check_video_access(request.user)
-            progress = VideoProgress.objects.filter(user=request.user, video=video).first()
-            user_progress = {
-                'is_completed': progress.is_completed if progress else False,
-                'completed_at': progress.completed_at if progress else None
-            }
-
+        for video in resolver.section_videos(section.id):  # order bo'yicha
             result.append({
                 'id': video.id,
                 'title': video.title,
                 'order': video.order,
-                'has_access': has_access,
-                'user_progress': user_progress,
+                'has_access': resolver.has_access(video),
+                'user_progress': dict(resolver.progress(video.id)),
                 'is_blocked': video.is_blocked,
                 'small_description': video.small_description
             })
 
         return Response(result)
 
+    @action(detail=True, methods=['post'])
+    def reorder(self, request, pk=None):
+        """Sectiondagi videolar tartibi"""
+        section = self.get_object()
+        return reorder_response(request, Video, section.id, section.course)
+
 
 
-class CourseViewSet(viewsets.ModelViewSet):
+class CourseViewSet(VersionedCacheMixin, viewsets.ModelViewSet):
     queryset = Course.objects.all()
     serializer_class = CourseWithProgressSerializer
+    cache_versions = (CONTENT, RATINGS)
+    cache_per_user = True
+
+    def get_queryset(self):
+        if self.action == 'list':
+            return course_summary_queryset(
+                self.request.user, requested_fields(self.request), requested_fields(self.request, 'expand')
+            )
+        if self.action == 'retrieve':
+            return course_tree_queryset(
+                self.request.user, requested_fields(self.request), requested_fields(self.request, 'expand')
+            )
+        return super().get_queryset()
+
+    def get_serializer_class(self):
+        # ro'yxatda bo'lim/videolar daraxti yo'q, faqat sonlar va progress
+        if self.action == 'list':
+            return CourseSummarySerializer
+        return super().get_serializer_class()
+
     def get_serializer_context(self):
         context = super().get_serializer_context()
         context['request'] = self.request
@@ -317,16 +542,26 @@ class CourseViewSet(viewsets.ModelViewSet):
                 'completed_at': None
             })
 
+    @action(detail=True, methods=['post'])
+    def reorder(self, request, pk=None):
+        """Kursdagi sectionlar tartibi"""
+        course = self.get_object()
+        return reorder_response(request, Section, course.id, course)
+
 
-class SectionOneViewSet(viewsets.ModelViewSet):
-    queryset = Section.objects.select_related('course', 'course__category')
+class SectionOneViewSet(VersionedCacheMixin, ValuesListMixin, viewsets.ModelViewSet):
+    queryset = Section.objects.all()
     serializer_class = SectionOneSerializer
+    values_serializer_class = SectionOneValuesSerializer
+    cache_versions = (CONTENT, RATINGS)
+    cache_per_user = True
 
     filter_backends = [
         DjangoFilterBackend,
-        filters.SearchFilter,
-        filters.OrderingFilter,
+        RankedSearchFilter,
+        RelevanceOrderingFilter,
     ]
+    search_index = 'section'
 
     filterset_fields = {
         'course': ['exact'],
@@ -343,19 +578,34 @@ class SectionOneViewSet(viewsets.ModelViewSet):
     ordering_fields = ['order', 'created_at']
     ordering = ['order']
 
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        fields, expand = requested_fields(self.request), requested_fields(self.request, 'expand') or {}
+        expand_course = 'course' in expand and wants(fields, 'course')
+        if wants(fields, 'category_id') or expand_course:
+            queryset = queryset.select_related('course', 'course__category')
+        if expand_course and wants(sub_spec(fields, 'course'), 'teacher'):
+            queryset = queryset.prefetch_related('course__teacher')
+        if wants(fields, 'videos'):
+            queryset = queryset.prefetch_related('video_set')
+        if wants(fields, 'missiyalar'):
+            queryset = queryset.prefetch_related('missiyas')
+        return queryset
+
 
 from django.utils import timezone
+from .structure import get_course_structure, get_section_structure
 
 
 def can_start_vazifalar(user, section):
     """Section vazifalarini ishlash uchun shart:
     - Sectiondagi -1 indexdagi video ko‘rilgan bo‘lishi kerak
     """
-    last_video = Video.objects.filter(section=section).order_by('order').first()
-    if not last_video:
+    last_video_id = get_section_structure(section.id).first_video_id(section.id)
+    if not last_video_id:
         return False
     # user ushbu videoni ko‘rgan bo‘lishi kerak
-    return VideoProgress.objects.filter(user=user, video=last_video, is_completed=True).exists()
+    return VideoProgress.objects.filter(user=user, video_id=last_video_id, is_completed=True).exists()
 
 
 def update_section_progress(user, section):
@@ -370,18 +620,28 @@ def update_section_progress(user, section):
     percent = (approved_scores / total_vazifalar) * 100
 
     section_progress, _ = SectionProgress.objects.get_or_create(user=user, section=section)
+    was_completed = section_progress.is_completed
     section_progress.score_percent = percent
     section_progress.is_completed = percent >= 80
     if section_progress.is_completed and not section_progress.completed_at:
         section_progress.completed_at = timezone.now()
     section_progress.save()
 
+    # kurs hisoblagichini ham section holatiga moslash
+    section_delta = int(section_progress.is_completed) - int(was_completed)
+    if section_delta:
+        shift_counter(
+            CourseProgress.objects.filter(user=user, course_id=section.course_id, total_sections__gt=0),
+            'completed_sections', section_delta
+        )
+
     # keyingi sectionni ochish
     if section_progress.is_completed:
-        next_section = Section.objects.filter(course=section.course, order__gt=section.order).order_by('order').first()
-        if next_section:
+        next_section_id = get_course_structure(section.course_id).next_section_id(section.order)
+        next_section = Section.objects.filter(pk=next_section_id).first() if next_section_id else None
+        if next_section and next_section.is_blocked:
             next_section.is_blocked = False
-            next_section.save()
+            next_section.save(update_fields=['is_blocked', 'updated_at'])
 
 
 
@@ -485,7 +745,10 @@ class VideoProgresViews(viewsets.ModelViewSet):
 
 
 
-class CommentPagination(PageNumberPagination):
+from main_video.pagination import KeysetPagination
+
+
+class CommentPagination(KeysetPagination):
     page_size = 10 # har bir sahifada 5 comment
     page_size_query_param = 'page_size'  # foydalanuvchi ?page_size=10 bilan o'zgartirishi mumkin
     max_page_size = 50
@@ -495,9 +758,10 @@ from main_video.models import Comment, VideoRating
 from main_video.serializers import CommentSerializer, VideoRatingSerializer
 
 
-class CommentViewSet(viewsets.ModelViewSet):
-    queryset = Comment.objects.all().order_by('-created_at')
+class CommentViewSet(ValuesListMixin, viewsets.ModelViewSet):
+    queryset = Comment.objects.select_related('user').order_by('-created_at', '-id')
     serializer_class = CommentSerializer
+    values_serializer_class = CommentValuesSerializer
     permission_classes = [permissions.IsAuthenticated]
     pagination_class = CommentPagination
     filter_backends = [DjangoFilterBackend]
@@ -505,13 +769,13 @@ class CommentViewSet(viewsets.ModelViewSet):
 
 
 
-class RatingPagination(PageNumberPagination):
+class RatingPagination(KeysetPagination):
     page_size = 5
     page_size_query_param = 'page_size'
     max_page_size = 50
 
 class VideoRatingViewSet(viewsets.ModelViewSet):
-    queryset = VideoRating.objects.all()
+    queryset = VideoRating.objects.select_related('user')
     serializer_class = VideoRatingSerializer
     permission_classes = [permissions.IsAuthenticated]
     pagination_class = RatingPagination
@@ -527,3 +791,106 @@ class VideoRatingViewSet(viewsets.ModelViewSet):
 
 
 
+
+
+from .typeahead import typeahead_index
+
+
+class TypeaheadViewSet(viewsets.ViewSet):
+    """Qidiruv oynasi uchun tezkor takliflar: /api/typeahead/?q=mat (bazaga murojaat qilmaydi)"""
+    permission_classes = [permissions.IsAuthenticated]
+    max_limit = 50
+
+    def list(self, request):
+        try:
+            limit = min(int(request.query_params.get('limit', 10)), self.max_limit)
+        except ValueError:
+            limit = 10
+        return Response(typeahead_index.suggest(request.query_params.get('q', ''), limit=max(limit, 1)))
+
+
+import io
+from django.urls import reverse
+from .models import Upload
+from .uploads import (
+    OFFSET_CONTENT_TYPE, TUS_EXTENSIONS, TUS_VERSION, UploadError, append_chunk, create_upload, delete_upload,
+    max_size, parse_metadata
+)
+
+
+class UploadViewSet(viewsets.ViewSet):
+    """Resumable (tus 1.0 uslubidagi) yuklash: katta video va vazifa fayllari bo'laklab yuboriladi.
+
+    POST   /api/uploads/        Upload-Length, Upload-Metadata (filename, kind=video|vazifa, target=id)
+    HEAD   /api/uploads/<id>/   Upload-Offset — qayerdan davom ettirish
+    PATCH  /api/uploads/<id>/   Upload-Offset + application/offset+octet-stream body
+    DELETE /api/uploads/<id>/   bekor qilish
+    Oxirgi bo'lakdan keyin fayl target obyektga (Video.video_file / Vazifa_bajarish.file) ulanadi.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def upload_response(self, upload, status_code=status.HTTP_200_OK, body=True):
+        response = Response({
+            'id': upload.pk,
+            'kind': upload.kind,
+            'target': upload.target_id,
+            'filename': upload.filename,
+            'offset': upload.offset,
+            'length': upload.length,
+            'file': upload.file or None,
+            'completed': upload.completed_at is not None,
+        } if body else None, status=status_code)
+        response['Upload-Offset'] = str(upload.offset)
+        response['Upload-Length'] = str(upload.length)
+        response['Cache-Control'] = 'no-store'
+        return response
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        response['Tus-Resumable'] = TUS_VERSION
+        return response
+
+    def handle_exception(self, exc):
+        if isinstance(exc, UploadError):
+            return Response({'error': str(exc)}, status=exc.status)
+        return super().handle_exception(exc)
+
+    def options(self, request, *args, **kwargs):
+        response = Response(status=status.HTTP_204_NO_CONTENT)
+        response['Tus-Version'] = TUS_VERSION
+        response['Tus-Extension'] = TUS_EXTENSIONS
+        response['Tus-Max-Size'] = str(max_size())
+        return response
+
+    def create(self, request):
+        upload = create_upload(
+            request.user, request.META.get('HTTP_UPLOAD_LENGTH'), parse_metadata(request.META.get('HTTP_UPLOAD_METADATA'))
+        )
+        response = self.upload_response(upload, status.HTTP_201_CREATED)
+        response['Location'] = request.build_absolute_uri(reverse('uploads-detail', args=[upload.pk]))
+        return response
+
+    def retrieve(self, request, pk=None):
+        upload = Upload.objects.filter(pk=pk, user=request.user).first()
+        if upload is None:
+            return Response({'error': 'Upload topilmadi'}, status=status.HTTP_404_NOT_FOUND)
+        return self.upload_response(upload)
+
+    def partial_update(self, request, pk=None):
+        if request.content_type.split(';')[0].strip() != OFFSET_CONTENT_TYPE:
+            return Response({'error': f'Content-Type {OFFSET_CONTENT_TYPE} bo‘lishi kerak'},
+                            status=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE)
+        content_length = request.META.get('CONTENT_LENGTH')
+        # request.data ishlatilmaydi: body parser/upload handler'larsiz to'g'ridan-to'g'ri faylga
+        upload = append_chunk(
+            pk, request.user, request.META.get('HTTP_UPLOAD_OFFSET'), request.stream or io.BytesIO(),
+            int(content_length) if content_length and content_length.isdigit() else None,
+        )
+        return self.upload_response(upload, status.HTTP_204_NO_CONTENT, body=False)
+
+    def destroy(self, request, pk=None):
+        upload = Upload.objects.filter(pk=pk, user=request.user, completed_at__isnull=True).first()
+        if upload is None:
+            return Response({'error': 'Upload topilmadi'}, status=status.HTTP_404_NOT_FOUND)
+        delete_upload(upload)
+        return Response(status=status.HTTP_204_NO_CONTENT)